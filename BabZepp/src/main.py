@@ -2,16 +2,143 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import numpy as np
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-import BabWrangle
-import UZeppWrangle
+from compare.align import estimate_offset
+from compare.days import DayCache, source_key
+from compare.decimate import DEFAULT_BUDGET, decimate_frame, window_index
+from compare.figures import RENDERERS, WEBGL_POINTS, StrokeGroups, use_webgl
+from compare.join import Stream, join_streams
+from compare.parallel import load_sources
+from compare.profile import profiling, stage
+from compare import store
+from compare.sessions import assign as assign_sessions, label as session_labels
+from compare.sensors import ZEPP_CALC_SIGNALS, ZEPP_SENSOR_SIGNALS, load_task
+from compare.summary import statistics, summaries
+from compare.strokes import STROKE_COLORS, STROKE_LABELS, STROKE_SHAPES
+from compare.timestamps import format_time
+from compare.ziq import add_ziq
 from icecream import ic
 
 st.set_page_config(layout="wide")
 pd.set_option("display.max_columns", None)
-# Data loading and processing function
-@st.cache_data
+# Sources of the dashboard: wrangler name and options
+ZEPP_COLUMNS = ZEPP_SENSOR_SIGNALS + ZEPP_CALC_SIGNALS
+SOURCES = {
+    'Babolat': ('babolat', {}),
+    'Zepp': ('zepp', {'columns': ZEPP_COLUMNS}),
+}
+
+
+# Raw source rows by day, shared by every session and rerun without
+# copying; widening the date range only reads the days not held yet
+@st.cache_resource
+def source_days():
+    return DayCache()
+
+
+def load_raw(paths, start_date, end_date):
+    """Raw frames of each source for [start_date, end_date) and their keys.
+
+    Missing days are read concurrently, one read per contiguous run.
+    """
+    days = source_days()
+    keys = {name: source_key(sensor, paths[name], **options)
+            for name, (sensor, options) in SOURCES.items()}
+    loads = {}
+    for name, (sensor, options) in SOURCES.items():
+        for lo, hi in days.missing(keys[name], start_date, end_date):
+            loads[(name, lo, hi)] = load_task(sensor, paths[name], lo, hi, **options)
+    if loads:
+        # Report every source that fails
+        with stage('load') as s:
+            frames, _ = load_sources(loads, strict=True)
+            for (name, lo, hi), frame in frames.items():
+                days.fill(keys[name], lo, hi, frame)
+            s.rows_out = sum(len(frame) for frame in frames.values())
+    raw = {name: days.frame(keys[name], start_date, end_date) for name in SOURCES}
+    return raw, tuple(keys.values())
+
+
+# The scored and merged frames are keyed by the source versions and the
+# date range, and by the session index the rows are labelled with (the
+# leading underscore keeps Streamlit from hashing the large frames)
+@st.cache_resource(max_entries=8)
+def score_zepp(_dfb, _dfu, keys, start_date, end_date):
+    """Zepp strokes with ZIQ scores, outliers removed."""
+    dfb, dfu = _dfb, _dfu
+    # Add ZIQ calculations
+    with stage('ziq', len(dfu)) as s:
+        dfu = add_ziq(dfb, dfu)
+        s.rows_out = len(dfu)
+    
+    # Remove outliers
+    with stage('outliers', len(dfu)) as s:
+        dfu = dfu[dfu["dbg_acc_1"] < 10000]
+        dfu = dfu[dfu["dbg_acc_3"] < 10000]
+        dfu = dfu[dfu["ZIQ"] < 10000]
+        s.rows_out = len(dfu)
+    return dfu
+
+
+@st.cache_resource(max_entries=8)
+def merge_sources(_dfb, _dfu, keys, start_date, end_date, index):
+    """Zepp strokes joined with the nearest Babolat stroke."""
+    dfb, dfu = _dfb, _dfu
+    # Ensure time columns are properly sorted
+    dfu = dfu.sort_values('time')
+    dfb = dfb.sort_values('time')
+    
+    # Merge datasets: line up the Babolat clock with Zepp, falling
+    # back to the 5 s found by inspection if too few strokes match
+    with stage('offset', len(dfu) + len(dfb)):
+        shift = estimate_offset(dfu['time'], dfb['time'],
+                                default=pd.Timedelta(seconds=5))
+    
+    # Handle stroke columns before merge
+    if 'stroke' in dfu.columns:
+        dfu = dfu.rename(columns={'stroke': 'stroke_zepp'})
+    if 'stroke' in dfb.columns:
+        dfb = dfb.rename(columns={'stroke': 'stroke_bab'})
+    
+    # Perform merge
+    with stage('join', len(dfu) + len(dfb)) as s:
+        dfu_dfb_merge, unmatched = join_streams(
+            Stream(dfu, 'time', name='Zepp'),
+            Stream(dfb, 'time', name='Babolat', offset=shift, tolerance='5s'))
+        s.rows_out = len(dfu_dfb_merge)
+    dfu_dfb_merge.attrs['unmatched'] = unmatched.to_dict('index')
+    
+    # Handle stroke column in merged dataset
+    if 'stroke_zepp' in dfu_dfb_merge.columns and 'stroke_bab' in dfu_dfb_merge.columns:
+        dfu_dfb_merge['stroke'] = dfu_dfb_merge['stroke_zepp'].fillna(dfu_dfb_merge['stroke_bab'])
+        dfu_dfb_merge = dfu_dfb_merge.drop(['stroke_zepp', 'stroke_bab'], axis=1)
+    elif 'stroke_zepp' in dfu_dfb_merge.columns:
+        dfu_dfb_merge = dfu_dfb_merge.rename(columns={'stroke_zepp': 'stroke'})
+    elif 'stroke_bab' in dfu_dfb_merge.columns:
+        dfu_dfb_merge = dfu_dfb_merge.rename(columns={'stroke_bab': 'stroke'})
+    
+    # Sessions of the store's session index, so ids match the sidebar's;
+    # split at long pauses between strokes if no index has been built
+    if len(index):
+        sessions = assign_sessions(dfu_dfb_merge['time'], index)
+    else:
+        sessions = session_labels(dfu_dfb_merge['time'])
+    dfu_dfb_merge['session'] = pd.Categorical(sessions)
+    return dfu_dfb_merge
+
+
+@st.cache_resource(max_entries=8)
+def summarize_merged(_df, columns, keys, start_date, end_date, index):
+    """Summary statistics of the merged frame overall, per session and per stroke."""
+    with stage('summaries', len(_df)):
+        return summaries(_df, list(columns))
+
+
+# Data loading and processing function: every stage is cached on its
+# own, so only the stages whose inputs changed run again
 def load_and_process_data(bab_path, uzepp_path, start_date, end_date):
     try:
         # Convert all inputs to datetime64[ns] format
@@ -37,60 +164,29 @@ def load_and_process_data(bab_path, uzepp_path, start_date, end_date):
         if (end_date - start_date).total_seconds() / (24 * 3600) > 30:
             st.warning("Processing a large date range. This might take longer.")
             
-        # Convert to string format for the API calls
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        # Load data
-        dfb = BabWrangle.BabWrangle(bab_path, start_date, end_date)
-        dfu = UZeppWrangle.UZeppWrangle(uzepp_path, start_date, end_date)
+        # Convert to string format for the cache keys; times of day tell
+        # sessions of the same day apart
+        start_str = start_date.isoformat()
+        end_str = end_date.isoformat()
+        raw, keys = load_raw({'Babolat': bab_path, 'Zepp': uzepp_path},
+                             start_date, end_date)
+        dfb, dfu = raw['Babolat'], raw['Zepp']
         
         # Check if DataFrames are empty
-        if dfb.empty:
+        if dfb is None or dfb.empty:
             raise ValueError("No Babolat data available for the selected date range")
-        if dfu.empty:
+        if dfu is None or dfu.empty:
             raise ValueError("No Zepp data available for the selected date range")
         
-        def normalize_column(dfa, dfb, ref_col, norm_col, new_col_name):
-            min_A = dfa[ref_col].min()
-            max_A = dfa[ref_col].max()
-            min_B = dfb[norm_col].min()
-            max_B = dfb[norm_col].max()
-            
-            # Check for division by zero
-            if max_B == min_B:
-                dfb[new_col_name] = 0
-            else:
-                def normalize(x, min_B, max_B, min_A, max_A):
-                    return ((x - min_B) * (max_A - min_A) / (max_B - min_B)) + min_A
-                dfb[new_col_name] = dfb[norm_col].apply(normalize, args=(min_B, max_B, min_A, max_A))
-
-        # Add ZIQ calculations
-        normalize_column(dfb, dfu, 'EffectScore', 'ball_spin', 'ZIQspin')
-        normalize_column(dfb, dfu, 'SpeedScore', 'racket_speed', 'ZIQspeed')
-        
-        # Calculate impact position scores
-        absx = 0 - dfu['impact_position_x'].abs()
-        absy = 0 - dfu['impact_position_y'].abs()
-        dfu['abs_imp'] = 0 + (absx + absy)
-        normalize_column(dfb, dfu, 'StyleScore', 'abs_imp', 'ZIQpos')
-        
-        # Normalize data
-        dfu.loc[dfu['stroke'] != 'SERVEFH', 'ZIQspin'] = dfu['ZIQspin'] * 2
-        dfu.loc[dfu['stroke'] != 'SERVEFH', 'ZIQspeed'] = dfu['ZIQspeed'] * 1.6
-        dfu['ZIQ'] = dfu['ZIQspeed'] + dfu['ZIQspin'] + dfu['ZIQpos']
-        dfu.loc[dfu['stroke'] == 'SERVEFH', 'ZIQ'] = dfu['ZIQ'] * 0.9
-        
-        # Remove outliers
-        dfu = dfu[dfu["dbg_acc_1"] < 10000]
-        dfu = dfu[dfu["dbg_acc_3"] < 10000]
-        dfu = dfu[dfu["ZIQ"] < 10000]
-        
-        # Ensure time columns are properly sorted
-        dfu = dfu.sort_values('time')
-        dfb = dfb.sort_values('time')
+        dfu = score_zepp(dfb, dfu, keys, start_str, end_str)
+        index = store.sessions()
+        dfu_dfb_merge = merge_sources(dfb, dfu, keys, start_str, end_str, index)
         
         # Updated Zepp U sensor fields
-        zepp_sensor = [col for col in dfu.columns if col not in ['time', 'stroke']]
+        # Numeric columns only: swing_type/hand_type are stroke categoricals
+        # and timestamp is a copy of time
+        zepp_sensor = [col for col in dfu.columns if col not in ['time', 'stroke'] and
+                       pd.api.types.is_numeric_dtype(dfu[col])]
         
         # Updated Babolat sensor fields - include all numeric columns
         bab_sensor = [col for col in dfb.columns if col not in ['time', 'stroke'] and 
@@ -101,41 +197,37 @@ def load_and_process_data(bab_path, uzepp_path, start_date, end_date):
                 'impact_position_y', 'racket_speed', 'impact_region', 'ZIQ',
                 'ZIQspin', 'ZIQspeed', 'ZIQpos']
         
-        # Merge datasets
-        dfb['time'] = dfb['time'] - pd.Timedelta(seconds=5)
-        
-        # Handle stroke columns before merge
-        if 'stroke' in dfu.columns:
-            dfu = dfu.rename(columns={'stroke': 'stroke_zepp'})
-        if 'stroke' in dfb.columns:
-            dfb = dfb.rename(columns={'stroke': 'stroke_bab'})
-        
-        # Perform merge
-        dfu_dfb_merge = pd.merge_asof(dfu, dfb,
-                                   left_on='time',
-                                   right_on='time',
-                                   tolerance=pd.Timedelta('5s'),
-                                   direction='nearest')
-        
-        # Handle stroke column in merged dataset
-        if 'stroke_zepp' in dfu_dfb_merge.columns and 'stroke_bab' in dfu_dfb_merge.columns:
-            dfu_dfb_merge['stroke'] = dfu_dfb_merge['stroke_zepp'].fillna(dfu_dfb_merge['stroke_bab'])
-            dfu_dfb_merge = dfu_dfb_merge.drop(['stroke_zepp', 'stroke_bab'], axis=1)
-        elif 'stroke_zepp' in dfu_dfb_merge.columns:
-            dfu_dfb_merge = dfu_dfb_merge.rename(columns={'stroke_zepp': 'stroke'})
-        elif 'stroke_bab' in dfu_dfb_merge.columns:
-            dfu_dfb_merge = dfu_dfb_merge.rename(columns={'stroke_bab': 'stroke'})
-        
         # Verify which columns actually exist in the merged DataFrame
         zepp_sensor = [col for col in zepp_sensor if col in dfu_dfb_merge.columns]
         bab_sensor = [col for col in bab_sensor if col in dfu_dfb_merge.columns]
         calc = [col for col in calc if col in dfu_dfb_merge.columns]
         
-        return dfu_dfb_merge, zepp_sensor, bab_sensor, calc
+        # Statistics for the stats panels, computed once per loaded range
+        summary_cols = tuple(dict.fromkeys(zepp_sensor + bab_sensor + calc))
+        summary = summarize_merged(dfu_dfb_merge, summary_cols, keys, start_str, end_str, index)
+        
+        return dfu_dfb_merge, zepp_sensor, bab_sensor, calc, summary
         
     except Exception as e:
         raise Exception(f"Error processing data: {str(e)}")
 
+def show_summary(summary, columns, key, strokes=None):
+    """
+    Show the precomputed statistics of columns over the loaded range: all
+    rows, or one row per session or per stroke (of strokes, if given)
+    side by side
+    """
+    scope = st.radio("Summarize", ["All", "Per session", "Per stroke"], horizontal=True,
+                     key=f"{key}_summary")
+    if scope == "All":
+        st.dataframe(summary['all'][columns])
+        return
+    table = summary['session' if scope == "Per session" else 'stroke'][columns]
+    groups = table.index.get_level_values(0).unique()
+    if scope == "Per stroke" and strokes is not None:
+        groups = [g for g in groups if g in strokes]
+    st.dataframe(statistics(table, groups))
+
 def create_stroke_selection(tab_prefix):
     """
     Create a unified stroke selection interface
@@ -143,65 +235,68 @@ def create_stroke_selection(tab_prefix):
     Parameters:
     tab_prefix (str): Prefix for the checkbox keys to avoid duplicates across tabs
     """
-    all_strokes = {
-        'SERVEFH': 'Serve',
-        'SLICEBH': 'Backhand Slice',
-        'SLICEFH': 'Forehand Slice',
-        'TOPSPINFH': 'Forehand Topspin',
-        'TOPSPINBH': 'Backhand Topspin',
-        'FLATBH': 'Backhand Flat',
-        'FLATFH': 'Forehand Flat'
-    }
-    
     selected_strokes = []
     cols = st.columns(4)  # Adjust number of columns as needed
-    for i, (stroke_key, stroke_name) in enumerate(all_strokes.items()):
+    for i, (stroke_key, stroke_name) in enumerate(STROKE_LABELS.items()):
         if cols[i % 4].checkbox(stroke_name, value=True, key=f"{tab_prefix}_stroke_{stroke_key}"):
             selected_strokes.append(stroke_key)
     
     return selected_strokes
 
-def create_scatter_plot(df, signals, separate_strokes, color_by_stroke, selected_strokes, title):
+def stroke_groups(df, window=None):
+    """
+    StrokeGroups of the loaded frame within the time window, kept in the
+    session and rebuilt only when the data or the window changes, so
+    reruns reuse its stroke rows and figures
+    """
+    cached = st.session_state.get('stroke_groups')
+    if cached is None or cached[0] is not df or cached[1] != window:
+        frame = df.sort_values('time')
+        if window is not None:
+            frame = frame.iloc[window_index(frame['time'], *window)]
+        cached = (df, window, StrokeGroups(frame))
+        st.session_state['stroke_groups'] = cached
+    return cached[2]
+
+def scatter_mode(separate_strokes, color_by_stroke):
+    return 'separate' if separate_strokes else 'color' if color_by_stroke else 'line'
+
+def plot_points(groups, selected_strokes, traces, markers, max_points):
+    """
+    Points a figure draws: every row of the selected strokes per trace when
+    stroke markers are drawn, else the decimated line
+    """
+    if markers:
+        return len(groups.rows(selected_strokes)) * traces
+    return min(len(groups.frame), max_points) * traces
+
+def create_scatter_plot(groups, signals, separate_strokes, color_by_stroke, selected_strokes, title,
+                        max_points=DEFAULT_BUDGET, webgl=False):
     """
     Create a scatter plot for signal visualization with consistent stroke separation
-    and connected lines
+    and connected lines. Plain lines are decimated to max_points; stroke
+    markers are always drawn in full. webgl draws WebGL (Scattergl) traces.
     """
     fig = go.Figure()
+    scatter = go.Scattergl if webgl else go.Scatter
     
-    # Sort DataFrame by time to ensure proper line connections
-    df = df.sort_values('time')
-    
-    # Define shapes and colors for different strokes
-    shape_map = {
-        'SERVEFH': 'star',
-        'SLICEBH': 'diamond',
-        'SLICEFH': 'diamond-open',
-        'TOPSPINFH': 'pentagon',
-        'TOPSPINBH': 'pentagon-open',
-        'FLATBH': 'square',
-        'FLATFH': 'square-open'
-    }
+    # Rows sorted by time once per dataset, for proper line connections
+    df = groups.frame
     
-    colors = {
-        'SERVEFH': '#FF1F5B',    # bright red
-        'SLICEBH': '#009ADE',    # bright blue
-        'SLICEFH': '#F28522',    # orange
-        'TOPSPINFH': '#85D4E3',  # light blue
-        'TOPSPINBH': '#B4DC7F',  # light green
-        'FLATBH': '#9B7EDE',     # purple
-        'FLATFH': '#EFB435'      # yellow
-    }
+    # Shapes and colors for different strokes
+    shape_map = STROKE_SHAPES
+    colors = STROKE_COLORS
     
     if separate_strokes:
         # Original behavior: separate lines for each stroke
         for stroke in selected_strokes:
-            stroke_df = df[df['stroke'] == stroke].copy()
+            stroke_df = groups.rows(stroke)
             
             for signal in signals:
                 trace_name = f"{signal} - {stroke}"
                 
                 fig.add_trace(
-                    go.Scatter(
+                    scatter(
                         x=stroke_df['time'],
                         y=stroke_df[signal],
                         name=trace_name,
@@ -225,10 +320,10 @@ def create_scatter_plot(df, signals, separate_strokes, color_by_stroke, selected
             if color_by_stroke:
                 # One line but colored points by stroke
                 for stroke in selected_strokes:
-                    stroke_df = df[df['stroke'] == stroke].copy()
+                    stroke_df = groups.rows(stroke)
                     
                     fig.add_trace(
-                        go.Scatter(
+                        scatter(
                             x=stroke_df['time'],
                             y=stroke_df[signal],
                             name=f"{signal} - {stroke}",
@@ -244,10 +339,11 @@ def create_scatter_plot(df, signals, separate_strokes, color_by_stroke, selected
                     )
                 
                 # Add a single connecting line
+                line_df = decimate_frame(df, 'time', signal, max_points)
                 fig.add_trace(
-                    go.Scatter(
-                        x=df['time'],
-                        y=df[signal],
+                    scatter(
+                        x=line_df['time'],
+                        y=line_df[signal],
                         name=signal,
                         mode='lines',
                         line=dict(
@@ -260,10 +356,11 @@ def create_scatter_plot(df, signals, separate_strokes, color_by_stroke, selected
                 )
             else:
                 # Single color line with markers
+                line_df = decimate_frame(df, 'time', signal, max_points)
                 fig.add_trace(
-                    go.Scatter(
-                        x=df['time'],
-                        y=df[signal],
+                    scatter(
+                        x=line_df['time'],
+                        y=line_df[signal],
                         name=signal,
                         mode='lines+markers',
                         marker=dict(
@@ -309,124 +406,127 @@ def create_scatter_plot(df, signals, separate_strokes, color_by_stroke, selected
     
     return fig
 
-def create_correlation_plot(df, x_signal, y_signal, separate_strokes):
+def correlation_trace(scatter, stroke_df, x_signal, y_signal, **kwargs):
+    """Scatter of y_signal against x_signal, hovering time and stroke"""
+    return scatter(
+        x=stroke_df[x_signal],
+        y=stroke_df[y_signal],
+        customdata=np.column_stack([format_time(stroke_df['time']), stroke_df['stroke']]),
+        hovertemplate=(
+            f"{x_signal}: %{{x}}<br>" +
+            f"{y_signal}: %{{y}}<br>" +
+            "Time: %{customdata[0]}<br>" +
+            "Stroke: %{customdata[1]}<br>" +
+            "<extra></extra>"
+        ),
+        **kwargs
+    )
+
+def create_correlation_plot(groups, x_signals, y_signals, separate_strokes, selected_strokes,
+                            max_points=DEFAULT_BUDGET, webgl=False):
     """
-    Create a correlation scatter plot that maintains temporal sequence
-    while distinguishing strokes by color/shape
+    Create one figure of correlation scatter plots, a subplot per y (row)
+    and x (column) signal with shared axes, that maintain temporal sequence
+    while distinguishing strokes by color/shape. The temporal sequence line
+    is decimated to max_points; stroke markers are always drawn in full.
+    webgl draws WebGL (Scattergl) traces.
     """
-    fig = go.Figure()
-    
-    # Sort DataFrame by time for proper temporal sequence
-    df = df.sort_values('time')
+    scatter = go.Scattergl if webgl else go.Scatter
+    rows, cols = len(y_signals), len(x_signals)
+    fig = make_subplots(rows=rows, cols=cols, shared_xaxes='columns', shared_yaxes='rows',
+                        horizontal_spacing=0.04 if cols > 1 else 0,
+                        vertical_spacing=0.06 if rows > 1 else 0)
     
-    # Define shapes and colors for different strokes
-    shape_map = {
-        'SERVEFH': 'star',
-        'SLICEBH': 'diamond',
-        'SLICEFH': 'diamond-open',
-        'TOPSPINFH': 'pentagon',
-        'TOPSPINBH': 'pentagon-open',
-        'FLATBH': 'square',
-        'FLATFH': 'square-open'
-    }
+    # Rows of the selected strokes, sorted by time once per dataset
+    df = groups.rows(selected_strokes)
     
-    colors = {
-        'SERVEFH': '#FF1F5B',    # bright red
-        'SLICEBH': '#009ADE',    # bright blue
-        'SLICEFH': '#F28522',    # orange
-        'TOPSPINFH': '#85D4E3',  # light blue
-        'TOPSPINBH': '#B4DC7F',  # light green
-        'FLATBH': '#9B7EDE',     # purple
-        'FLATFH': '#EFB435'      # yellow
-    }
+    # Shapes and colors for different strokes
+    shape_map = STROKE_SHAPES
+    colors = STROKE_COLORS
     
-    if separate_strokes:
-        # Create a single trace for the connecting line (temporal sequence)
-        fig.add_trace(
-            go.Scatter(
-                x=df[x_signal],
-                y=df[y_signal],
-                mode='lines',
-                line=dict(
-                    color='lightgray',
-                    width=1,
-                    dash='dot'
-                ),
-                name='Temporal Sequence',
-                hoverinfo='skip'
-            )
-        )
-        
-        # Add scatter points for each stroke type
-        for stroke in df['stroke'].unique():
-            stroke_df = df[df['stroke'] == stroke].copy()
+    for row, y_signal in enumerate(y_signals, start=1):
+        for col, x_signal in enumerate(x_signals, start=1):
+            # Keep the extremes of both signals along the temporal sequence
+            line_df = decimate_frame(df, 'time', [x_signal, y_signal], max_points)
+            # One legend entry per trace kind across the grid
+            first = row == 1 and col == 1
             
-            fig.add_trace(
-                go.Scatter(
-                    x=stroke_df[x_signal],
-                    y=stroke_df[y_signal],
-                    name=stroke,
-                    mode='markers',
-                    marker=dict(
-                        symbol=shape_map.get(stroke, 'circle'),
-                        size=10,
-                        color=colors.get(stroke, '#000000'),
-                        line=dict(width=1, color='white')
+            if separate_strokes:
+                # Create a single trace for the connecting line (temporal sequence)
+                fig.add_trace(
+                    scatter(
+                        x=line_df[x_signal],
+                        y=line_df[y_signal],
+                        mode='lines',
+                        line=dict(
+                            color='lightgray',
+                            width=1,
+                            dash='dot'
+                        ),
+                        name='Temporal Sequence',
+                        legendgroup='Temporal Sequence',
+                        showlegend=first,
+                        hoverinfo='skip'
                     ),
-                    customdata=stroke_df[['time', 'stroke']].values,
-                    hovertemplate=(
-                        f"{x_signal}: %{{x}}<br>" +
-                        f"{y_signal}: %{{y}}<br>" +
-                        "Time: %{customdata[0]}<br>" +
-                        "Stroke: %{customdata[1]}<br>" +
-                        "<extra></extra>"
-                    )
+                    row=row, col=col
                 )
-            )
-    else:
-        fig.add_trace(
-            go.Scatter(
-                x=df[x_signal],
-                y=df[y_signal],
-                mode='lines+markers',
-                marker=dict(
-                    size=10,
-                    color=list(colors.values())[0],
-                    line=dict(width=1, color='white')
-                ),
-                line=dict(
-                    color=list(colors.values())[0],
-                    width=2
-                ),
-                name='All strokes',
-                customdata=df[['time', 'stroke']].values,
-                hovertemplate=(
-                    f"{x_signal}: %{{x}}<br>" +
-                    f"{y_signal}: %{{y}}<br>" +
-                    "Time: %{customdata[0]}<br>" +
-                    "Stroke: %{customdata[1]}<br>" +
-                    "<extra></extra>"
+                
+                # Add scatter points for each stroke type
+                for stroke in selected_strokes:
+                    stroke_df = groups.rows(stroke)
+                    if stroke_df.empty:
+                        continue
+                    
+                    fig.add_trace(
+                        correlation_trace(
+                            scatter, stroke_df, x_signal, y_signal,
+                            name=stroke,
+                            legendgroup=stroke,
+                            showlegend=first,
+                            mode='markers',
+                            marker=dict(
+                                symbol=shape_map.get(stroke, 'circle'),
+                                size=10,
+                                color=colors.get(stroke, '#000000'),
+                                line=dict(width=1, color='white')
+                            )
+                        ),
+                        row=row, col=col
+                    )
+            else:
+                fig.add_trace(
+                    correlation_trace(
+                        scatter, line_df, x_signal, y_signal,
+                        mode='lines+markers',
+                        marker=dict(
+                            size=10,
+                            color=list(colors.values())[0],
+                            line=dict(width=1, color='white')
+                        ),
+                        line=dict(
+                            color=list(colors.values())[0],
+                            width=2
+                        ),
+                        name='All strokes',
+                        legendgroup='All strokes',
+                        showlegend=first
+                    ),
+                    row=row, col=col
                 )
-            )
-        )
+            
+            # Axis titles on the outer edges of the grid
+            if row == rows:
+                fig.update_xaxes(title_text=x_signal, row=row, col=col)
+            if col == 1:
+                fig.update_yaxes(title_text=y_signal, row=row, col=col)
     
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
     fig.update_layout(
-        title=f"{y_signal} vs {x_signal}",
-        xaxis_title=x_signal,
-        yaxis_title=y_signal,
-        height=600,
+        title=f"{y_signals[0]} vs {x_signals[0]}" if rows * cols == 1 else "Metric Correlations",
+        height=max(600, 350 * rows),
         plot_bgcolor='white',
         paper_bgcolor='white',
-        xaxis=dict(
-            showgrid=True,
-            gridwidth=1,
-            gridcolor='lightgray'
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridwidth=1,
-            gridcolor='lightgray'
-        ),
         legend=dict(
             yanchor="top",
             y=0.99,
@@ -445,40 +545,116 @@ st.sidebar.header("Data Loading")
 bab_path = st.sidebar.text_input("Babolat Sensor Path", "/home/blueaz/Python/Sensors/Bab/BabWrangle/src/BabPopExt.db")
 uzepp_path = st.sidebar.text_input("Zepp U Sensor Path", "/home/blueaz/Downloads/SensorDownload/Compare/ztennis2.db")
 
-start_date = st.sidebar.date_input("Start Date", datetime(2024, 6, 12))
-end_date = st.sidebar.date_input("End Date", datetime(2024, 6, 14))
+# Sessions from the index built by `python -m compare.sessions`; a
+# session loads its own time window instead of the date range. Only
+# sessions with both sensors can be compared
+session_index = store.sessions()
+session_index = session_index[session_index['sensors'].str.split(',').map(
+    lambda sensors: {'babolat', 'zepp'} <= set(sensors))]
+session_choices = ["Date range"] + list(session_index.index)
+session = st.sidebar.selectbox(
+    "Session", session_choices,
+    format_func=lambda sid: sid if sid == "Date range" else "%s  %s-%s  %d strokes  (%s)" % (
+        sid, session_index.at[sid, 'start'].strftime('%H:%M'),
+        session_index.at[sid, 'end'].strftime('%H:%M'),
+        session_index.at[sid, 'strokes'], session_index.at[sid, 'sensors']),
+    disabled=session_index.empty,
+    help="Build the index with python -m compare.sessions babolat=... zepp=...")
+
+start_date = st.sidebar.date_input("Start Date", datetime(2024, 6, 12),
+                                   disabled=session != "Date range")
+end_date = st.sidebar.date_input("End Date", datetime(2024, 6, 14),
+                                 disabled=session != "Date range")
+if session == "Date range":
+    load_start, load_end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+else:
+    load_start, load_end = store.session_window(session)
 
 # Add date validation before the load button
-if start_date > end_date:
+if load_start > load_end:
     st.sidebar.error("⚠️ Start date must be before end date")
-elif (end_date - start_date).days > 30:  # Optional: Add a maximum date range
+elif (load_end - load_start).days > 30:  # Optional: Add a maximum date range
     st.sidebar.warning("⚠️ Date range exceeds 30 days. This might take longer to process.")
 
+# Per-stage timings of the next load; off, the stage hooks do nothing
+profile_panel = st.sidebar.expander("Profiling")
+with profile_panel:
+    profile_stages = st.checkbox("Record stage timings", value=False)
+    profile_memory = st.checkbox("Track peak memory (tracemalloc, slower)", value=False,
+                                 disabled=not profile_stages)
+    profile_dump = st.text_input("cProfile output file", "",
+                                 disabled=not profile_stages,
+                                 help="Write cProfile stats of the load, e.g. load.prof")
+    profile_snapshot = st.text_input("tracemalloc snapshot file", "",
+                                     disabled=not profile_stages,
+                                     help="Dump the allocations left after the load")
+
 # Only show the load button if dates are valid
-if start_date <= end_date:
+if load_start <= load_end:
     if st.sidebar.button("Load Data"):
         try:
-            df, zepp_sensor_cols, bab_sensor_cols, calc_cols = load_and_process_data(
-                bab_path, uzepp_path, 
-                start_date.strftime('%Y-%m-%d'),
-                end_date.strftime('%Y-%m-%d')
-            )
+            with profiling(memory=profile_memory, cprofile=profile_dump or None,
+                           snapshot=profile_snapshot or None) \
+                    if profile_stages else nullcontext() as run:
+                df, zepp_sensor_cols, bab_sensor_cols, calc_cols, summary = load_and_process_data(
+                    bab_path, uzepp_path, 
+                    load_start, load_end
+                )
+            st.session_state['profile'] = run.frame() if run else None
             
             # Store the data in session state
             st.session_state['df'] = df
             st.session_state['zepp_sensor_cols'] = zepp_sensor_cols
             st.session_state['bab_sensor_cols'] = bab_sensor_cols
             st.session_state['calc_cols'] = calc_cols
+            st.session_state['summary'] = summary
             st.success("Data loaded successfully!")
+            unmatched = df.attrs.get('unmatched')
+            if unmatched is not None:
+                st.caption("%d of %d Zepp strokes have no Babolat match" %
+                           (unmatched['Babolat']['unmatched'], len(df)))
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
-            st.info("Try selecting a different date range or check if the data files exist")
+            st.info("Try selecting a different date range or session, or check if the data files exist")
+
+with profile_panel:
+    profile_frame = st.session_state.get('profile')
+    if profile_frame is not None:
+        if profile_frame.empty:
+            st.caption("Last load was served from the cache, no stages ran")
+        else:
+            st.dataframe(profile_frame, hide_index=True)
 
 if 'df' in st.session_state:
     df = st.session_state['df']
     zepp_sensor_cols = st.session_state['zepp_sensor_cols']
     bab_sensor_cols = st.session_state['bab_sensor_cols']
     calc_cols = st.session_state['calc_cols']
+    summary = st.session_state['summary']
+    
+    # Plot resolution: lines are decimated to the point budget, so narrowing
+    # the time window brings back full resolution
+    st.sidebar.header("Plot Settings")
+    max_points = st.sidebar.number_input("Max points per line", min_value=100,
+                                         value=DEFAULT_BUDGET, step=500)
+    # WebGL keeps large stroke scatters responsive; auto switches per figure
+    renderer = st.sidebar.selectbox("Renderer", RENDERERS,
+                                    format_func={'auto': "Auto", 'svg': "SVG",
+                                                 'webgl': "WebGL"}.get)
+    webgl_points = st.sidebar.number_input("WebGL above points", min_value=0,
+                                           value=WEBGL_POINTS, step=5000,
+                                           disabled=renderer != 'auto')
+    window = None
+    if len(df) > 1:
+        t_min, t_max = df['time'].min().to_pydatetime(), df['time'].max().to_pydatetime()
+        if t_min < t_max:
+            window = st.sidebar.slider("Time window", min_value=t_min, max_value=t_max,
+                                       value=(t_min, t_max), format="MM/DD HH:mm")
+            if window == (t_min, t_max):
+                window = None
+    # Sorted once, with the row positions of every stroke, per data and window
+    groups = stroke_groups(df, window)
+    df = groups.frame
     
     # Create tabs for different visualizations
     tab1, tab2, tab3 = st.tabs(["Babolat Signals", "Zepp U Signals", "Merged Analysis"])
@@ -506,19 +682,29 @@ if 'df' in st.session_state:
             )
             
             if selected_bab_signals:
-                fig_bab = create_scatter_plot(
-                    df, 
-                    selected_bab_signals, 
-                    separate_strokes_bab,
-                    color_by_stroke_bab,
-                    selected_strokes_bab,
-                    "Babolat Signals"
-                )
+                # Rebuilt only when the selection changes
+                mode_bab = scatter_mode(separate_strokes_bab, color_by_stroke_bab)
+                webgl_bab = use_webgl(
+                    plot_points(groups, selected_strokes_bab, len(selected_bab_signals),
+                                mode_bab != 'line', max_points),
+                    renderer, webgl_points)
+                fig_bab = groups.figure(
+                    ('bab', tuple(selected_bab_signals), tuple(selected_strokes_bab),
+                     mode_bab, max_points, webgl_bab),
+                    lambda: create_scatter_plot(
+                        groups, 
+                        selected_bab_signals, 
+                        separate_strokes_bab,
+                        color_by_stroke_bab,
+                        selected_strokes_bab,
+                        "Babolat Signals",
+                        max_points,
+                        webgl_bab
+                    ))
                 st.plotly_chart(fig_bab, use_container_width=True)              
                 # Summary stats for Babolat signals
                 st.header("Babolat Summary Statistics")
-                bab_stats = df[available_bab_cols].describe()
-                st.dataframe(bab_stats)
+                show_summary(summary, available_bab_cols, "bab", selected_strokes_bab)
             else:
                 st.warning("No Babolat signals available in the data")
         
@@ -545,20 +731,30 @@ if 'df' in st.session_state:
             )
             
             if selected_zepp_signals:
-                fig_zepp = create_scatter_plot(
-                    df, 
-                    selected_zepp_signals,
-                    separate_strokes_zepp,
-                    color_by_stroke_zepp,
-                    selected_strokes_zepp,
-                    "Zepp U Signals"
-                )
+                # Rebuilt only when the selection changes
+                mode_zepp = scatter_mode(separate_strokes_zepp, color_by_stroke_zepp)
+                webgl_zepp = use_webgl(
+                    plot_points(groups, selected_strokes_zepp, len(selected_zepp_signals),
+                                mode_zepp != 'line', max_points),
+                    renderer, webgl_points)
+                fig_zepp = groups.figure(
+                    ('zepp', tuple(selected_zepp_signals), tuple(selected_strokes_zepp),
+                     mode_zepp, max_points, webgl_zepp),
+                    lambda: create_scatter_plot(
+                        groups, 
+                        selected_zepp_signals,
+                        separate_strokes_zepp,
+                        color_by_stroke_zepp,
+                        selected_strokes_zepp,
+                        "Zepp U Signals",
+                        max_points,
+                        webgl_zepp
+                    ))
                 st.plotly_chart(fig_zepp, use_container_width=True)
             
             # Summary stats for Zepp U signals
             st.header("Zepp U Summary Statistics")
-            zepp_stats = df[available_zepp_cols].describe()
-            st.dataframe(zepp_stats)
+            show_summary(summary, available_zepp_cols, "zepp", selected_strokes_zepp)
         else:
             st.warning("No Zepp U signals available in the data")
     
@@ -599,28 +795,38 @@ if 'df' in st.session_state:
                 )
             
             if x_signals and y_signals:
-                # Filter DataFrame based on selected strokes
-                df_filtered = df[df['stroke'].isin(selected_strokes_merged)]
+                # Rows of the selected strokes
+                df_filtered = groups.rows(selected_strokes_merged)
                 
                 if df_filtered.empty:
                     st.warning("No data available for the selected strokes")
                 else:
-                    for x_signal in x_signals:
-                        for y_signal in y_signals:
-                            fig_merged = create_correlation_plot(
-                                df_filtered,  # Use filtered DataFrame
-                                x_signal,
-                                y_signal,
-                                separate_strokes_merged
-                            )
-                            st.plotly_chart(fig_merged, use_container_width=True)           
+                    # Every x/y pair in one figure of shared-axis subplots
+                    webgl_merged = use_webgl(
+                        plot_points(groups, selected_strokes_merged,
+                                    len(x_signals) * len(y_signals),
+                                    separate_strokes_merged, max_points),
+                        renderer, webgl_points)
+                    fig_merged = groups.figure(
+                        ('merged', tuple(x_signals), tuple(y_signals),
+                         tuple(selected_strokes_merged), separate_strokes_merged, max_points,
+                         webgl_merged),
+                        lambda: create_correlation_plot(
+                            groups,
+                            x_signals,
+                            y_signals,
+                            separate_strokes_merged,
+                            selected_strokes_merged,
+                            max_points,
+                            webgl_merged
+                        ))
+                    st.plotly_chart(fig_merged, use_container_width=True)           
             
             # Summary statistics for calculated fields
             if calc_cols:
                 st.header("Calculated Metrics Summary Statistics")
-                # Update summary stats to use filtered DataFrame
-                summary_stats = df_filtered[calc_cols].describe()
-                st.dataframe(summary_stats)
+                # Precomputed, so shown whether or not metrics are plotted
+                show_summary(summary, calc_cols, "merged", selected_strokes_merged)
         else:
             st.warning("No metrics available for analysis")
 else:
@@ -5,50 +5,42 @@ import matplotlib.pyplot as plt
 import numpy as np
 import plotly.express as px
 import pytz
-import UZeppWrangle
-import WatchWrangle
-import BabWrangle
 import plotly.graph_objects as go
 import subprocess
 from IPython.display import display
+from compare.align import estimate_offset, impact_times
+from compare.decimate import decimate_frame, nearest_index
+from compare.features import FEATURES, add_stroke_features
+from compare.join import Stream, join_streams
+from compare.parallel import load_sources
+from compare.sensors import load_task
+from compare.store import session_window
+from compare.ziq import add_ziq, normalize_columns
 
+# Sessions from the index, built with
+#     python -m compare.sessions babolat=... zepp=... watch=...
+# before running this script; until then the date window is used
+sessions = ['2024-06-12.1', '2024-06-13.1']
+start_date, end_date = session_window(sessions, default=('2024-06-12', '2024-06-14'))
 # Path for all three sensors
 Apple_path = "/home/blueaz/Downloads/SensorDownload/Compare/WristMotion.csv"
 Bab_path = "/home/blueaz/Python/Sensors/Bab/BabWrangle/src/BabPopExt.db"
 UZepp_path = "/home/blueaz/Downloads/SensorDownload/Compare/ztennis.db"
 
-dfa = WatchWrangle.WatchWrangle(Apple_path) 
-dfb = BabWrangle.BabWrangle(Bab_path) 
-dfu = UZeppWrangle.UZeppWrangle(UZepp_path) 
+# The three sources are independent: load them concurrently, parsing the
+# watch CSV in its own process
+frames, _ = load_sources({
+    'watch': load_task('watch', Apple_path, start_date, end_date),
+    'babolat': load_task('babolat', Bab_path, start_date, end_date),
+    'zepp': load_task('zepp', UZepp_path, start_date, end_date),
+}, strict=True)
+dfa, dfb, dfu = frames['watch'], frames['babolat'], frames['zepp']
 pd.set_option('display.max_columns', 100)
 pd.set_option('display.max_rows', 300)
 
-# General normalization function - written by GPT-4o
-# Normalizes a column based on limits from another dataframe
-def normalize_column(dfa, dfb, ref_col, norm_col, new_col_name):
-    min_A = dfa[ref_col].min()
-    max_A = dfa[ref_col].max()
-    min_B = dfb[norm_col].min()
-    max_B = dfb[norm_col].max()
-    def normalize(x, min_B, max_B, min_A, max_A):
-        return ((x - min_B) * (max_A - min_A) / (max_B - min_B)) + min_A
-    dfb[new_col_name] = dfb[norm_col].apply(normalize,
-                                            args=(min_B, max_B, min_A, max_A))
-
 # Add ZIQ value to Zepp U sensor
 # ZIQ is based on PIQ & roughly grades a tennis shot on power, spin, and sweet spot
-normalize_column(dfb, dfu, 'EffectScore', 'ball_spin', 'ZIQspin')
-normalize_column(dfb, dfu, 'SpeedScore', 'racket_speed', 'ZIQspeed')
-# Penalty function for center contact. Using Absolute value
-absx = 0 - dfu['impact_position_x'].abs()
-absy = 0 - dfu['impact_position_y'].abs()
-dfu['abs_imp'] = 0 + (absx + absy)
-normalize_column(dfb, dfu, 'StyleScore', 'abs_imp', 'ZIQpos')
-#Normalize data based on inspection values chosen previously
-dfu.loc[dfu['stroke'] != 'SERVEFH', 'ZIQspin'] = dfu['ZIQspin'] * 2
-dfu.loc[dfu['stroke'] != 'SERVEFH', 'ZIQspeed'] = dfu['ZIQspeed'] * 1.6 
-dfu['ZIQ'] = dfu['ZIQspeed'] + dfu['ZIQspin'] + dfu['ZIQpos']
-dfu.loc[dfu['stroke'] == 'SERVEFH', 'ZIQ'] = dfu['ZIQ'] * .9 
+dfu = add_ziq(dfb, dfu)
 # Remove outliers found during data visualization
 dfu = dfu[dfu["dbg_acc_1"] < 10000]
 dfu = dfu[dfu["dbg_acc_3"] < 10000]
@@ -66,55 +58,70 @@ calc = [ 'backswing_time', 'power', 'ball_spin',
 df_sensor = dfu[sensor]
 df_calc = dfu[calc]
 
-# Estimated by inspection to properly line up clocks
+# Line up the Babolat clock with Zepp; 5 s (found by inspection) if
+# too few strokes match to estimate it
 tolerance = pd.Timedelta('5s')
-shift = 5 
-dfb['time'] = dfb['time'] - pd.Timedelta(seconds=shift) 
+shift = estimate_offset(dfu['time'], dfb['time'], default=pd.Timedelta(seconds=5))
 
-dfu_dba_merge = pd.merge_asof(dfu, dfb,
-                          left_on='time',
-                          right_on='time',
-                          tolerance=tolerance,
-                          direction='nearest')
+dfu_dba_merge, unmatched = join_streams(
+    Stream(dfu, 'time', name='zepp'),
+    Stream(dfb, 'time', name='babolat', offset=shift, tolerance=tolerance))
+print(unmatched)
 
-# Estimated by inspection
+# Line up the watch clock with Zepp by matching strokes to wrist
+# impact peaks; 1 s (found by inspection) if too few strokes match
 tolerance = pd.Timedelta('5s')
-shift = -1 
+shift = estimate_offset(impact_times(dfa), df_sensor['timestamp'],
+                        default=pd.Timedelta(seconds=1))
+
+# Both timestamps are already tz-naive local datetime64; the joined
+# timestamp is the watch time moved onto the Zepp clock
+df_merged, unmatched = join_streams(
+    Stream(dfa, 'timestamp', name='watch', offset=-shift),
+    Stream(df_sensor, 'timestamp', name='zepp', tolerance=tolerance))
+print(unmatched)
 
-# Ensure the timestamps are in the same format
-dfa['timestamp'] = pd.to_datetime(dfa['timestamp'])
-df_sensor['timestamp'] = pd.to_datetime(df_sensor['timestamp'])
-dfa['timestamp'] = dfa['timestamp'] - pd.Timedelta(seconds=shift) 
+# Rescale watch signals onto the Zepp sensor ranges (Zepp column, watch column)
+watch_norm = normalize_columns(df_sensor, df_merged, {
+    # 'RRXNorm1': ('dbg_acc_1', 'rotationRateX'),
+    # 'RRXNorm2': ('dbg_acc_2', 'rotationRateY'),
+    # 'RRXNorm3': ('dbg_acc_3', 'rotationRateZ'),
+    'AccXNorm1': ('dbg_acc_1', 'accelerationX'),
+    # 'AccXNorm2': ('dbg_acc_2', 'accelerationY'),
+    # 'AccXNorm3': ('dbg_acc_3', 'accelerationZ'),
+    # 'AccMax1': ('dbg_max_ax', 'accelerationX'),
+    # 'AccMax2': ('dbg_max_ay', 'accelerationY'),
+    # 'AccMax3': ('dbg_max_az', 'accelerationZ'),
+    # 'GravXNorm1': ('dbg_acc_1', 'gravityX'),
+    # 'GravXNorm2': ('dbg_acc_2', 'gravityY'),
+    # 'GravXNorm3': ('dbg_acc_3', 'gravityZ'),
+    'Gyro1Norm1': ('dbg_gyro_1', 'accelerationX'),
+    # 'Gyro2Norm2': ('dbg_gyro_2', 'accelerationX'),
+    # 'gyNorm': ('dbg_sum_gy', 'accelerationX'),
+})
+df_merged = df_merged.assign(**watch_norm)
 
-df_merged = pd.merge_asof(dfa, df_sensor,
-                          left_on='timestamp',
-                          right_on='timestamp',
-                          tolerance=tolerance,
-                          direction='nearest')
+# Wrist motion features of +/-250 ms around each stroke, joined back to the
+# Zepp/Babolat rows (df_merged timestamps are on the Zepp clock)
+dfu_dba_merge = add_stroke_features(dfu_dba_merge, df_merged)
+print(dfu_dba_merge[['stroke'] + ['accelerationX_' + f for f in FEATURES]]
+      .groupby('stroke', observed=True).mean())
 
-# normalize_column(df_sensor, df_merged, 'dbg_acc_1', 'rotationRateX', 'RRXNorm1')
-# normalize_column(df_sensor, df_merged, 'dbg_acc_2', 'rotationRateY', 'RRXNorm2')
-# normalize_column(df_sensor, df_merged, 'dbg_acc_3', 'rotationRateZ', 'RRXNorm3')
-normalize_column(df_sensor, df_merged, 'dbg_acc_1', 'accelerationX', 'AccXNorm1')
-# normalize_column(df_sensor, df_merged, 'dbg_acc_2', 'accelerationY', 'AccXNorm2')
-# normalize_column(df_sensor, df_merged, 'dbg_acc_3', 'accelerationZ', 'AccXNorm3')
-# normalize_column(df_sensor, df_merged, 'dbg_max_ax', 'accelerationX', 'AccMax1')
-# normalize_column(df_sensor, df_merged, 'dbg_max_ay', 'accelerationY', 'AccMax2')
-# normalize_column(df_sensor, df_merged, 'dbg_max_az', 'accelerationZ', 'AccMax3')
-# normalize_column(df_sensor, df_merged, 'dbg_acc_1', 'gravityX', 'GravXNorm1')
-# normalize_column(df_sensor, df_merged, 'dbg_acc_2', 'gravityY', 'GravXNorm2')
-# normalize_column(df_sensor, df_merged, 'dbg_acc_3', 'gravityZ', 'GravXNorm3')
-normalize_column(df_sensor, df_merged, 'dbg_gyro_1', 'accelerationX', 'Gyro1Norm1')
-# normalize_column(df_sensor, df_merged, 'dbg_gyro_2', 'accelerationX', 'Gyro2Norm2')
-# normalize_column(df_sensor, df_merged, 'dbg_sum_gy', 'accelerationX', 'gyNorm')
+# Decimate the watch signals for plotting, keeping the samples at Zepp
+# strokes. Set plot_window to a (start, end) pair to see a stretch at
+# full resolution.
+plot_window = None
+stroke_rows = nearest_index(df_merged['timestamp'], df_sensor['timestamp'])
+df_plot = decimate_frame(df_merged, 'timestamp', ['AccXNorm1', 'Gyro1Norm1'],
+                         keep=stroke_rows, x_range=plot_window)
 
 # Create the first line plot
-fig = px.line(df_merged, x="timestamp", 
+fig = px.line(df_plot, x="timestamp", 
               y="AccXNorm1", title="Apple Watch Accelerometer")
 # Add the second line plot
 fig.add_trace(
-    go.Scatter(x=df_merged["timestamp"],
-               y=df_merged["Gyro1Norm1"],
+    go.Scatter(x=df_plot["timestamp"],
+               y=df_plot["Gyro1Norm1"],
                mode="lines", name="Apple Watch Gyro")
 )
 fig.add_trace(
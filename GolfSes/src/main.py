@@ -5,42 +5,40 @@ import matplotlib.pyplot as plt
 import numpy as np
 import plotly.express as px
 import pytz
-import UZeppWrangle
-import WatchWrangle
-import BabWrangle
 import plotly.graph_objects as go
 import subprocess
 from IPython.display import display
 from scipy.signal import find_peaks
+from compare.align import estimate_offset, impact_times
+from compare.decimate import decimate_frame
+from compare.join import Stream, join_streams
+from compare.parallel import load_sources
+from compare.sensors import load_task
+from compare.store import session_window
 
+# Sessions from the index, built with
+#     python -m compare.sessions golf=... watch=...
+# before running this script; until then the date window is used
+sessions = ['2024-07-05.1', '2024-07-06.1']
+start_date, end_date = session_window(sessions, default=('2024-07-05', '2024-07-07'))
 # Path for all three sensors
 Apple_path = "/home/blueaz/Downloads/SensorDownload/May2024/AppleWatch/Golfses/WristMotion.csv"
 # Bab_path = "~/Python/Bab/BabWrangle/src/BabPopExt.db"
 UZepp_path = "/home/blueaz/Downloads/SensorDownload/May2024/AppleWatch/Golfses/Golf3.db"
 
-dfa = WatchWrangle.WatchWrangle(Apple_path) 
-# dfb = BabWrangle.BabWrangle(Bab_path) 
-dfu = UZeppWrangle.UZeppWrangle(UZepp_path) 
+# Load the watch CSV (in its own process) and Zepp concurrently
+frames, _ = load_sources({
+    'watch': load_task('watch', Apple_path, start_date, end_date),
+    # 'babolat': load_task('babolat', Bab_path),
+    'zepp': load_task('golf', UZepp_path, start_date, end_date),
+}, strict=True)
+dfa, dfu = frames['watch'], frames['zepp']
 pd.set_option('display.max_columns', 100)
 pd.set_option('display.max_rows', 300)
 
-# General normalization function - written by GPT-4o
-# Normalizes a column based on limits from another dataframe
-def normalize_column(dfa, dfb, ref_col, norm_col, new_col_name):
-    min_A = dfa[ref_col].min()
-    max_A = dfa[ref_col].max()
-    min_B = dfb[norm_col].min()
-    max_B = dfb[norm_col].max()
-    def normalize(x, min_B, max_B, min_A, max_A):
-        return ((x - min_B) * (max_A - min_A) / (max_B - min_B)) + min_A
-    dfb[new_col_name] = dfb[norm_col].apply(normalize,
-                                            args=(min_B, max_B, min_A, max_A))
-
 # Add ZIQ value to Zepp U sensor
 # ZIQ is based on PIQ & roughly grades a tennis shot on power, spin, and sweet spot
-# normalize_column(dfb, dfu, 'EffectScore', 'ball_spin', 'ZIQspin')
-# normalize_column(dfb, dfu, 'SpeedScore', 'racket_speed', 'ZIQspeed')
-# Penalty function for center contact. Using Absolute value
+# dfu = add_ziq(dfb, dfu)
 
 # Zepp U sensor sensor signals
 fields = ['UPSWING_CLUB_POSTURE', 'UP_DOWN_SWING__GOF', 'TWIST_ROTATION_RATE',
@@ -57,20 +55,18 @@ fields = ['UPSWING_CLUB_POSTURE', 'UP_DOWN_SWING__GOF', 'TWIST_ROTATION_RATE',
        'YEAR', 'MONTH', 'DAY', 'FACE_ANGLE', 'SCORE', 'MODEL_ID',
        'CLIENT_HOUR', 'timestamp' ]
 
-# Estimated by inspection
+# Line up the watch clock with Zepp by matching strokes to wrist
+# impact peaks; 1 s (found by inspection) if too few strokes match
 tolerance = pd.Timedelta('5s')
-shift = -1 
-
-# Ensure the timestamps are in the same format
-dfa['timestamp'] = pd.to_datetime(dfa['timestamp'])
-dfu['timestamp'] = pd.to_datetime(dfu['timestamp'])
-dfa['timestamp'] = dfa['timestamp'] - pd.Timedelta(seconds=shift) 
+shift = estimate_offset(impact_times(dfa), dfu['timestamp'],
+                        default=pd.Timedelta(seconds=1))
 
-df_merged = pd.merge_asof(dfa, dfu,
-                          left_on='timestamp',
-                          right_on='timestamp',
-                          tolerance=tolerance,
-                          direction='nearest')
+# Both timestamps are already tz-naive local datetime64; the joined
+# timestamp is the watch time moved onto the Zepp clock
+df_merged, unmatched = join_streams(
+    Stream(dfa, 'timestamp', name='watch', offset=-shift),
+    Stream(dfu, 'timestamp', name='zepp', tolerance=tolerance))
+print(unmatched)
 
 
 # Extract the signal and timestamps for peak detector
@@ -80,10 +76,15 @@ timestamps = df_merged['timestamp']
 # Detect peaks
 min_distance = 25
 peaks, _ = find_peaks(signal, threshold=20, distance=min_distance)
+# Decimate the signal line for plotting, keeping every peak. Set
+# plot_window to a (start, end) pair to see a stretch at full resolution.
+plot_window = None
+df_plot = decimate_frame(df_merged, 'timestamp', 'SCORE', keep=peaks,
+                         x_range=plot_window)
 # Create the plot
 fig = go.Figure()
 fig.add_trace(go.Scatter(x=timestamps[peaks], y=signal[peaks], mode='markers', marker=dict(color='blue', size=10), name='Peaks'))
-fig.add_trace(go.Scatter(x=timestamps, y=signal, line=dict(color='orange'),
+fig.add_trace(go.Scatter(x=df_plot['timestamp'], y=df_plot['SCORE'], line=dict(color='orange'),
                          mode='lines', name='Signal'))
 fig.show()
 
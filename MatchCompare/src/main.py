@@ -5,76 +5,58 @@ import matplotlib.pyplot as plt
 import numpy as np
 import plotly.express as px
 import pytz
-import UZeppWrangle
-import ZeppWrangle
-import BabWrangle
 import plotly.graph_objects as go
 import subprocess
 from IPython.display import display
+from compare.align import estimate_offset
+from compare.join import Stream, join_streams
+from compare.parallel import load_sources
+from compare.sensors import load_task
+from compare.store import session_window
+from compare.ziq import add_ziq, normalize_columns
 
 Zepp2_path = "/home/blueaz/Downloads/SensorDownload/Sep14/ZeppTennis.db"
 Bab_path = "/home/blueaz/Python/Sensors/Bab/BabWrangle/src/BabPopExt.db"
 UZepp_path = "/home/blueaz/Downloads/SensorDownload/May2024/ztennis.db"
 
-df = ZeppWrangle.ZeppWrangle(Zepp2_path) 
+# Sessions from the index, built with
+#     python -m compare.sessions legacy=... babolat=... zepp=...
+# before running this script; until then the date window is used
+legacy_start, legacy_end = session_window(['2023-05-12.1', '2023-05-13.1'],
+                                          default=('2023-05-12', '2023-05-14'))
+start_date, end_date = session_window(['2024-05-25.1'], default=('2024-05-25', '2024-05-26'))
+
+# The three databases are independent: read them concurrently
+frames, _ = load_sources({
+    'legacy': load_task('legacy', Zepp2_path, legacy_start, legacy_end),
+    'babolat': load_task('babolat', Bab_path, start_date, end_date),
+    'zepp': load_task('zepp', UZepp_path, start_date, end_date),
+}, strict=True)
+
+df = frames['legacy']
 pd.set_option('display.max_columns', 100)
 pd.set_option('display.max_rows', 300)
 
-mask = df['HAPPENED_TIME'] > '05-11-23'
-df = df[mask]
-mask = df['HAPPENED_TIME'] < '05-13-23'
-df = df[mask]
-df["HAPPENED_TIME"] = pd.to_datetime(df["HAPPENED_TIME"])
 dfz = df
 
-df = BabWrangle.BabWrangle(Bab_path) 
-mask = df['time'] > '05-24-23'
-df = df[mask]
-mask = df['time'] < '05-25-23'
-df = df[mask]
-df["time"] = pd.to_datetime(df["time"])
+df = frames['babolat']
 df = df.iloc[2:] # First two rows considered outliers by inspection
 dfb = df
 
-df = UZeppWrangle.UZeppWrangle(UZepp_path) 
+df = frames['zepp']
 df.rename(columns = {'l_id' : 'time'}, inplace=True)
-mask = df['time'] > '2024-05-25'
-df = df[mask]
-mask = df['time'] < '2024-05-26'
-df = df[mask]
 dfu = df
 
-# General normalization function - written by GPT-4o
-def normalize_column(dfa, dfb, ref_col, norm_col, new_col_name):
-    min_A = dfa[ref_col].min()
-    max_A = dfa[ref_col].max()
-    min_B = dfb[norm_col].min()
-    max_B = dfb[norm_col].max()
-    def normalize(x, min_B, max_B, min_A, max_A):
-        return ((x - min_B) * (max_A - min_A) / (max_B - min_B)) + min_A
-    dfb[new_col_name] = dfb[norm_col].apply(normalize,
-                                            args=(min_B, max_B, min_A, max_A))
-
 # Normalize different columns with different new column names
-# A is ref column, B normalized. 
-normalize_column(dfb, dfz, 'EffectScore', 'SPIN', 'ZIQspin')
-normalize_column(dfb, dfz, 'SpeedScore', 'BALL_SPEED', 'ZIQspeed')
-normalize_column(dfb, dfz, 'StyleScore', 'HEAVINESS', 'ZIQheav')
-dfz['ZIQ'] = dfz['ZIQspeed'] + dfz['ZIQspin'] + dfz['ZIQheav']
+# Babolat column is the reference, legacy Zepp column is normalized.
+ziq = normalize_columns(dfb, dfz, {'ZIQspin': ('EffectScore', 'SPIN'),
+                                   'ZIQspeed': ('SpeedScore', 'BALL_SPEED'),
+                                   'ZIQheav': ('StyleScore', 'HEAVINESS')})
+dfz = dfz.assign(**ziq, ZIQ=ziq['ZIQspeed'] + ziq['ZIQspin'] + ziq['ZIQheav'])
 shift = 2 #Estimated by inspection
 dfz['HAPPENED_TIME'] = dfz['HAPPENED_TIME'] - pd.Timedelta(seconds=shift) 
 
-normalize_column(dfb, dfu, 'EffectScore', 'ball_spin', 'ZIQspin')
-normalize_column(dfb, dfu, 'SpeedScore', 'racket_speed', 'ZIQspeed')
-absx = 0 - dfu['impact_position_x'].abs()
-absy = 0 - dfu['impact_position_y'].abs()
-dfu['abs_imp'] = 0 + (absx + absy)
-normalize_column(dfb, dfu, 'StyleScore', 'abs_imp', 'ZIQpos')
-#Normalize data based on inspection
-dfu.loc[dfu['stroke'] != 'SERVEFH', 'ZIQspin'] = dfu['ZIQspin'] * 2
-dfu.loc[dfu['stroke'] != 'SERVEFH', 'ZIQspeed'] = dfu['ZIQspeed'] * 1.6 
-dfu['ZIQ'] = dfu['ZIQspeed'] + dfu['ZIQspin'] + dfu['ZIQpos']
-dfu.loc[dfu['stroke'] == 'SERVEFH', 'ZIQ'] = dfu['ZIQ'] * .9 
+dfu = add_ziq(dfb, dfu)
 # Remove outliers
 dfu = dfu[dfu["ZIQ"] < 10000]
 
@@ -82,15 +64,13 @@ dfu = dfu[dfu["ZIQ"] < 10000]
 tolerance = pd.Timedelta('7s')
 
 # Fuzzy join for dfu
-# Shift (value chosen by inspection)
-shift = 2 #Estimated by inspection
-dfb['time'] = dfb['time'] - pd.Timedelta(seconds=shift) 
+# Shift estimated from matching strokes, 2 s (found by inspection) as fallback
+shift = estimate_offset(dfu['time'], dfb['time'], default=pd.Timedelta(seconds=2))
 
-merged_df = pd.merge_asof(dfu, dfb,
-                          left_on='time',
-                          right_on='time',
-                          tolerance=tolerance,
-                          direction='nearest')
+merged_df, unmatched = join_streams(
+    Stream(dfu, 'time', name='zepp'),
+    Stream(dfb, 'time', name='babolat', offset=shift, tolerance=tolerance))
+print(unmatched)
 
 # merged_df.loc[merged_df['stroke'] == 'SERVEFH'] = df['ZIQ']/2
 # fig = px.histogram(merged_df, x="abs_imp", color='hand_type')
@@ -5,51 +5,44 @@ import matplotlib.pyplot as plt
 import numpy as np
 import plotly.express as px
 import pytz
-import UZeppWrangle
-import WatchWrangle
-import BabWrangle
 import plotly.graph_objects as go
 import subprocess
 from IPython.display import display
-from scipy.signal import find_peaks
-
+from compare.align import estimate_offset, impact_times
+from compare.decimate import decimate_frame
+from compare.features import add_stroke_features
+from compare.join import Stream, join_streams
+from compare.parallel import load_sources
+from compare.sensors import load_task
+from compare.store import session_window
+from compare.peaks import watch_peaks
+from compare.spectrum import spectrum, stroke_spectra
+from compare.ziq import add_ziq
+
+# Sessions from the index, built with
+#     python -m compare.sessions babolat=... zepp=... watch=...
+# before running this script; until then the date window is used
+sessions = ['2024-06-12.1', '2024-06-13.1']
+start_date, end_date = session_window(sessions, default=('2024-06-12', '2024-06-14'))
 # Path for all three sensors
 Apple_path = "/home/blueaz/Downloads/SensorDownload/Compare/WristMotion.csv"
 Bab_path = "/home/blueaz/Python/Sensors/Bab/BabWrangle/src/BabPopExt.db"
 UZepp_path = "/home/blueaz/Downloads/SensorDownload/Compare/ztennis.db"
 
-dfa = WatchWrangle.WatchWrangle(Apple_path) 
-dfb = BabWrangle.BabWrangle(Bab_path) 
-dfu = UZeppWrangle.UZeppWrangle(UZepp_path) 
+# The three sources are independent: load them concurrently, parsing the
+# watch CSV in its own process
+frames, _ = load_sources({
+    'watch': load_task('watch', Apple_path, start_date, end_date),
+    'babolat': load_task('babolat', Bab_path, start_date, end_date),
+    'zepp': load_task('zepp', UZepp_path, start_date, end_date),
+}, strict=True)
+dfa, dfb, dfu = frames['watch'], frames['babolat'], frames['zepp']
 pd.set_option('display.max_columns', 100)
 pd.set_option('display.max_rows', 300)
 
-# General normalization function - written by GPT-4o
-# Normalizes a column based on limits from another dataframe
-def normalize_column(dfa, dfb, ref_col, norm_col, new_col_name):
-    min_A = dfa[ref_col].min()
-    max_A = dfa[ref_col].max()
-    min_B = dfb[norm_col].min()
-    max_B = dfb[norm_col].max()
-    def normalize(x, min_B, max_B, min_A, max_A):
-        return ((x - min_B) * (max_A - min_A) / (max_B - min_B)) + min_A
-    dfb[new_col_name] = dfb[norm_col].apply(normalize,
-                                            args=(min_B, max_B, min_A, max_A))
-
 # Add ZIQ value to Zepp U sensor
 # ZIQ is based on PIQ & roughly grades a tennis shot on power, spin, and sweet spot
-normalize_column(dfb, dfu, 'EffectScore', 'ball_spin', 'ZIQspin')
-normalize_column(dfb, dfu, 'SpeedScore', 'racket_speed', 'ZIQspeed')
-# Penalty function for center contact. Using Absolute value
-absx = 0 - dfu['impact_position_x'].abs()
-absy = 0 - dfu['impact_position_y'].abs()
-dfu['abs_imp'] = 0 + (absx + absy)
-normalize_column(dfb, dfu, 'StyleScore', 'abs_imp', 'ZIQpos')
-#Normalize data based on inspection values chosen previously
-dfu.loc[dfu['stroke'] != 'SERVEFH', 'ZIQspin'] = dfu['ZIQspin'] * 2
-dfu.loc[dfu['stroke'] != 'SERVEFH', 'ZIQspeed'] = dfu['ZIQspeed'] * 1.6 
-dfu['ZIQ'] = dfu['ZIQspeed'] + dfu['ZIQspin'] + dfu['ZIQpos']
-dfu.loc[dfu['stroke'] == 'SERVEFH', 'ZIQ'] = dfu['ZIQ'] * .9 
+dfu = add_ziq(dfb, dfu)
 # Remove outliers found during data visualization
 dfu = dfu[dfu["dbg_acc_1"] < 10000]
 dfu = dfu[dfu["dbg_acc_3"] < 10000]
@@ -67,20 +60,18 @@ calc = [ 'backswing_time', 'power', 'ball_spin',
 df_sensor = dfu[sensor]
 df_calc = dfu[calc]
 
-# Estimated by inspection
+# Line up the watch clock with Zepp by matching strokes to wrist
+# impact peaks; 1 s (found by inspection) if too few strokes match
 tolerance = pd.Timedelta('5s')
-shift = -1 
+shift = estimate_offset(impact_times(dfa), df_sensor['timestamp'],
+                        default=pd.Timedelta(seconds=1))
 
-# Ensure the timestamps are in the same format
-dfa['timestamp'] = pd.to_datetime(dfa['timestamp'])
-df_sensor['timestamp'] = pd.to_datetime(df_sensor['timestamp'])
-dfa['timestamp'] = dfa['timestamp'] - pd.Timedelta(seconds=shift) 
-
-df_merged = pd.merge_asof(dfa, df_sensor,
-                          left_on='timestamp',
-                          right_on='timestamp',
-                          tolerance=tolerance,
-                          direction='nearest')
+# Both timestamps are already tz-naive local datetime64; the joined
+# timestamp is the watch time moved onto the Zepp clock
+df_merged, unmatched = join_streams(
+    Stream(dfa, 'timestamp', name='watch', offset=-shift),
+    Stream(df_sensor, 'timestamp', name='zepp', tolerance=tolerance))
+print(unmatched)
 
 # subset single session 
 # mask = df_merged['timestamp'] > '2024-06-13 18:57:40'
@@ -91,18 +82,28 @@ df_merged = pd.merge_asof(dfa, df_sensor,
 # Reset the index of the dataframe
 df_merged.reset_index(drop=True, inplace=True)
 
+# Wrist motion features of +/-250 ms around each Zepp stroke
+dfu = add_stroke_features(dfu, df_merged)
+
 
-#Fourier transform
-ts = df_merged['timestamp']
-period = np.nanmedian(ts.diff().dt.total_seconds())
+#Fourier transform of gravityX, resampled onto a uniform grid
+freq, magnitude = spectrum(df_merged['timestamp'], df_merged['gravityX'])
 
-sp = np.fft.fft(df_merged['gravityX'])
-freq = np.fft.fftfreq(len(df_merged.index), period)
+mask = freq < 1
+
+fig = go.Figure()
+fig.add_trace(go.Scatter(x = freq[mask], y = magnitude[mask]))
+fig.show()
 
-mask = (freq >= 0) &(freq < 1)
+# Per-stroke spectra of 2 s gravityX windows centered on each Zepp stroke,
+# averaged per stroke type to compare volleys and groundstrokes
+stroke_freq, stroke_spec = stroke_spectra(df_merged['timestamp'], df_merged['gravityX'],
+                                          dfu['timestamp'], window='2s')
+mean_spec = pd.DataFrame(stroke_spec).groupby(dfu['stroke'].to_numpy()).mean()
 
 fig = go.Figure()
-fig.add_trace(go.Scatter(x = freq[mask], y = [np.linalg.norm(s) for s in sp[mask]]))
+for stroke, spec in mean_spec.iterrows():
+    fig.add_trace(go.Scatter(x=stroke_freq, y=spec, mode='lines', name=stroke))
 fig.show()
 
 
@@ -110,13 +111,21 @@ fig.show()
 signal = df_merged['gravityX']
 timestamps = df_merged['timestamp']
 
-# Detect peaks
+# Detect peaks chunk by chunk straight from the CSV; sample is the row
+# position within the watch window, so it indexes df_merged as well
 min_distance = 25
-peaks, _ = find_peaks(signal, threshold=20, distance=min_distance)
+events = watch_peaks(Apple_path, 'gravityX', start_date, end_date,
+                     threshold=20, distance=min_distance)
+peaks = events['sample'].to_numpy()
+# Decimate the signal line for plotting, keeping every peak. Set
+# plot_window to a (start, end) pair to see a stretch at full resolution.
+plot_window = None
+df_plot = decimate_frame(df_merged, 'timestamp', 'gravityX', keep=peaks,
+                         x_range=plot_window)
 # Create the plot
 fig = go.Figure()
 fig.add_trace(go.Scatter(x=timestamps[peaks], y=signal[peaks], mode='markers', marker=dict(color='blue', size=10), name='Peaks'))
-fig.add_trace(go.Scatter(x=timestamps, y=signal, line=dict(color='orange'),
+fig.add_trace(go.Scatter(x=df_plot['timestamp'], y=df_plot['gravityX'], line=dict(color='orange'),
                          mode='lines', name='Signal'))
 fig.show()
 
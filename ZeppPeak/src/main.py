@@ -5,40 +5,39 @@ import matplotlib.pyplot as plt
 import numpy as np
 import plotly.express as px
 import pytz
-import UZeppWrangle
-import WatchWrangle
 import plotly.graph_objects as go
 import subprocess
 from IPython.display import display
-from scipy.signal import find_peaks
-
-start_date = '2024-06-12'
-end_date = '2024-06-14'
+from compare.align import estimate_offset, impact_times
+from compare.decimate import decimate_frame
+from compare.join import Stream, join_streams
+from compare.parallel import load_sources
+from compare.sensors import load_task
+from compare.store import session_window
+from compare.peaks import watch_peaks
+from compare.spectrum import spectrum, stroke_spectra
+from compare.ziq import abs_impact
+
+# Sessions from the index, built with
+#     python -m compare.sessions zepp=... watch=...
+# before running this script; until then the date window is used
+sessions = ['2024-06-12.1', '2024-06-13.1']
+start_date, end_date = session_window(sessions, default=('2024-06-12', '2024-06-14'))
 # Path for all three sensors
 Apple_path = "/home/blueaz/Downloads/SensorDownload/Compare/WristMotion.csv"
 UZepp_path = "/home/blueaz/Downloads/SensorDownload/Compare/ztennis.db"
 
-dfa = WatchWrangle.WatchWrangle(Apple_path, start_date, end_date) 
-dfu = UZeppWrangle.UZeppWrangle(UZepp_path, start_date, end_date) 
+# Load the watch CSV (in its own process) and Zepp concurrently
+frames, _ = load_sources({
+    'watch': load_task('watch', Apple_path, start_date, end_date),
+    'zepp': load_task('zepp', UZepp_path, start_date, end_date),
+}, strict=True)
+dfa, dfu = frames['watch'], frames['zepp']
 pd.set_option('display.max_columns', 100)
 pd.set_option('display.max_rows', 300)
 
-# General normalization function - written by GPT-4o
-# Normalizes a column based on limits from another dataframe
-def normalize_column(dfa, dfb, ref_col, norm_col, new_col_name):
-    min_A = dfa[ref_col].min()
-    max_A = dfa[ref_col].max()
-    min_B = dfb[norm_col].min()
-    max_B = dfb[norm_col].max()
-    def normalize(x, min_B, max_B, min_A, max_A):
-        return ((x - min_B) * (max_A - min_A) / (max_B - min_B)) + min_A
-    dfb[new_col_name] = dfb[norm_col].apply(normalize,
-                                            args=(min_B, max_B, min_A, max_A))
-
 # Penalty function for center contact. Using Absolute value
-absx = 0 - dfu['impact_position_x'].abs()
-absy = 0 - dfu['impact_position_y'].abs()
-dfu['abs_imp'] = 0 + (absx + absy)
+dfu['abs_imp'] = abs_impact(dfu)
 #Normalize data based on inspection values chosen previously
 # Remove outliers found during data visualization
 dfu = dfu[dfu["dbg_acc_1"] < 10000]
@@ -56,20 +55,18 @@ calc = [ 'backswing_time', 'power', 'ball_spin',
 df_sensor = dfu[sensor]
 df_calc = dfu[calc]
 
-# Estimated by inspection
+# Line up the watch clock with Zepp by matching strokes to wrist
+# impact peaks; 1 s (found by inspection) if too few strokes match
 tolerance = pd.Timedelta('5s')
-shift = -1 
-
-# Ensure the timestamps are in the same format
-dfa['timestamp'] = pd.to_datetime(dfa['timestamp'])
-df_sensor['timestamp'] = pd.to_datetime(df_sensor['timestamp'])
-dfa['timestamp'] = dfa['timestamp'] - pd.Timedelta(seconds=shift) 
+shift = estimate_offset(impact_times(dfa), df_sensor['timestamp'],
+                        default=pd.Timedelta(seconds=1))
 
-df_merged = pd.merge_asof(dfa, df_sensor,
-                          left_on='timestamp',
-                          right_on='timestamp',
-                          tolerance=tolerance,
-                          direction='nearest')
+# Both timestamps are already tz-naive local datetime64; the joined
+# timestamp is the watch time moved onto the Zepp clock
+df_merged, unmatched = join_streams(
+    Stream(dfa, 'timestamp', name='watch', offset=-shift),
+    Stream(df_sensor, 'timestamp', name='zepp', tolerance=tolerance))
+print(unmatched)
 
 # subset single session 
 # mask = df_merged['timestamp'] > '2024-06-13 18:57:40'
@@ -81,17 +78,24 @@ df_merged = pd.merge_asof(dfa, df_sensor,
 df_merged.reset_index(drop=True, inplace=True)
 
 
-#Fourier transform
-ts = df_merged['timestamp']
-period = np.nanmedian(ts.diff().dt.total_seconds())
+#Fourier transform of gravityX, resampled onto a uniform grid
+freq, magnitude = spectrum(df_merged['timestamp'], df_merged['gravityX'])
 
-sp = np.fft.fft(df_merged['gravityX'])
-freq = np.fft.fftfreq(len(df_merged.index), period)
+mask = freq < 1
+
+fig = go.Figure()
+fig.add_trace(go.Scatter(x = freq[mask], y = magnitude[mask]))
+fig.show()
 
-mask = (freq >= 0) &(freq < 1)
+# Per-stroke spectra of 2 s gravityX windows centered on each Zepp stroke,
+# averaged per stroke type to compare volleys and groundstrokes
+stroke_freq, stroke_spec = stroke_spectra(df_merged['timestamp'], df_merged['gravityX'],
+                                          dfu['timestamp'], window='2s')
+mean_spec = pd.DataFrame(stroke_spec).groupby(dfu['stroke'].to_numpy()).mean()
 
 fig = go.Figure()
-fig.add_trace(go.Scatter(x = freq[mask], y = [np.linalg.norm(s) for s in sp[mask]]))
+for stroke, spec in mean_spec.iterrows():
+    fig.add_trace(go.Scatter(x=stroke_freq, y=spec, mode='lines', name=stroke))
 fig.show()
 
 
@@ -99,13 +103,21 @@ fig.show()
 signal = df_merged['gravityX']
 timestamps = df_merged['timestamp']
 
-# Detect peaks
+# Detect peaks chunk by chunk straight from the CSV; sample is the row
+# position within the watch window, so it indexes df_merged as well
 min_distance = 25
-peaks, _ = find_peaks(signal, threshold=20, distance=min_distance)
+events = watch_peaks(Apple_path, 'gravityX', start_date, end_date,
+                     threshold=20, distance=min_distance)
+peaks = events['sample'].to_numpy()
+# Decimate the signal line for plotting, keeping every peak. Set
+# plot_window to a (start, end) pair to see a stretch at full resolution.
+plot_window = None
+df_plot = decimate_frame(df_merged, 'timestamp', 'gravityX', keep=peaks,
+                         x_range=plot_window)
 # Create the plot
 fig = go.Figure()
 fig.add_trace(go.Scatter(x=timestamps[peaks], y=signal[peaks], mode='markers', marker=dict(color='blue', size=10), name='Peaks'))
-fig.add_trace(go.Scatter(x=timestamps, y=signal, line=dict(color='orange'),
+fig.add_trace(go.Scatter(x=df_plot['timestamp'], y=df_plot['gravityX'], line=dict(color='orange'),
                          mode='lines', name='Signal'))
 fig.show()
 
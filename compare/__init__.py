@@ -0,0 +1 @@
+"""Shared helpers for comparing tennis and golf sensor data."""
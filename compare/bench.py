@@ -0,0 +1,212 @@
+"""Benchmarks of the processing pipeline on synthetic sensor data.
+
+Generates the vendor databases and a WristMotion.csv at the requested
+scale (``compare.synthetic``), then times each stage on them, uncached,
+keeping the best of a few runs:
+
+    wrangle_*   SQLite / CSV read into the wrangled frames
+    ziq         ZIQ scoring of the Zepp strokes
+    offset      clock offset between Babolat and Zepp
+    merge_asof  pandas nearest merge of Zepp and Babolat (baseline)
+    join        compare.join of the same streams
+    peaks       streaming peak detection over the watch signal
+    fft         whole-session spectrum of the watch signal
+    stroke_fft  per-stroke spectra around the Babolat strokes
+    features    wrist features around the Babolat strokes
+    figure      decimated Plotly figure, built and serialized
+
+Results are written as JSON; passing an earlier file as --baseline
+reports the stages that got slower by more than --threshold and exits 1,
+so runs from two versions can be compared:
+
+    python -m compare.bench --rows 100000 --out bench-new.json --baseline bench-old.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from compare import sensors, synthetic
+from compare.align import estimate_offset
+from compare.decimate import decimate_frame
+from compare.features import stroke_features
+from compare.join import Stream, join_streams
+from compare.peaks import stream_peaks
+from compare.spectrum import spectrum, stroke_spectra
+from compare.ziq import add_ziq
+
+REPEAT = 3
+THRESHOLD = 0.2
+WATCH_SIGNAL = 'accelerationX'
+
+
+def _best(func, repeat):
+    # Best wall time of repeat calls, and the last result
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _chunks(df, size=synthetic.WATCH_RATE * 3600):
+    for lo in range(0, len(df), size):
+        yield df.iloc[lo:lo + size]
+
+
+def _figure(dfa):
+    import plotly.graph_objects as go
+    rows = decimate_frame(dfa, 'timestamp', WATCH_SIGNAL)
+    fig = go.Figure(go.Scatter(x=rows['timestamp'], y=rows[WATCH_SIGNAL], mode='lines'))
+    fig.to_json()
+    return len(rows)
+
+
+def _versions():
+    versions = {'python': platform.python_version(), 'numpy': np.__version__,
+                'pandas': pd.__version__}
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        versions['git'] = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return versions
+
+
+def run(rows, watch_rows=None, data_dir=None, repeat=REPEAT, log=print):
+    """Generate data (unless data_dir already has it) and time every stage.
+
+    Returns the results as a JSON-serializable dict.
+    """
+    watch_rows = rows if watch_rows is None else watch_rows
+    tmp = None
+    if data_dir is None:
+        tmp = tempfile.TemporaryDirectory(prefix='compare-bench-')
+        data_dir = tmp.name
+    paths = {name: os.path.join(data_dir, f) for name, f in synthetic.FILES.items()}
+    if not all(os.path.exists(p) for p in paths.values()):
+        log(f"generating {rows} strokes and {watch_rows} watch samples in {data_dir}")
+        paths = synthetic.generate(data_dir, rows, watch_rows)
+
+    stages = {}
+
+    def stage(name, func, rows_in):
+        seconds, result = _best(func, repeat)
+        rows_out = len(result) if hasattr(result, '__len__') else int(result)
+        stages[name] = {'seconds': seconds, 'rows_in': int(rows_in), 'rows_out': rows_out}
+        log(f"{name:16s} {seconds:9.4f} s  {rows_in:>10} -> {rows_out}")
+        return result
+
+    try:
+        frames = {}
+        for name in ('babolat', 'zepp', 'golf', 'legacy', 'watch'):
+            rows_in = watch_rows if name == 'watch' else \
+                rows if name in ('babolat', 'zepp') else max(rows // 5, 1)
+            wrangle = sensors.SENSORS[name].wrangle.uncached
+            frames[name] = stage(f'wrangle_{name}',
+                                 lambda w=wrangle, p=paths[name]: w(p), rows_in)
+        dfb, dfu, dfa = frames['babolat'], frames['zepp'], frames['watch']
+
+        dfu = stage('ziq', lambda: add_ziq(dfb, dfu), len(dfu))
+        # dfb['time'] - shift is on the zepp clock
+        shift = estimate_offset(dfu['time'], dfb['time'], default=-synthetic.ZEPP_OFFSET)
+        stage('offset', lambda: [estimate_offset(dfu['time'], dfb['time'])],
+              len(dfu) + len(dfb))
+        shifted = dfb.assign(time=dfb['time'] - shift).drop(columns='stroke')
+        merged = stage('merge_asof', lambda: pd.merge_asof(
+            dfu, shifted, on='time', direction='nearest', tolerance=pd.Timedelta('5s')),
+            len(dfu) + len(dfb))
+        joined = stage('join', lambda: join_streams(
+            Stream(dfu, 'time', name='zepp'),
+            Stream(dfb, 'time', name='babolat', offset=shift, tolerance='5s'))[0],
+            len(dfu) + len(dfb))
+        # Both must pair the same strokes, or the timings aren't comparable
+        if not merged['stroke_counter'].equals(joined['stroke_counter']):
+            raise RuntimeError("join_streams and merge_asof matched different strokes")
+
+        # Stroke times on the watch clock
+        events = dfb['time'] + synthetic.WATCH_OFFSET
+        events = events[(events > dfa['timestamp'].iloc[0])
+                        & (events < dfa['timestamp'].iloc[-1])]
+        stage('peaks', lambda: pd.concat(list(stream_peaks(
+            _chunks(dfa), WATCH_SIGNAL, threshold=20, distance=25)) or [pd.DataFrame()]),
+            len(dfa))
+        stage('fft', lambda: spectrum(dfa['timestamp'], dfa[WATCH_SIGNAL])[1], len(dfa))
+        stage('stroke_fft', lambda: stroke_spectra(
+            dfa['timestamp'], dfa[WATCH_SIGNAL], events)[1], len(events))
+        stage('features', lambda: stroke_features(dfa, events), len(events))
+        try:
+            stage('figure', lambda: _figure(dfa), len(dfa))
+        except ImportError:
+            log("figure           skipped, plotly is not installed")
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    return {'rows': rows, 'watch_rows': watch_rows, 'repeat': repeat,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'versions': _versions(), 'stages': stages}
+
+
+def regressions(current, baseline, threshold=THRESHOLD):
+    """Stages slower than baseline by more than threshold (a fraction).
+
+    Returns a frame of old/new seconds and their ratio per stage, for the
+    stages both runs timed at the same scale.
+    """
+    if (current['rows'], current['watch_rows']) != (baseline['rows'], baseline['watch_rows']):
+        raise ValueError("baseline was run at a different scale")
+    common = [s for s in current['stages'] if s in baseline['stages']]
+    report = pd.DataFrame({
+        'old': [baseline['stages'][s]['seconds'] for s in common],
+        'new': [current['stages'][s]['seconds'] for s in common],
+    }, index=common)
+    report['ratio'] = report['new'] / report['old']
+    return report[report['ratio'] > 1 + threshold]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sensor pipeline "
+                                                 "on synthetic data.")
+    parser.add_argument('--rows', type=int, default=100_000,
+                        help="strokes per stroke database (10k-10M)")
+    parser.add_argument('--watch-rows', type=int, default=None,
+                        help="watch CSV samples (default: --rows)")
+    parser.add_argument('--data', default=None,
+                        help="directory to keep the generated data in and reuse")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--out', default=None, help="results JSON path")
+    parser.add_argument('--baseline', default=None, help="earlier results JSON")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.watch_rows, args.data, args.repeat)
+    out = args.out or f'bench-{args.rows}.json'
+    with open(out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f), args.threshold)
+        if len(slower):
+            print(f"stages slower than the baseline by more than {args.threshold:.0%}:")
+            print(slower.to_string())
+            return 1
+        print("no regressions against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
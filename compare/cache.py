@@ -0,0 +1,207 @@
+"""On-disk columnar cache for wrangled sensor frames.
+
+Wrapping a wrangler with ``@cached(version)`` stores its result as an
+uncompressed Feather (Arrow IPC) file and later loads read that file
+instead of re-reading SQLite/CSV and redoing the timezone and mapping work.
+
+Entries are keyed by the wrangler (module file, name, ``version`` and the
+code of its module and of the package modules it imports), the source
+file path, its mtime/size and the call arguments, so editing a wrangler
+or a helper it uses, or touching the source database/CSV, invalidates
+them. Failing to write an entry (a full disk, a read-only directory)
+only leaves the load uncached. Stale
+entries for the same source are deleted when a fresh one is written, and
+the least recently used entries are evicted once the directory exceeds the
+size budget. Concurrent loads (``compare.parallel``) may delete entries
+another load has just listed; a vanished entry is treated as a miss.
+
+Settings come from the environment:
+    COMPARE_CACHE_DIR    cache directory (default ~/.cache/compare)
+    COMPARE_CACHE_BYTES  size budget in bytes, 0 disables (default 2 GB)
+
+pyarrow is optional; without it the wranglers simply run uncached.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import sys
+import tempfile
+
+from compare.profile import stage
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # pragma: no cover - cache is optional
+    pa = None
+
+CACHE_DIR = os.environ.get('COMPARE_CACHE_DIR',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'compare'))
+CACHE_BYTES = int(os.environ.get('COMPARE_CACHE_BYTES', 2 * 1024**3))
+SUFFIX = '.feather'
+
+
+def _digest(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+
+def _imported_modules(module):
+    # The module and the modules of its package it imports, directly or
+    # through them, by name
+    package = module.__name__.partition('.')[0]
+    found, todo = {}, [module]
+    while todo:
+        module = todo.pop()
+        if module.__name__ in found:
+            continue
+        found[module.__name__] = module
+        for value in vars(module).values():
+            if inspect.ismodule(value):
+                dep = value
+            else:
+                name = getattr(value, '__module__', None)
+                dep = sys.modules.get(name) if isinstance(name, str) else None
+            if dep is not None and dep.__name__.partition('.')[0] == package:
+                todo.append(dep)
+    return [found[name] for name in sorted(found)]
+
+
+def _code_fingerprint(func):
+    # Code of the wrangler's module and of the package helpers it uses
+    try:
+        return _digest(*[inspect.getsource(m)
+                         for m in _imported_modules(inspect.getmodule(func))])
+    except (OSError, TypeError):
+        return ''
+
+
+def _stat(path):
+    # (mtime, size) of a source file, None if it doesn't exist
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def enabled():
+    return pa is not None and CACHE_BYTES > 0
+
+
+def entry_paths(prefix):
+    """Cache files whose name starts with prefix."""
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    return [os.path.join(CACHE_DIR, f) for f in os.listdir(CACHE_DIR)
+            if f.startswith(prefix) and f.endswith(SUFFIX)]
+
+
+def read_frame(path):
+    """Load a cached frame.
+
+    The file is memory-mapped, so its columns are copied once, from the
+    page cache into the pandas frame, rather than read into Arrow buffers
+    first. Raises FileNotFoundError if the entry is gone.
+    """
+    table = feather.read_table(path, memory_map=True)
+    # Touch for LRU eviction
+    os.utime(path)
+    return table.to_pandas()
+
+
+def write_frame(df, path):
+    """Atomically write df to path as uncompressed Feather."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        feather.write_feather(table, tmp, compression='uncompressed')
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def evict(budget=None):
+    """Delete least recently used entries until the cache fits the budget."""
+    budget = CACHE_BYTES if budget is None else budget
+    entries = []
+    for path in entry_paths(''):
+        # Another load may have removed it since it was listed
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= budget:
+            break
+        _remove(path)
+        total -= size
+
+
+def clear():
+    """Remove every cache entry."""
+    evict(budget=0)
+
+
+def cached(version):
+    """Decorator caching wrangler(source_path, *args, **kwargs) on disk.
+
+    Bump version when the wrangler's output changes for reasons the code
+    of its module and the package modules it imports doesn't show (e.g. a
+    third-party library changed behaviour).
+    """
+    def decorate(wrangler):
+        code = _code_fingerprint(wrangler)
+        module = os.path.abspath(inspect.getsourcefile(wrangler) or '')
+
+        @functools.wraps(wrangler)
+        def wrapper(source_path, *args, **kwargs):
+            if not enabled():
+                return wrangler(source_path, *args, **kwargs)
+            source = os.path.abspath(os.path.expanduser(str(source_path)))
+            # SQLite WAL writes land in the -wal file until checkpointed
+            stats = [_stat(source), _stat(source + '-wal')]
+            # Entries for this wrangler/source/arguments, any source version
+            prefix = '%s-%s-' % (wrangler.__name__,
+                                 _digest(module, source, args, sorted(kwargs.items())))
+            key = _digest(code, version, stats)
+            path = os.path.join(CACHE_DIR, prefix + key + SUFFIX)
+            # Read rather than check first: a concurrent load can remove
+            # the entry in between, which is just a miss
+            try:
+                with stage(f'{wrangler.__name__}: cache read') as s:
+                    df = read_frame(path)
+                    s.rows_out = len(df)
+                return df
+            except FileNotFoundError:
+                pass
+
+            df = wrangler(source_path, *args, **kwargs)
+            with stage(f'{wrangler.__name__}: cache write', len(df)) as s:
+                # The cache is only an optimization: a full disk or a
+                # read-only directory must not fail the load
+                try:
+                    for stale in entry_paths(prefix):
+                        _remove(stale)
+                    write_frame(df, path)
+                    evict()
+                except OSError:
+                    pass
+                s.rows_out = len(df)
+            return df
+
+        wrapper.uncached = wrangler
+        return wrapper
+    return decorate
@@ -0,0 +1,131 @@
+"""In-memory day partitions of wrangled sensor frames.
+
+A dashboard that loads a date range re-reads everything when the range
+changes, although widening it by a day only adds that day. ``DayCache``
+keeps each source's rows split by local calendar day, so a load only
+fetches the days it doesn't hold yet, in as few contiguous reads as
+possible:
+
+    days = DayCache()
+    key = source_key('zepp', path, columns=signals)
+    for lo, hi in days.missing(key, start, end):
+        days.fill(key, lo, hi, sensors.zepp(path, lo, hi, columns=signals))
+    dfu = days.frame(key, start, end)
+
+Ranges are half-open, [start, end); whole days are read and held even
+for a range within a day, such as a session. Day frames are stored as
+slices of the frame that was read and handed out without copying, so
+they must not be modified in place. Keys carry the source file's mtime
+and size, so a changed database is simply a new key; the least recently
+used days are dropped beyond max_days.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_DAYS = 512
+ONE_DAY = pd.Timedelta('1D')
+
+
+def source_key(name, path, **options):
+    """Cache key of a source: its name, file version and wrangler options."""
+    path = os.path.abspath(os.path.expanduser(str(path)))
+    try:
+        st = os.stat(path)
+        version = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        version = None
+    frozen = tuple(sorted((k, tuple(v) if isinstance(v, list) else v)
+                          for k, v in options.items()))
+    return name, path, version, frozen
+
+
+def days(start, end):
+    """Local midnights of the days in [start, end), in ns like the frames."""
+    # Newer pandas ranges between parsed strings at coarser units
+    return pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end),
+                         freq='D', inclusive='left').astype('datetime64[ns]')
+
+
+def _concat(parts):
+    # pd.concat turns categoricals with different categories into
+    # objects; widen them to the union first so compact dtypes survive
+    first = parts[0]
+    for col in first.columns:
+        dtypes = [part[col].dtype for part in parts]
+        if isinstance(dtypes[0], pd.CategoricalDtype) and \
+                any(dtype != dtypes[0] for dtype in dtypes):
+            categories = pd.Index(pd.unique(np.concatenate(
+                [dtype.categories.to_numpy(dtype=object) for dtype in dtypes])))
+            parts = [part.assign(**{col: part[col].cat.set_categories(categories)})
+                     for part in parts]
+    return pd.concat(parts)
+
+
+class DayCache:
+    """Frames of several sources, one entry per (source key, day)."""
+
+    def __init__(self, max_days=MAX_DAYS):
+        self.max_days = max_days
+        self._days = OrderedDict()
+        self._lock = threading.Lock()
+
+    def missing(self, key, start, end):
+        """Contiguous [lo, hi) runs of the days in [start, end) not held."""
+        runs = []
+        with self._lock:
+            for day in days(start, end):
+                if (key, day) in self._days:
+                    continue
+                if runs and runs[-1][1] == day:
+                    runs[-1][1] = day + ONE_DAY
+                else:
+                    runs.append([day, day + ONE_DAY])
+        return [tuple(run) for run in runs]
+
+    def fill(self, key, start, end, frame, on='time'):
+        """Store frame, read for [start, end), one entry per day.
+
+        frame must be sorted by its datetime column on; rows outside the
+        range are dropped. Days without rows are stored empty so they
+        aren't fetched again.
+        """
+        bounds = days(start, end)
+        edges = np.append(bounds.asi8, (bounds[-1] + ONE_DAY).value) \
+            if len(bounds) else np.array([], dtype='int64')
+        cut = np.searchsorted(frame[on].to_numpy(dtype='datetime64[ns]').view('int64'),
+                              edges, side='left')
+        with self._lock:
+            for i, day in enumerate(bounds):
+                self._days[(key, day)] = frame.iloc[cut[i]:cut[i + 1]]
+                self._days.move_to_end((key, day))
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+
+    def frame(self, key, start, end, on='time'):
+        """The rows of [start, end), from the stored days (times of day in
+        start and end cut the first and last day).
+
+        Raises KeyError if a day hasn't been filled.
+        """
+        with self._lock:
+            parts = []
+            for day in days(start, end):
+                parts.append(self._days[(key, day)])
+                self._days.move_to_end((key, day))
+        if not parts:
+            return None
+        df = parts[0] if len(parts) == 1 else _concat(parts)
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        if start != start.normalize() or end != end.normalize():
+            t = df[on].to_numpy(dtype='datetime64[ns]')
+            lo, hi = np.searchsorted(t, np.array([start, end], dtype='datetime64[ns]'))
+            df = df.iloc[lo:hi]
+        return df
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
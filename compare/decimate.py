@@ -0,0 +1,148 @@
+"""Point-budget decimation for dense Plotly line traces.
+
+A day of 50-100 Hz watch data is millions of points, far more than a plot
+a few thousand pixels wide can show, and sending them all makes the figure
+JSON tens of MB. Traces are decimated before they are built:
+
+    min/max  each of budget/2 equal-width x buckets keeps its lowest and
+             highest point, so spikes survive (the default, fully vectorized)
+    lttb     largest-triangle-three-buckets, which keeps the visual shape
+             with exactly budget points
+
+Rows passed as keep (peaks, stroke times) are always retained. Passing an
+x_range re-fetches just that window, so zooming in on a short window
+brings back full resolution once it fits within the budget.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_BUDGET = 5000
+METHODS = ('minmax', 'lttb')
+
+
+def _numeric(x):
+    # x values as float64; datetimes as epoch ns
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':
+        x = x.astype('datetime64[ns]').view('int64')
+    return x.astype('float64')
+
+
+def _first_in_bucket(hit, bucket):
+    # Position of the first True in each bucket
+    pos = np.flatnonzero(hit)
+    _, first = np.unique(bucket[pos], return_index=True)
+    return pos[first]
+
+
+def minmax_index(x, y, budget):
+    """Positions of the min and max point in each of budget/2 equal-width
+    buckets of sorted x."""
+    n = len(y)
+    if n <= budget:
+        return np.arange(n)
+    x, y = _numeric(x), np.asarray(y, dtype='float64')
+    buckets = max(budget // 2, 1)
+    edges = np.linspace(x[0], x[-1], buckets + 1)[1:-1]
+    starts = np.r_[0, np.searchsorted(x, edges, 'right')]
+    bucket = np.repeat(np.arange(buckets), np.diff(np.r_[starts, n]))
+    # Empty buckets are dropped (trailing ones start at n when every x is
+    # equal); NaNs never win a min or max
+    filled = np.unique(starts[starts < n])
+    low = np.where(np.isnan(y), np.inf, y)
+    high = np.where(np.isnan(y), -np.inf, y)
+    lows = np.minimum.reduceat(low, filled)
+    highs = np.maximum.reduceat(high, filled)
+    slot = np.searchsorted(filled, starts[bucket], 'left')
+    idx = np.r_[_first_in_bucket(low == lows[slot], bucket),
+                _first_in_bucket(high == highs[slot], bucket),
+                0, n - 1]
+    return np.unique(idx)
+
+
+def lttb_index(x, y, budget):
+    """Positions chosen by largest-triangle-three-buckets."""
+    n = len(y)
+    if n <= budget or budget < 3:
+        return np.arange(n)
+    x, y = _numeric(x), np.asarray(y, dtype='float64')
+    valid = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(valid) <= budget:
+        return valid
+    xv, yv = x[valid], y[valid]
+    m = len(xv)
+    # budget - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, m - 1, budget - 1).astype('int64')
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(xv[:m - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(yv[:m - 1], edges[:-1]) / counts
+    # The last bucket looks ahead to the final point
+    mean_x = np.r_[mean_x[1:], xv[-1]]
+    mean_y = np.r_[mean_y[1:], yv[-1]]
+
+    out = np.empty(budget, dtype='int64')
+    out[0], out[-1] = 0, m - 1
+    a = 0
+    for i in range(budget - 2):
+        s, e = edges[i], edges[i + 1]
+        area = np.abs((xv[a] - mean_x[i]) * (yv[s:e] - yv[a])
+                      - (xv[a] - xv[s:e]) * (mean_y[i] - yv[a]))
+        a = s + int(np.argmax(area))
+        out[i + 1] = a
+    return valid[out]
+
+
+def decimate_index(x, y, budget=DEFAULT_BUDGET, keep=None, method='minmax'):
+    """Sorted positions to plot for one trace, always including keep."""
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    pick = minmax_index if method == 'minmax' else lttb_index
+    idx = pick(x, y, budget)
+    if keep is not None and len(keep):
+        idx = np.union1d(idx, np.asarray(keep, dtype='int64'))
+    return idx
+
+
+def window_index(x, start=None, end=None):
+    """Positions of sorted x within [start, end], plus one point either side
+    so lines run to the window edges."""
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':
+        bound = lambda v: pd.Timestamp(v).to_datetime64()
+    else:
+        bound = lambda v: v
+    lo = 0 if start is None else max(np.searchsorted(x, bound(start), 'left') - 1, 0)
+    hi = len(x) if end is None else min(np.searchsorted(x, bound(end), 'right') + 1, len(x))
+    return np.arange(lo, hi)
+
+
+def nearest_index(x, events):
+    """Position in sorted x closest to each event (e.g. stroke times)."""
+    x, events = _numeric(x), _numeric(events)
+    if len(x) < 2:
+        return np.zeros(len(events) if len(x) else 0, dtype='int64')
+    idx = np.clip(np.searchsorted(x, events), 1, len(x) - 1)
+    closer = np.abs(events - x[idx - 1]) <= np.abs(x[idx] - events)
+    return np.where(closer, idx - 1, idx)
+
+
+def decimate_frame(df, x, columns, budget=DEFAULT_BUDGET, keep=None,
+                   x_range=None, method='minmax'):
+    """Rows of df (sorted on x) to plot columns against x.
+
+    Each column gets its own budget and the union of the picked rows is
+    returned. keep holds positional row indices that must survive;
+    x_range = (start, end) restricts the rows to a zoom window first.
+    """
+    if isinstance(columns, str):
+        columns = [columns]
+    window = np.arange(len(df)) if x_range is None else window_index(df[x], *x_range)
+    lo, hi = (window[0], window[-1] + 1) if len(window) else (0, 0)
+    if keep is not None:
+        keep = np.asarray(keep, dtype='int64')
+        keep = keep[(keep >= lo) & (keep < hi)] - lo
+    xs = df[x].to_numpy()[lo:hi]
+    idx = np.unique(np.concatenate(
+        [decimate_index(xs, df[c].to_numpy()[lo:hi], budget, keep, method)
+         for c in columns] or [np.zeros(0, dtype='int64')]))
+    return df.iloc[lo + idx]
@@ -0,0 +1,100 @@
+"""Compact dtypes for wrangled frames and per-column memory reports.
+
+SQLite hands every integer back as int64 and every real as float64, and
+text columns as Python strings repeated on every row. ``compact_dtypes``
+shrinks a frame column by column:
+
+    integers        int32 if the column's range fits, else int64
+    floats          float32
+    repeated text   categoricals
+    everything else (datetimes, categoricals, bools) unchanged
+
+Numbers are never narrowed below 32 bits, nor turned from floats into
+integers: int8/int16 arithmetic wraps silently (the sum of two Zepp
+impact positions overflows int8), and the chosen dtype would otherwise
+change from one day's value range to the next.
+
+``memory_report`` shows the bytes of every column before and after, to
+keep an eye on the memory per session as the archives grow:
+
+    report = memory_report(sensors.zepp(path, compact=False), sensors.zepp(path))
+"""
+import numpy as np
+import pandas as pd
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+# Narrowest integer types used, see above
+INT_TYPES = ['int32', 'int64']
+
+
+def _smallest_int(lo, hi):
+    for dtype in INT_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return None
+
+
+def _compact_column(s, category_ratio):
+    # The compacted column, or None to leave it as it is
+    dtype = s.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or dtype.kind in 'bMm':
+        return None
+    if dtype.kind in 'iu':
+        if not len(s):
+            return None
+        target = _smallest_int(s.min(), s.max())
+        return s.astype(target) if target and target != dtype else None
+    if dtype.kind == 'f':
+        v = s.to_numpy()
+        finite = np.isfinite(v)
+        if dtype == 'float64' and \
+                np.abs(v[finite]).max(initial=0) <= np.finfo('float32').max:
+            return s.astype('float32')
+        return None
+    if pd.api.types.is_string_dtype(dtype) or dtype == object:
+        if len(s) and s.nunique(dropna=True) <= category_ratio * len(s):
+            return s.astype('category')
+    return None
+
+
+def compact_dtypes(df, exclude=(), category_ratio=CATEGORY_RATIO):
+    """Return df with every column (but exclude) in its most compact dtype."""
+    columns = {}
+    for col in df.columns:
+        if col in exclude:
+            continue
+        compacted = _compact_column(df[col], category_ratio)
+        if compacted is not None:
+            columns[col] = compacted
+    if not columns:
+        return df
+    df = df.copy()
+    for col, values in columns.items():
+        df[col] = values
+    return df
+
+
+def memory_report(before, after):
+    """Bytes and dtype of each column of two versions of a frame.
+
+    Returns a frame indexed by column (plus ``Index`` and ``total``) with
+    dtype_before, dtype_after, bytes_before, bytes_after and ratio.
+    """
+    b = before.memory_usage(deep=True)
+    a = after.memory_usage(deep=True)
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'dtype_after': after.dtypes.astype(str),
+        'bytes_before': b,
+        'bytes_after': a,
+    }).reindex(b.index.union(a.index, sort=False))
+    report.loc['Index', ['dtype_before', 'dtype_after']] = [str(before.index.dtype),
+                                                           str(after.index.dtype)]
+    report.loc['total'] = ['', '', b.sum(), a.sum()]
+    report[['bytes_before', 'bytes_after']] = \
+        report[['bytes_before', 'bytes_after']].fillna(0).astype('int64')
+    report['ratio'] = report['bytes_after'] / report['bytes_before'].where(
+        report['bytes_before'] > 0)
+    return report
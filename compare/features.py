@@ -0,0 +1,93 @@
+"""Wrist-motion features around each stroke.
+
+A nearest-sample join keeps one watch sample per stroke and loses the
+swing around it. ``stroke_features`` instead cuts a fixed window of
++/- half_window around every stroke event out of the watch frame and
+computes, per signal, in one batch over all strokes:
+
+    peak    largest absolute value
+    rms     root mean square
+    jerk    largest absolute rate of change (units per second)
+    energy  integral of the squared signal (units^2 * s)
+
+Windows come from a strided view of the samples, so only the stroke
+windows are gathered, never per-window slices. Windows that run off the
+recording or straddle a gap in it are NaN.
+
+    dfu = add_stroke_features(dfu, df_merged)   # both on the Zepp clock
+"""
+import numpy as np
+import pandas as pd
+
+from compare.align import to_ns
+from compare.spectrum import NS_PER_SECOND, sample_rate
+
+WRIST_SIGNALS = ['accelerationX', 'accelerationY', 'accelerationZ',
+                 'rotationRateX', 'rotationRateY', 'rotationRateZ',
+                 'gravityX', 'gravityY', 'gravityZ']
+FEATURES = ['peak', 'rms', 'jerk', 'energy']
+# A window spanning more than this many nominal sample periods has a gap
+GAP_TOLERANCE = 1.5
+
+
+def watch_windows(watch, events, half_window='250ms', signals=WRIST_SIGNALS,
+                  time_col='timestamp'):
+    """Windows of watch signals around each event.
+
+    Returns (windows, valid, rate): windows is (events, signals, samples)
+    with the rows of invalid windows left as NaN.
+    """
+    t = to_ns(watch[time_col])
+    c = to_ns(events)
+    rate = sample_rate(t)
+    half = max(int(round(pd.Timedelta(half_window).total_seconds() * rate)), 1)
+    size = 2 * half + 1
+    values = np.column_stack([watch[s].to_numpy(dtype='float32') for s in signals])
+
+    windows = np.full((len(c), len(signals), size), np.nan, dtype='float32')
+    if len(t) < size:
+        return windows, np.zeros(len(c), dtype=bool), rate
+    # Nearest sample to each event is the window center
+    idx = np.clip(np.searchsorted(t, c), 1, len(t) - 1)
+    idx = np.where(c - t[idx - 1] <= t[idx] - c, idx - 1, idx)
+    start = idx - half
+    valid = (start >= 0) & (start + size <= len(t))
+    start = np.where(valid, start, 0)
+    span = t[start + size - 1] - t[start]
+    valid &= span <= (size - 1) * GAP_TOLERANCE * NS_PER_SECOND / rate
+
+    # (samples - size + 1, signals, size) view; fancy indexing gathers only
+    # the stroke windows
+    view = np.lib.stride_tricks.sliding_window_view(values, size, axis=0)
+    windows[valid] = view[start[valid]]
+    return windows, valid, rate
+
+
+def stroke_features(watch, events, half_window='250ms', signals=WRIST_SIGNALS,
+                    time_col='timestamp'):
+    """Per-stroke peak, RMS, jerk and energy of each watch signal.
+
+    events are stroke times on the watch frame's clock. Returns a float32
+    frame with one row per event (same index when events is a Series)
+    and ``<signal>_<feature>`` columns.
+    """
+    windows, valid, rate = watch_windows(watch, events, half_window,
+                                         signals, time_col)
+    with np.errstate(invalid='ignore'):
+        features = {
+            'peak': np.abs(windows).max(axis=2),
+            'rms': np.sqrt(np.mean(windows ** 2, axis=2)),
+            'jerk': np.abs(np.diff(windows, axis=2)).max(axis=2) * rate,
+            'energy': np.sum(windows ** 2, axis=2) / rate,
+        }
+    columns = {f'{s}_{f}': features[f][:, i]
+               for i, s in enumerate(signals) for f in FEATURES}
+    index = events.index if isinstance(events, pd.Series) else None
+    return pd.DataFrame(columns, index=index, dtype='float32')
+
+
+def add_stroke_features(strokes, watch, on='timestamp', half_window='250ms',
+                        signals=WRIST_SIGNALS, time_col='timestamp'):
+    """Return a copy of strokes with the wrist features of each row added."""
+    features = stroke_features(watch, strokes[on], half_window, signals, time_col)
+    return strokes.assign(**features)
@@ -0,0 +1,87 @@
+"""Per-stroke views of a loaded frame, shared by the figures built from it.
+
+Streamlit reruns the whole script on every widget change, and each plot
+used to re-sort the frame and filter it once per stroke and signal.
+``StrokeGroups`` sorts the frame once, keeps the row positions of every
+stroke from a single groupby, and memoizes the figures built from it, so
+a rerun with the same selection reuses the figure it built last time:
+
+    groups = StrokeGroups(df)
+    serves = groups.rows('SERVEFH')                  # time-ordered rows
+    fig = groups.figure(('zepp', tuple(signals), tuple(strokes), mode),
+                        lambda: build_figure(groups, signals, strokes, mode))
+
+Rows and figures are handed out as they were built; don't modify them.
+A new dataset (or time window) is a new StrokeGroups.
+
+SVG traces (go.Scatter) slow the browser down past a few tens of
+thousands of points; ``use_webgl`` decides when a figure should use
+go.Scattergl instead, which takes the same marker symbols and colors.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+MAX_FIGURES = 32
+MAX_SELECTIONS = 64
+# Figures drawing more points than this switch to WebGL traces
+WEBGL_POINTS = 20_000
+RENDERERS = ('auto', 'svg', 'webgl')
+
+
+def _memo(cache, key, build, limit):
+    # LRU lookup, building and storing the value on a miss
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    value = cache[key] = build()
+    while len(cache) > limit:
+        cache.popitem(last=False)
+    return value
+
+
+class StrokeGroups:
+    """A frame sorted by time with the row positions of each stroke."""
+
+    def __init__(self, df, on='time', by='stroke'):
+        self.on = on
+        self.by = by
+        self.frame = df if df[on].is_monotonic_increasing else df.sort_values(on)
+        self.positions = self.frame.groupby(by, observed=True, sort=False).indices
+        self._rows = OrderedDict()
+        self._figures = OrderedDict()
+
+    def strokes(self):
+        """The strokes present, in order of first appearance."""
+        return list(self.positions)
+
+    def rows(self, strokes):
+        """Rows of one stroke, or of a list of strokes, in time order."""
+        if isinstance(strokes, str):
+            strokes = (strokes,)
+        key = tuple(strokes)
+        return _memo(self._rows, key, lambda: self._take(key), MAX_SELECTIONS)
+
+    def _take(self, strokes):
+        parts = [self.positions[s] for s in strokes if s in self.positions]
+        if not parts:
+            return self.frame.iloc[:0]
+        # Positions of each group are ascending; merge them back into time order
+        positions = parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+        return self.frame.iloc[positions]
+
+    def figure(self, key, build):
+        """The figure built for key, calling build() the first time."""
+        return _memo(self._figures, key, build, MAX_FIGURES)
+
+
+def use_webgl(points, renderer='auto', threshold=WEBGL_POINTS):
+    """Whether a figure drawing points points should use WebGL traces.
+
+    renderer 'svg' or 'webgl' overrides the automatic switch at threshold.
+    """
+    if renderer not in RENDERERS:
+        raise ValueError(f"unknown renderer {renderer!r}, expected one of {RENDERERS}")
+    if renderer == 'auto':
+        return points > threshold
+    return renderer == 'webgl'
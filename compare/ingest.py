@@ -0,0 +1,275 @@
+"""Incremental ingestion of sensor sources into the local analytics store.
+
+Rebuilding every frame from the full vendor databases and the Sensor
+Logger CSV makes each update grow with the whole history. ``ingest``
+instead remembers a high-water mark per source and appends only the rows
+past it to ``compare.store``:
+
+    babolat  max motions.time        (Babolat BabPopExt.db)
+    zepp     max swings.l_id         (Zepp U tennis ztennis.db)
+    golf     max swings.L_ID         (Zepp golf Golf3.db)
+    legacy   max SWING.HAPPENED_TIME (legacy Zepp tennis ZeppTennis.db)
+    watch    byte offset and max time of WristMotion.csv
+
+Each mark also counts the rows ingested at exactly the mark, so rows
+that arrive later with the same time are still picked up (by rowid order
+in the databases, file order in the CSV). A CSV is resumed from its
+offset only if it is the same file, by inode and a digest of its header
+and the bytes before the offset; a different or rewritten CSV is scanned
+again for the rows past the mark.
+
+Stroke sources become rows of the unified strokes table plus their vendor
+columns; the watch CSV becomes raw motion partitions. New rows and the
+new mark are committed together, so an interrupted run is simply redone.
+
+    python -m compare.ingest babolat=BabPopExt.db zepp=ztennis2.db watch=WristMotion.csv
+"""
+import hashlib
+import io
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from compare import store as store_
+from compare.sensors import SENSORS
+from compare.strokes import bab_stroke, stroke_hand_type, stroke_swing_type, \
+    zepp_hand_type, zepp_stroke, zepp_swing_type
+from compare.timestamps import BAB_TIME_SCALE, WATCH_TIME_SCALE, ZEPP_TIME_SCALE, \
+    epoch_to_local
+from compare.watch import watch_dtypes
+
+# CSV bytes parsed at a time, cut at a line end
+CHUNK_BYTES = 32 * 1024**2
+# Bytes before the resume offset that must be unchanged to resume
+FINGERPRINT_BYTES = 4096
+
+
+def _local_ns(values, scale):
+    # Raw epoch integers -> Arizona local wall clock as int64 ns
+    return epoch_to_local(values, scale).asi8
+
+
+def _events(time, stroke=None, swing_type=None, hand_type=None, speed=None, score=None):
+    # A frame of the unified stroke event columns
+    return pd.DataFrame({'time': time, 'stroke': stroke, 'swing_type': swing_type,
+                         'hand_type': hand_type, 'speed': speed, 'score': score},
+                        columns=store_.EVENT_COLUMNS)
+
+
+def _babolat_rows(df):
+    stroke = bab_stroke(df['type'], df['spin'])
+    events = _events(_local_ns(df['time'], BAB_TIME_SCALE), stroke,
+                     stroke_swing_type(stroke), stroke_hand_type(stroke),
+                     df['SpeedValue'].to_numpy(),
+                     (df['SpeedScore'] + df['StyleScore'] + df['EffectScore']).to_numpy())
+    # motions.time is kept as raw_time next to the event's local time
+    return events, df.rename(columns={'time': 'raw_time'})
+
+
+def _zepp_rows(df):
+    events = _events(_local_ns(df['l_id'], ZEPP_TIME_SCALE),
+                     zepp_stroke(df['swing_type'], df['swing_side']),
+                     zepp_swing_type(df['swing_type']), zepp_hand_type(df['swing_side']),
+                     df['racket_speed'].to_numpy())
+    return events, df
+
+
+def _golf_rows(df):
+    events = _events(_local_ns(df['L_ID'], ZEPP_TIME_SCALE),
+                     speed=df['IMPACT_SPEED'].to_numpy(), score=df['SCORE'].to_numpy())
+    return events, df
+
+
+def _legacy_rows(df):
+    # Legacy Zepp numbers hands 1 (FH) / 2 (BH)
+    events = _events(_local_ns(df['HAPPENED_TIME'], ZEPP_TIME_SCALE),
+                     zepp_stroke(df['SWING_TYPE'], df['HAND_TYPE'] - 1),
+                     zepp_swing_type(df['SWING_TYPE']), zepp_hand_type(df['HAND_TYPE'] - 1),
+                     df['BALL_SPEED'].to_numpy())
+    return events, df
+
+
+def _watch_rows(df):
+    return df.assign(time=_local_ns(df['time'], WATCH_TIME_SCALE), raw_time=df['time'])
+
+
+# How each sensor's raw rows enter the store: (events, details) for the
+# stroke sensors, motion rows for the watch
+ROWS = {
+    'babolat': _babolat_rows,
+    'zepp': _zepp_rows,
+    'golf': _golf_rows,
+    'legacy': _legacy_rows,
+    'watch': _watch_rows,
+}
+
+
+def _get_mark(conn, source):
+    # (mark, path, offset, rows, at_mark, fingerprint)
+    row = conn.execute("SELECT mark, path, offset, rows, at_mark, fingerprint "
+                       "FROM ingest_marks WHERE source = ?", (source,)).fetchone()
+    # at_mark is NULL for marks set before it was kept: every row at the
+    # mark had been ingested
+    return row if row else (None, None, None, 0, 0, None)
+
+
+def _set_mark(conn, source, mark, at_mark, path, offset, count, fingerprint=None):
+    total = _get_mark(conn, source)[3]
+    conn.execute("INSERT OR REPLACE INTO ingest_marks (source, mark, path, offset, rows, "
+                 "updated, at_mark, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                 (source, mark, path, offset, total + count, time.time(), at_mark,
+                  fingerprint))
+
+
+def _past_mark(df, key, mark, at_mark):
+    # Rows of df (read from the mark on) not ingested yet: later keys, and
+    # those at the mark beyond the at_mark already ingested
+    t = df[key].to_numpy()
+    keep = t > mark
+    if at_mark is not None:
+        keep[np.flatnonzero(t == mark)[at_mark:]] = True
+    return df[keep]
+
+
+def _advance(df, key, mark, at_mark):
+    # (mark, at_mark) once the rows of df are ingested too
+    if not len(df):
+        return mark, at_mark
+    t = df[key].to_numpy()
+    top = int(t.max())
+    count = int(np.count_nonzero(t == top))
+    return top, count + (at_mark or 0 if top == mark else 0)
+
+
+def _ingest_table(conn, name, path):
+    source = SENSORS[name]
+    mark, _, _, _, at_mark, _ = _get_mark(conn, name)
+    query = f'SELECT * FROM "{source.table}"'
+    params = ()
+    if mark is not None:
+        query += f' WHERE "{source.key}" >= ?'
+        params = (mark,)
+    src = sqlite3.connect(path)
+    try:
+        df = pd.read_sql(query + f' ORDER BY "{source.key}", rowid', src, params=params)
+    finally:
+        src.close()
+    if mark is not None:
+        df = _past_mark(df, source.key, mark, at_mark)
+    mark, at_mark = _advance(df, source.key, mark, at_mark)
+    with conn:
+        store_.append_strokes(conn, name, *ROWS[name](df))
+        _set_mark(conn, name, mark, at_mark, os.path.abspath(path), None, len(df))
+    return len(df)
+
+
+def _fingerprint(f, header, offset):
+    # Identity of the file read up to offset: its inode and a digest of
+    # the header and the bytes just before offset (read without seeking)
+    n = min(offset, FINGERPRINT_BYTES)
+    tail = os.pread(f.fileno(), n, offset - n)
+    digest = hashlib.sha1(header + tail).hexdigest()
+    return f'{os.fstat(f.fileno()).st_ino}:{digest}'
+
+
+def _blocks(f, start, end, blocksize):
+    # (bytes, offset after them) of whole lines of f from start to end,
+    # which must be a line end
+    f.seek(start)
+    pos = start
+    while pos < end:
+        block = f.read(min(blocksize, end - pos))
+        if not block.endswith(b'\n'):
+            block += f.readline()
+        pos += len(block)
+        yield block, pos
+
+
+def _complete_size(path):
+    # File size up to the end of its last complete line
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        pos = size
+        while pos > 0:
+            step = min(pos, 65536)
+            f.seek(pos - step)
+            block = f.read(step)
+            cut = block.rfind(b'\n')
+            if cut >= 0:
+                return pos - step + cut + 1
+            pos -= step
+    return 0
+
+
+def _ingest_watch(conn, name, path, store=None, blocksize=CHUNK_BYTES):
+    mark, old_path, offset, _, at_mark, fingerprint = _get_mark(conn, name)
+    path = os.path.abspath(path)
+    end = _complete_size(path)
+    dtypes = watch_dtypes(path)
+    # Partitions written after the last committed mark are leftovers of
+    # an interrupted run; they are named by local time, the mark is raw
+    local_mark = None if mark is None else int(_local_ns([mark], WATCH_TIME_SCALE)[0])
+    store_.drop_motion_after(name, local_mark, store)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        # Same file grown since the last run: start where it stopped, all
+        # rows past the offset are new. Otherwise scan it and keep the rows
+        # past the time mark.
+        resume = (old_path == path and offset and offset <= end and
+                  fingerprint == _fingerprint(f, header, offset))
+        start = offset if resume else len(header)
+        count = 0
+        for block, pos in _blocks(f, start, end, blocksize):
+            chunk = pd.read_csv(io.BytesIO(block), names=list(dtypes), header=None,
+                                dtype=dtypes)
+            if not resume and mark is not None:
+                chunk = _past_mark(chunk, 'time', mark, at_mark)
+            if len(chunk):
+                store_.write_motion(name, ROWS[name](chunk), store)
+            mark, at_mark = _advance(chunk, 'time', mark, at_mark)
+            # Rows, mark and offset advance together
+            with conn:
+                _set_mark(conn, name, mark, at_mark, path, pos, len(chunk),
+                          _fingerprint(f, header, pos))
+            count += len(chunk)
+        if start >= end:
+            with conn:
+                _set_mark(conn, name, mark, at_mark, path, end, 0,
+                          _fingerprint(f, header, end))
+    return count
+
+
+def ingest(source, path, store=None):
+    """Append the rows of path newer than the source's mark to the store.
+
+    Returns the number of rows appended.
+    """
+    if source not in ROWS:
+        raise ValueError(f"unknown source {source!r}, expected one of {list(ROWS)}")
+    conn = store_.connect(store)
+    try:
+        if SENSORS[source].table is None:
+            return _ingest_watch(conn, source, path, store)
+        return _ingest_table(conn, source, path)
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return 1
+    for arg in argv:
+        source, _, path = arg.partition('=')
+        n = ingest(source, path)
+        print(f"{source}: {n} new rows from {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
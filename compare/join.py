@@ -0,0 +1,137 @@
+"""k-way temporal join of sensor streams.
+
+``join_streams`` aligns any number of time-sorted streams onto a base
+stream in one pass: every stream's key column is shifted by its clock
+offset, each base row is located in it with a vectorized ``searchsorted``
+and only the selected columns are gathered into the output. Nothing is
+re-sorted that is already sorted and no pairwise intermediate frames are
+built, unlike chained ``merge_asof`` calls.
+
+    table, report = join_streams(
+        Stream(dfu, 'time', name='zepp'),
+        Stream(dfb, 'time', name='bab', offset=shift, tolerance='5s',
+               columns={'PIQ': 'PIQ', 'stroke': 'stroke_bab'}),
+    )
+"""
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from compare.align import to_ns
+
+DIRECTIONS = ('nearest', 'backward', 'forward')
+
+
+@dataclass
+class Stream:
+    """A sensor frame taking part in a join.
+
+    on is the datetime key column. offset is the stream's clock offset
+    (``key - offset`` is on the base clock) and tolerance the largest gap
+    to a base row that still counts as a match (None for no limit).
+    columns selects the columns to keep, as a list or a {column: output
+    name} dict; by default every column but the key. Output names already
+    taken get suffix appended (``_<name>`` by default).
+    """
+    frame: pd.DataFrame
+    on: str = 'time'
+    name: str = ''
+    columns: Any = None
+    offset: Any = None
+    tolerance: Any = None
+    direction: str = 'nearest'
+    suffix: str = None
+
+    def output_columns(self):
+        if self.columns is None:
+            return {c: c for c in self.frame.columns if c != self.on}
+        if isinstance(self.columns, dict):
+            return dict(self.columns)
+        return {c: c for c in self.columns}
+
+    def key_ns(self):
+        t = to_ns(self.frame[self.on])
+        if self.offset is not None:
+            t = t - pd.Timedelta(self.offset).value
+        return t
+
+
+def _nearest(keys, queries, direction):
+    # Position in keys (sorted) matched to each query and its distance
+    n = len(keys)
+    idx = np.searchsorted(keys, queries, side='left')
+    before = np.clip(np.searchsorted(keys, queries, side='right') - 1, 0, n - 1)
+    after = np.clip(idx, 0, n - 1)
+    back = queries - keys[before]
+    ahead = keys[after] - queries
+    # Sides that don't exist (or point the wrong way) never match
+    back = np.where(back >= 0, back, np.iinfo('int64').max)
+    ahead = np.where(ahead >= 0, ahead, np.iinfo('int64').max)
+    if direction == 'backward':
+        return before, back
+    if direction == 'forward':
+        return after, ahead
+    # Ties go backward, as in merge_asof
+    take_back = back <= ahead
+    return np.where(take_back, before, after), np.where(take_back, back, ahead)
+
+
+def match_index(base_ns, stream):
+    """Row positions in stream.frame matched to each base time, -1 if none."""
+    if stream.direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {DIRECTIONS}")
+    keys = stream.key_ns()
+    if not len(keys) or not len(base_ns):
+        return np.full(len(base_ns), -1, dtype='int64')
+    order = None
+    if np.any(keys[1:] < keys[:-1]):
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+    pos, dist = _nearest(keys, base_ns, stream.direction)
+    limit = (np.iinfo('int64').max - 1 if stream.tolerance is None
+             else pd.Timedelta(stream.tolerance).value)
+    pos = np.where(dist <= limit, pos, -1)
+    if order is not None:
+        pos = np.where(pos >= 0, order[pos], -1)
+    return pos
+
+
+def join_streams(base, *streams):
+    """Join streams onto the rows of base.
+
+    Returns the joined frame, one row per base row in base order with the
+    base key shifted onto the base clock, and a report frame indexed by
+    stream name counting base rows left unmatched and stream rows never
+    used.
+    """
+    frame = base.frame
+    base_ns = base.key_ns()
+    key = frame[base.on]
+    if base.offset is not None:
+        key = key - pd.Timedelta(base.offset)
+    data = {base.on: key.array}
+    data.update({out: frame[col].array
+                 for col, out in base.output_columns().items()})
+
+    report = {}
+    for i, stream in enumerate(streams):
+        name = stream.name or f'stream{i + 1}'
+        suffix = stream.suffix if stream.suffix is not None else f'_{name}'
+        pos = match_index(base_ns, stream)
+        matched = pos >= 0
+        for col, out in stream.output_columns().items():
+            if out in data:
+                out = out + suffix
+            data[out] = stream.frame[col].array.take(pos, allow_fill=True)
+        used = np.zeros(len(stream.frame), dtype=bool)
+        used[pos[matched]] = True
+        report[name] = {'matched': int(matched.sum()),
+                        'unmatched': int((~matched).sum()),
+                        'unused': int((~used).sum())}
+
+    table = pd.DataFrame(data, copy=False)
+    report = pd.DataFrame.from_dict(report, orient='index',
+                                    columns=['matched', 'unmatched', 'unused'])
+    return table, report
@@ -0,0 +1,83 @@
+"""Concurrent loading of independent sensor sources.
+
+Each wrangler reads its own database or CSV, so running them one after
+another makes a load cost the sum of all sources. ``load_sources`` runs
+them at once: SQLite reads go to a thread pool (sqlite3 releases the GIL
+while it queries) and CSV parsing, which is CPU bound, to a process pool.
+A load then costs about as much as its slowest source. A failing source
+doesn't stop the others; its exception is collected under its name.
+
+    frames, errors = load_sources({
+        'watch': Load(read_watch, (Apple_path, start, end), process=True),
+        'babolat': Load(babolat, (Bab_path, start, end)),
+    })
+
+(``compare.sensors.load_task`` builds these for the registered sensors.)
+
+Worker processes are forked, so scripts without a ``__main__`` guard work
+as they are; where fork is unavailable process loads run in threads.
+Thread loads run in a copy of the caller's context variables, so state
+such as the run ``compare.profile`` is recording follows them.
+"""
+import contextvars
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+@dataclass
+class Load:
+    """One source to load: func(*args, **kwargs), in a worker process if
+    process is set (for CPU-bound parsing), else in a thread."""
+    func: Callable
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    process: bool = False
+
+
+class LoadError(Exception):
+    """One or more sources failed to load; errors maps name -> exception."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(f'{name}: {err}' for name, err in errors.items()))
+
+
+def _fork_context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def load_sources(loads, strict=False):
+    """Run the loads concurrently.
+
+    loads maps a source name to a Load. Returns (results, errors), both
+    dicts keyed by name in the order of loads; a failed source is in
+    errors only. With strict, raise LoadError once all have finished
+    if any failed.
+    """
+    context = _fork_context()
+    in_process = {name for name, load in loads.items() if load.process and context}
+    threads = len(loads) - len(in_process)
+    futures = {}
+    with ThreadPoolExecutor(max_workers=max(threads, 1)) as thread_pool, \
+            ProcessPoolExecutor(max_workers=max(len(in_process), 1),
+                                mp_context=context) as process_pool:
+        for name, load in loads.items():
+            if name in in_process:
+                futures[name] = process_pool.submit(load.func, *load.args, **load.kwargs)
+            else:
+                context_run = contextvars.copy_context().run
+                futures[name] = thread_pool.submit(context_run, load.func,
+                                                   *load.args, **load.kwargs)
+        results, errors = {}, {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as err:
+                errors[name] = err
+    if strict and errors:
+        raise LoadError(errors)
+    return results, errors
@@ -0,0 +1,168 @@
+"""Streaming peak detection over chunked watch signals.
+
+``PeakStream`` gives the same peaks as
+``scipy.signal.find_peaks(x, threshold=..., distance=...)`` on the whole
+signal, but consumes it chunk by chunk. Only two things are carried
+between chunks: the trailing run of equal samples (whose right neighbour
+is still unknown) and the candidate peaks closer than ``distance`` to the
+end of the data seen so far. Each peak is emitted once no later sample
+can change its fate, so memory stays bounded however long the session.
+(Peaks of exactly equal height closer than ``distance`` may resolve the
+other way round: find_peaks leaves that order unspecified.)
+
+    stream = PeakStream('gravityX', threshold=20, distance=25)
+    for chunk in iter_watch_chunks(path, start, end, columns=['gravityX']):
+        events = stream.update(chunk)
+    events = stream.flush()
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from compare.watch import CHUNK_ROWS, iter_watch_chunks
+
+PEAK_THRESHOLD = 20
+PEAK_DISTANCE = 25
+
+
+def _select_by_distance(pos, values, distance):
+    # find_peaks' distance rule: walking from the highest peak down, drop
+    # every lower peak closer than distance to one that is kept
+    keep = np.ones(len(pos), dtype=bool)
+    for j in np.argsort(values, kind='stable')[::-1]:
+        if not keep[j]:
+            continue
+        k = j - 1
+        while k >= 0 and pos[j] - pos[k] < distance:
+            keep[k] = False
+            k -= 1
+        k = j + 1
+        while k < len(pos) and pos[k] - pos[j] < distance:
+            keep[k] = False
+            k += 1
+    return keep
+
+
+class PeakStream:
+    """Incremental find_peaks(threshold, distance) over one signal column.
+
+    update() takes the next chunk (a frame with column and time_col) and
+    returns the peaks confirmed so far as a frame of ``sample`` (position
+    in the whole stream), time_col and column. flush() returns the rest
+    once the stream has ended.
+    """
+
+    def __init__(self, column, threshold=PEAK_THRESHOLD, distance=PEAK_DISTANCE,
+                 time_col='timestamp'):
+        if distance is not None and distance < 1:
+            raise ValueError("distance must be at least 1")
+        self.column = column
+        self.threshold = threshold
+        self.distance = 1 if distance is None else math.ceil(distance)
+        self.time_col = time_col
+        # Samples not yet settled and the stream position of the first one
+        self._start = 0
+        self._values = np.zeros(0, dtype='float64')
+        self._times = np.zeros(0, dtype='datetime64[ns]')
+        # Candidate peaks whose distance selection is still open
+        self._pos = np.zeros(0, dtype='int64')
+        self._peak_values = np.zeros(0, dtype='float64')
+        self._peak_times = np.zeros(0, dtype='datetime64[ns]')
+
+    def _candidates(self, values):
+        # Local maxima (plateau midpoints) of values that pass the
+        # threshold, leaving out the last run whose right side is unknown.
+        # Returns their positions and where the last run starts.
+        change = np.flatnonzero(values[1:] != values[:-1]) + 1
+        starts = np.r_[0, change]
+        ends = np.r_[change - 1, len(values) - 1]
+        run = values[starts]
+        inner = np.arange(1, len(starts) - 1)
+        is_peak = (run[inner - 1] < run[inner]) & (run[inner + 1] < run[inner])
+        peaks = inner[is_peak]
+        pos = (starts[peaks] + ends[peaks]) // 2
+        if self.threshold is not None and len(pos):
+            rise = np.minimum(values[pos] - values[pos - 1],
+                              values[pos] - values[pos + 1])
+            pos = pos[rise >= self.threshold]
+        return pos, starts[-1]
+
+    def _emit(self, horizon):
+        # Finalize candidates that no peak at or after horizon can reach
+        pos = self._pos
+        if horizon is None:
+            n = len(pos)
+        else:
+            gap = np.flatnonzero(np.diff(pos) >= self.distance)
+            n = gap[-1] + 1 if len(gap) else 0
+            if len(pos) and horizon - pos[-1] >= self.distance:
+                n = len(pos)
+        keep = _select_by_distance(pos[:n], self._peak_values[:n], self.distance)
+        events = pd.DataFrame({'sample': pos[:n][keep],
+                               self.time_col: self._peak_times[:n][keep],
+                               self.column: self._peak_values[:n][keep]})
+        self._pos = pos[n:]
+        self._peak_values = self._peak_values[n:]
+        self._peak_times = self._peak_times[n:]
+        return events
+
+    def update(self, chunk):
+        """Feed the next chunk; return the peaks it confirms."""
+        values = np.r_[self._values, chunk[self.column].to_numpy(dtype='float64')]
+        times = np.r_[self._times,
+                      chunk[self.time_col].to_numpy(dtype='datetime64[ns]')]
+        if len(values) < 3:
+            self._values, self._times = values, times
+            return self._emit(self._start)
+
+        pos, last_run = self._candidates(values)
+        self._pos = np.r_[self._pos, self._start + pos]
+        self._peak_values = np.r_[self._peak_values, values[pos]]
+        self._peak_times = np.r_[self._peak_times, times[pos]]
+
+        # Later peaks can only come from the last run onwards
+        horizon = self._start + last_run
+        # Keep the last run and its left neighbour for the next chunk
+        carry = max(last_run - 1, 0)
+        self._values, self._times = values[carry:], times[carry:]
+        self._start += carry
+        return self._emit(horizon)
+
+    def flush(self):
+        """Return the remaining peaks at the end of the stream."""
+        events = self._emit(None)
+        self._values = self._values[:0]
+        self._times = self._times[:0]
+        return events
+
+
+def stream_peaks(chunks, column, threshold=PEAK_THRESHOLD, distance=PEAK_DISTANCE,
+                 time_col='timestamp'):
+    """Yield frames of peak events from an iterable of chunks."""
+    stream = PeakStream(column, threshold, distance, time_col)
+    for chunk in chunks:
+        events = stream.update(chunk)
+        if len(events):
+            yield events
+    events = stream.flush()
+    if len(events):
+        yield events
+
+
+def watch_peaks(file_path, column, start_date=None, end_date=None,
+                threshold=PEAK_THRESHOLD, distance=PEAK_DISTANCE,
+                chunksize=CHUNK_ROWS):
+    """Peaks of one Sensor Logger CSV column, read chunk by chunk.
+
+    ``sample`` is the row position within the [start_date, end_date]
+    window, i.e. the row of the watch wrangler's frame for the same window.
+    """
+    chunks = iter_watch_chunks(file_path, start_date, end_date,
+                               columns=[column], chunksize=chunksize)
+    events = list(stream_peaks(chunks, column, threshold, distance))
+    if not events:
+        return pd.DataFrame({'sample': pd.Series(dtype='int64'),
+                             'timestamp': pd.Series(dtype='datetime64[ns]'),
+                             column: pd.Series(dtype='float64')})
+    return pd.concat(events, ignore_index=True)
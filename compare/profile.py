@@ -0,0 +1,179 @@
+"""Per-stage timing, row counts and peak memory of the processing pipeline.
+
+The wranglers and the dashboard pipeline mark their stages (SQL read,
+timezone conversion, normalization, join, ...):
+
+    with stage('zepp: read_sql') as s:
+        df = pd.read_sql(query, conn)
+        s.rows_out = len(df)
+
+Nothing is recorded unless a run is being profiled, and then only for
+the thread that started it and the threads it starts loads in (the run
+is a context variable, which ``compare.parallel`` hands to its load
+threads), so concurrent dashboard sessions profile independently:
+
+    with profiling(memory=True, cprofile='load.prof') as run:
+        df = load_and_process_data(...)
+    run.frame()   # stage, seconds, rows_in, rows_out, peak_bytes, depth
+
+Disabled, ``stage`` hands back one shared no-op context, so the hooks
+cost a context variable lookup per stage. memory=True traces allocations with
+tracemalloc (numpy reports its buffers there too) to get each stage's
+peak above its starting level; concurrent stages share one peak. cprofile
+and snapshot dump a cProfile stats file and a tracemalloc snapshot of the
+whole run. Stages inside worker processes are not recorded.
+"""
+import contextvars
+import cProfile
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+COLUMNS = ['stage', 'seconds', 'rows_in', 'rows_out', 'peak_bytes', 'depth']
+
+# The run being profiled in this context, None when profiling is off
+_active = contextvars.ContextVar('compare.profile.run', default=None)
+
+
+class _NullStage:
+    # Shared do-nothing stage; rows_out assignments are dropped
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL = _NullStage()
+
+
+class _Stage:
+    def __init__(self, run, name, rows_in):
+        self.run = run
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.peak = 0
+
+    def __enter__(self):
+        stack = self.run._stack()
+        self.depth = len(stack)
+        if self.run.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.start_bytes = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        stack = self.run._stack()
+        stack.pop()
+        peak_bytes = None
+        if self.run.memory:
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            # Other threads' stages reset the shared peak, never below 0
+            peak_bytes = max(peak - self.start_bytes, 0)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+        self.run.records.append((self.name, seconds, self.rows_in, self.rows_out,
+                                 peak_bytes, self.depth))
+        return False
+
+
+class Run:
+    """Stage records of one profiled run."""
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.records = []
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def frame(self):
+        """The stages in the order they finished."""
+        return pd.DataFrame(self.records, columns=COLUMNS)
+
+
+def enabled():
+    return _active.get() is not None
+
+
+def stage(name, rows_in=None):
+    """Context manager timing one stage of the active run (no-op when off).
+
+    Set ``rows_out`` on the returned object to record the rows produced.
+    """
+    run = _active.get()
+    if run is None:
+        return _NULL
+    return _Stage(run, name, rows_in)
+
+
+def _rows(value):
+    # Row count of a frame/array, None for anything else (paths, scalars)
+    shape = getattr(value, 'shape', None)
+    return shape[0] if shape else None
+
+
+def profiled(name=None):
+    """Decorator recording each call as a stage; rows_in/rows_out are the
+    rows of the first argument and of the result when they are frames."""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active.get() is None:
+                return func(*args, **kwargs)
+            with stage(label, _rows(args[0]) if args else None) as s:
+                result = func(*args, **kwargs)
+                s.rows_out = _rows(result)
+            return result
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def profiling(memory=False, cprofile=None, snapshot=None):
+    """Profile the stages run inside the block; yields the Run.
+
+    memory traces allocations for per-stage peaks; cprofile and snapshot
+    are paths to dump cProfile stats / a tracemalloc snapshot of the run.
+    """
+    run = Run(memory=memory or snapshot is not None)
+    started_tracing = run.memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile() if cprofile else None
+    token = _active.set(run)
+    if profiler:
+        profiler.enable()
+    try:
+        yield run
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(cprofile)
+        _active.reset(token)
+        if snapshot:
+            tracemalloc.take_snapshot().dump(snapshot)
+        if started_tracing:
+            tracemalloc.stop()
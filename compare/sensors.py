@@ -0,0 +1,275 @@
+"""One wrangler per sensor and a registry of the sensor sources.
+
+Every project used to carry its own, slowly diverging copy of
+BabWrangle / UZeppWrangle / WatchWrangle. They all live here now, configured
+by options instead of edits:
+
+    babolat  Babolat POP motions          BabPopExt.db
+    zepp     Zepp U tennis swings         ztennis.db
+    golf     Zepp golf swings             Golf3.db
+    legacy   legacy Zepp tennis SWING     ZeppTennis.db
+    watch    Sensor Logger wrist motion   WristMotion.csv
+
+Each wrangler takes the source path and an optional [start_date, end_date]
+local window (filtered inside SQLite or while streaming the CSV; ``wrangle``
+and ``load_task`` also take a session id from ``compare.sessions``),
+is cached on disk by ``compare.cache`` and returns tz-naive Arizona local
+times, with compact dtypes (``compare.dtypes``) unless compact=False.
+Their stages (SQL read, local time, compaction) show up in a
+``compare.profile`` run. ``SENSORS`` describes each source for code that
+handles them generically (parallel loading, ingestion, indexing):
+
+    frames, errors = load_sources({
+        'watch': load_task('watch', Apple_path, start_date, end_date),
+        'zepp': load_task('zepp', UZepp_path, start_date, end_date),
+    })
+"""
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+
+from compare.cache import cached
+from compare.dtypes import compact_dtypes
+from compare.parallel import Load
+from compare.profile import profiled, stage
+from compare.store import session_window
+from compare.strokes import bab_stroke, zepp_hand_type, zepp_stroke, zepp_swing_type
+from compare.timestamps import BAB_TIME_SCALE, WATCH_TIME_SCALE, ZEPP_TIME_SCALE, \
+    epoch_to_local, local_to_raw
+from compare.watch import WIDE_COLUMNS, read_watch
+
+BAB_COLUMNS = ['time', 'type', 'spin', 'StyleScore', 'StyleValue',
+               'EffectScore', 'EffectValue', 'SpeedScore', 'SpeedValue',
+               'stroke_counter']
+
+ZEPP_SENSOR_SIGNALS = [
+    'dbg_acc_1', 'dbg_acc_2', 'dbg_acc_3', 'dbg_gyro_1',
+    'dbg_gyro_2', 'dbg_var_1', 'dbg_var_2', 'dbg_var_3',
+    'dbg_var_4', 'dbg_sum_gx', 'dbg_sum_gy', 'dbg_sv_ax',
+    'dbg_sv_ay', 'dbg_max_ax', 'dbg_max_ay', 'dbg_min_az',
+    'dbg_max_az'
+]
+ZEPP_CALC_SIGNALS = [
+    'backswing_time', 'power', 'ball_spin', 'impact_position_x',
+    'impact_position_y', 'racket_speed', 'impact_region',
+    'swing_type', 'swing_side', 'l_id'
+]
+
+GOLF_COLUMNS = [
+    'UPSWING_CLUB_POSTURE', 'UP_DOWN_SWING__GOF', 'TWIST_ROTATION_RATE',
+    'IMPACT_SPEED', 'CLUB_FACE_GESTURE__GOF', 'ENDSWING_CLUB_POSTURE',
+    'UPSWING__A_TIME', 'UPSWING__B_TIME', 'TWIST_TIME',
+    'DOWNSWING_IMPACT_TIME', 'ENDSWING_TIME', 'FIRST_HALF_ANIMATION_END_FRAME',
+    'FIRST_HALF_ANIMATION_SAMPLE_POINT_NUMBER',
+    'SECOND_HALF_ANIMATION_START_FRAME', 'SECOND_HALF_ANIMATION_END_FRAME',
+    'SECOND_HALF_ANIMATION_SAMPLE_POINT_NUMBER',
+    'BACK_SWING_TEMPO_SLOW', 'TRANSITION_TEMPO_FAST', 'HAND_SPEED', 'IMPACT_DETECT',
+    'HAND_FIT', 'CLUB_PLANE', 'HAND_PLANE', '_ID', 'L_ID', 'S_ID',
+    'USER_ID', 'CLIENT_CREATED', 'SWING_TYPE', 'CLUB_TYPE_1',
+    'CLUB_TYPE_2', 'CLUB_LENGTH', 'CLUB_POSTURE', 'CLUB_POSITION',
+    'HAND', 'USER_HEIGHT', 'YEAR', 'MONTH', 'DAY', 'FACE_ANGLE',
+    'SCORE', 'MODEL_ID', 'CLIENT_HOUR'
+]
+
+LEGACY_COLUMNS = ['_id', 'HAPPENED_TIME', 'SWING_TYPE', 'HAND_TYPE',
+                  'SPIN', 'BALL_SPEED', 'HEAVINESS', 'POSITION_X', 'POSITION_Y',
+                  'L_PLAY_SESSION_ID', 'IS_HIT_FRAME']
+
+
+def _read_table(name, db_path, table, columns, key, scale, start_date, end_date,
+                index_col=None):
+    # SELECT the columns (None for all), only the date window if given
+    select = '*' if columns is None else ', '.join(f'"{c}"' for c in columns)
+    query = f"SELECT {select} FROM {table}"
+    params = ()
+    if start_date and end_date:
+        query += f" WHERE {key} BETWEEN ? AND ?"
+        params = (local_to_raw(start_date, scale), local_to_raw(end_date, scale))
+    conn = sqlite3.connect(db_path)
+    try:
+        if columns is not None:
+            known = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            unknown = [c for c in columns if c not in known]
+            # A missing table is left to read_sql to report
+            if known and unknown:
+                raise ValueError(f"{name}: no column {', '.join(map(repr, unknown))} "
+                                 f"in table {table}")
+        with stage(f'{name}: read_sql') as s:
+            df = pd.read_sql(query, conn, params=params, index_col=index_col)
+            s.rows_out = len(df)
+        return df
+    finally:
+        conn.close()
+
+
+def _local_time(name, values, scale):
+    with stage(f'{name}: local time', len(values)) as s:
+        times = epoch_to_local(values, scale)
+        s.rows_out = len(times)
+    return times
+
+
+def _compact(name, df, compact, exclude=()):
+    if not compact:
+        return df
+    with stage(f'{name}: compact', len(df)) as s:
+        df = compact_dtypes(df, exclude=exclude)
+        s.rows_out = len(df)
+    return df
+
+
+@profiled('babolat')
+@cached(version=3)
+def babolat(db_path, start_date=None, end_date=None, compact=True):
+    """Babolat POP strokes with PIQ and stroke codes."""
+    df = _read_table('babolat', db_path, 'motions', BAB_COLUMNS, 'time', BAB_TIME_SCALE,
+                     start_date, end_date)
+    df = df.drop_duplicates()
+    # Epoch units -> tz-naive Arizona local time, keeping sub-second precision
+    df['time'] = _local_time('babolat', df['time'], BAB_TIME_SCALE)
+    df['PIQ'] = df['SpeedScore'] + df['StyleScore'] + df['EffectScore']
+    df = df.sort_values('time')
+    df['stroke'] = bab_stroke(df['type'], df['spin'])
+    return _compact('babolat', df, compact)
+
+
+# Columns every Zepp frame needs: the time key and the stroke codes
+ZEPP_KEY_COLUMNS = ['swing_type', 'swing_side', 'l_id']
+
+
+@profiled('zepp')
+@cached(version=5)
+def zepp(db_path, start_date=None, end_date=None, columns=None, compact=True):
+    """Zepp U tennis swings with stroke codes.
+
+    columns picks the swing columns to read, e.g. the signals a dashboard
+    tab plots (``l_id``, ``swing_type`` and ``swing_side`` always come
+    along); the default is ZEPP_SENSOR_SIGNALS + ZEPP_CALC_SIGNALS. The
+    SELECT list is built from it, so a wide swings table only costs the
+    columns used, and rows are dropped for nulls in those columns only.
+    columns='all' reads every column of the table, rows still needing
+    non-null default columns. Names not in the table raise ValueError.
+    """
+    if columns is None:
+        columns = ZEPP_SENSOR_SIGNALS + ZEPP_CALC_SIGNALS
+    if isinstance(columns, str) and columns == 'all':
+        select, required = None, ZEPP_SENSOR_SIGNALS + ZEPP_CALC_SIGNALS
+    else:
+        select = [c for c in columns if c not in ZEPP_KEY_COLUMNS] + ZEPP_KEY_COLUMNS
+        required = select
+    df = _read_table('zepp', db_path, 'swings', select, 'l_id', ZEPP_TIME_SCALE,
+                     start_date, end_date)
+    # Epoch ms -> tz-naive Arizona local time, keeping sub-second precision
+    df['l_id'] = _local_time('zepp', df['l_id'], ZEPP_TIME_SCALE)
+    df = df.dropna(subset=[c for c in required if c in df.columns])
+    df = df.sort_values('l_id')
+    df['stroke'] = zepp_stroke(df['swing_type'], df['swing_side'])
+    df['swing_type'] = zepp_swing_type(df['swing_type'])
+    df['hand_type'] = zepp_hand_type(df['swing_side'])
+    if 'impact_position_x' in df.columns and 'impact_position_y' in df.columns:
+        df['diffxy'] = 0.5 * df['impact_position_x'] - df['impact_position_y']
+    df = df.rename(columns={'l_id': 'time'})
+    # Same local clock as the Apple Watch timestamp, kept as datetime64
+    df['timestamp'] = df['time']
+    return _compact('zepp', df, compact)
+
+
+@profiled('golf')
+@cached(version=3)
+def golf(db_path, start_date=None, end_date=None, compact=True):
+    """Zepp golf swings."""
+    df = _read_table('golf', db_path, 'swings', GOLF_COLUMNS, 'L_ID', ZEPP_TIME_SCALE,
+                     start_date, end_date)
+    df['L_ID'] = _local_time('golf', df['L_ID'], ZEPP_TIME_SCALE)
+    df = df.dropna()
+    df = df.sort_values('L_ID')
+    df = df.rename(columns={'L_ID': 'time'})
+    df['timestamp'] = df['time']
+    return _compact('golf', df, compact)
+
+
+@profiled('legacy')
+@cached(version=3)
+def legacy(db_path, start_date=None, end_date=None, compact=True):
+    """Legacy Zepp tennis swings, indexed by _id, times in HAPPENED_TIME."""
+    df = _read_table('legacy', db_path, 'SWING', LEGACY_COLUMNS, 'HAPPENED_TIME',
+                     ZEPP_TIME_SCALE, start_date, end_date, index_col='_id')
+    df['HAPPENED_TIME'] = _local_time('legacy', df['HAPPENED_TIME'], ZEPP_TIME_SCALE)
+    df['SWING_TYPE'] = zepp_swing_type(df['SWING_TYPE'])
+    # Legacy Zepp numbers hands 1 (FH) / 2 (BH)
+    df['HAND_TYPE'] = zepp_hand_type(df['HAND_TYPE'] - 1)
+    return _compact('legacy', df, compact)
+
+
+@profiled('watch')
+@cached(version=4)
+def watch(file_path, start_date=None, end_date=None, columns=None, compact=True):
+    """Sensor Logger wrist motion: float32 signals and a local timestamp,
+    streamed in chunks keeping only rows inside the date window."""
+    df = read_watch(file_path, start_date, end_date, columns)
+    # time and seconds_elapsed need their full width
+    return _compact('watch', df, compact, exclude=WIDE_COLUMNS)
+
+
+@dataclass
+class Sensor:
+    """A sensor source: its wrangler and where its raw time key lives."""
+    wrangle: Callable
+    table: str              # SQLite table, None for the CSV
+    key: str                # raw epoch time column
+    scale: int              # key units per second
+    process: bool = False   # CPU-bound parsing, load in a worker process
+
+
+SENSORS = {
+    'babolat': Sensor(babolat, 'motions', 'time', BAB_TIME_SCALE),
+    'zepp': Sensor(zepp, 'swings', 'l_id', ZEPP_TIME_SCALE),
+    'golf': Sensor(golf, 'swings', 'L_ID', ZEPP_TIME_SCALE),
+    'legacy': Sensor(legacy, 'SWING', 'HAPPENED_TIME', ZEPP_TIME_SCALE),
+    'watch': Sensor(watch, None, 'time', WATCH_TIME_SCALE, process=True),
+}
+
+
+def _sensor(name):
+    if name not in SENSORS:
+        raise ValueError(f"unknown sensor {name!r}, expected one of {list(SENSORS)}")
+    return SENSORS[name]
+
+
+def _window(start_date, end_date, session):
+    # The date window, or the time window of a session id (or list of ids)
+    if session is None:
+        return start_date, end_date
+    if start_date is not None or end_date is not None:
+        raise ValueError("pass either a session or a date window, not both")
+    return session_window(session)
+
+
+def wrangle(name, path, start_date=None, end_date=None, session=None, **options):
+    """Run the named sensor's wrangler, on a date window or a session
+    from the ``compare.sessions`` index."""
+    start_date, end_date = _window(start_date, end_date, session)
+    return _sensor(name).wrangle(path, start_date, end_date, **options)
+
+
+def load_task(name, path, start_date=None, end_date=None, session=None, **options):
+    """A compare.parallel Load for the named sensor's wrangler, on a date
+    window or a session from the ``compare.sessions`` index."""
+    sensor = _sensor(name)
+    start_date, end_date = _window(start_date, end_date, session)
+    return Load(sensor.wrangle, (path, start_date, end_date), options, sensor.process)
+
+
+def create_time_index(name, db_path):
+    """Index a sensor database's time column so date-range queries don't
+    scan the table."""
+    sensor = _sensor(name)
+    if sensor.table is None:
+        raise ValueError(f"{name} is not a database source")
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{sensor.table}_{sensor.key} "
+                 f"ON {sensor.table}({sensor.key})")
+    conn.commit()
+    conn.close()
@@ -0,0 +1,199 @@
+"""Sessions of play, found from the gaps between strokes.
+
+A session is a run of strokes (of any stroke sensor) with no gap longer
+than ``GAP`` between consecutive ones. Segmenting is a sort, a diff and
+a cumulative sum over the stroke times; motion recordings (the watch
+CSV) don't start or end sessions, they are only listed as present in
+the sessions they overlap.
+
+The session index has one row per session:
+
+    session     id, the local start day and its number within the day,
+                e.g. '2024-06-12.1'
+    start, end  first and last stroke, local time
+    strokes     strokes of the sensor that saw the most
+    sensors     sensors present, e.g. 'babolat,zepp,watch'
+
+It is kept in the compare store and built from the sources' time
+columns, without reading anything else:
+
+    python -m compare.sessions babolat=<BabPopExt.db> zepp=<ztennis.db> watch=<WristMotion.csv>
+    python -m compare.sessions            # print the index
+
+Wranglers then load a session by id, through an index lookup for its
+time window and the time-indexed read, and ``assign`` labels rows of any
+loaded frame with the indexed ids:
+
+    load_task('zepp', UZepp_path, session='2024-06-12.1')
+    df['session'] = assign(df['time'], store.sessions())
+"""
+import argparse
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+from compare import store as store_
+from compare.sensors import SENSORS
+from compare.timestamps import epoch_to_local
+from compare.watch import iter_watch_chunks
+
+GAP = pd.Timedelta('30min')
+INDEX_COLUMNS = ['start', 'end', 'strokes', 'sensors']
+
+
+def _ns(times):
+    return np.asarray(times, dtype='datetime64[ns]').view('int64')
+
+
+def segment(times, gap=GAP):
+    """Session number (0, 1, ...) of each of the sorted times; a session
+    ends at a gap longer than gap."""
+    t = _ns(times)
+    return np.cumsum(np.diff(t, prepend=t[:1]) > pd.Timedelta(gap).value)
+
+
+def spans(times, gap=GAP):
+    """(start, end) of every segment of the sorted times, as a frame."""
+    t = _ns(times)
+    if not len(t):
+        return pd.DataFrame({'start': [], 'end': []}, dtype='datetime64[ns]')
+    # Last sample of each segment, then the first of the next one
+    breaks = np.flatnonzero(np.diff(t) > pd.Timedelta(gap).value)
+    return pd.DataFrame({'start': t[np.r_[0, breaks + 1]],
+                         'end': t[np.r_[breaks, len(t) - 1]]}).astype('datetime64[ns]')
+
+
+def session_ids(starts):
+    """Ids of sessions starting at the sorted local times starts."""
+    day = pd.Series(pd.DatetimeIndex(starts).strftime('%Y-%m-%d'))
+    number = day.groupby(day).cumcount() + 1
+    return (day + '.' + number.astype(str)).to_numpy()
+
+
+def label(times, gap=GAP):
+    """Session id of each of the sorted times, as in session_ids."""
+    number = segment(times, gap)
+    t = _ns(times)
+    first = np.flatnonzero(np.diff(number, prepend=-1))
+    return session_ids(t[first].astype('datetime64[ns]'))[number]
+
+
+def assign(times, index, pad=store_.SESSION_PAD):
+    """Id of the indexed session each time falls in (within pad of its
+    first or last stroke), None outside every session.
+
+    index is the session index (``compare.store.sessions()``); sessions
+    don't overlap, so each time is looked up by the last session starting
+    by then.
+    """
+    t = _ns(times)
+    if not len(index):
+        return np.full(len(t), None, dtype=object)
+    index = index.sort_values('start')
+    k = np.searchsorted(_ns(index['start'] - pad), t, side='right') - 1
+    inside = (k >= 0) & (t <= _ns(index['end'] + pad)[np.maximum(k, 0)])
+    ids = np.asarray(index.index, dtype=object)
+    return np.where(inside, ids[np.maximum(k, 0)], None)
+
+
+def session_index(events, motion=None, gap=GAP):
+    """The session index of stroke events.
+
+    events is a frame of local ``time`` and ``sensor`` with the strokes of
+    every stroke sensor; motion optionally maps motion sensors to their
+    recording spans (start/end frames as from ``spans``).
+    """
+    events = events.sort_values('time', kind='stable')
+    number = segment(events['time'], gap)
+    counts = pd.crosstab(number, events['sensor'].to_numpy())
+    order = [s for s in SENSORS if s in counts.columns]
+    grouped = events['time'].groupby(number)
+    index = pd.DataFrame({'start': grouped.min().to_numpy(),
+                          'end': grouped.max().to_numpy(),
+                          'strokes': counts.max(axis=1).to_numpy()})
+    present = {s: counts[s].to_numpy() > 0 for s in order}
+    for name, recorded in (motion or {}).items():
+        present[name] = _overlaps(index, recorded)
+    names = np.array(list(present))
+    mask = np.column_stack(list(present.values()))
+    index['sensors'] = [','.join(names[row]) for row in mask]
+    index.index = pd.Index(session_ids(index['start']), name='session')
+    return index[INDEX_COLUMNS]
+
+
+def _overlaps(index, recorded):
+    # Whether any recorded span overlaps each session
+    if not len(recorded):
+        return np.zeros(len(index), dtype=bool)
+    recorded = recorded.sort_values('start')
+    starts = _ns(recorded['start'])
+    reach = np.maximum.accumulate(_ns(recorded['end']))
+    # Spans starting by the session's end; the furthest of them must reach its start
+    k = np.searchsorted(starts, _ns(index['end']), side='right')
+    return (k > 0) & (reach[np.maximum(k - 1, 0)] >= _ns(index['start']))
+
+
+def sensor_times(name, path):
+    """Sorted local times of a stroke sensor's events, reading only its
+    time column."""
+    sensor = SENSORS[name]
+    conn = sqlite3.connect(path)
+    try:
+        raw = pd.read_sql(f"SELECT {sensor.key} FROM {sensor.table} ORDER BY {sensor.key}",
+                          conn)[sensor.key]
+    finally:
+        conn.close()
+    return epoch_to_local(raw, sensor.scale)
+
+
+def motion_spans(name, path, gap=GAP):
+    """Recording spans of a motion CSV, streamed reading only its time."""
+    parts = [spans(chunk['timestamp'], gap)
+             for chunk in iter_watch_chunks(path, columns=['time'])]
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return spans([], gap)
+    # Join spans continuing across chunk boundaries
+    joined = pd.concat(parts, ignore_index=True)
+    start, end = _ns(joined['start']), _ns(joined['end'])
+    new = np.r_[True, start[1:] - end[:-1] > pd.Timedelta(gap).value]
+    group = np.cumsum(new)
+    return pd.DataFrame({'start': joined['start'].groupby(group).min().to_numpy(),
+                         'end': joined['end'].groupby(group).max().to_numpy()})
+
+
+def build_index(paths, gap=GAP):
+    """Session index of the sources in paths (sensor name -> path)."""
+    events, motion = [], {}
+    for name, path in paths.items():
+        if name not in SENSORS:
+            raise ValueError(f"unknown sensor {name!r}, expected one of {list(SENSORS)}")
+        if SENSORS[name].table is None:
+            motion[name] = motion_spans(name, path, gap)
+        else:
+            events.append(pd.DataFrame({'time': sensor_times(name, path), 'sensor': name}))
+    if not events:
+        raise ValueError("sessions need at least one stroke sensor")
+    return session_index(pd.concat(events, ignore_index=True), motion, gap)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build the session index of sensor sources into the compare store, "
+                    "or print it.")
+    parser.add_argument('sources', nargs='*', metavar='sensor=path')
+    parser.add_argument('--gap', default=str(GAP),
+                        help="longest pause within a session (default %(default)s)")
+    args = parser.parse_args(argv)
+    if args.sources:
+        paths = dict(arg.partition('=')[::2] for arg in args.sources)
+        store_.write_sessions(build_index(paths, pd.Timedelta(args.gap)))
+    index = store_.sessions()
+    print(index.to_string() if len(index) else "no sessions indexed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
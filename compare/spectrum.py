@@ -0,0 +1,137 @@
+"""Spectra of wrist signals: whole-session, Welch and per-stroke STFT.
+
+Watch samples are not exactly evenly spaced (Sensor Logger drops and
+bunches samples, and sessions have gaps), so signals are first
+interpolated onto a uniform grid at the median sample rate. Per-stroke
+spectra interpolate only the samples of each stroke window, centered on
+detected peaks or Zepp stroke times, and transform all windows with one
+batched ``rfft``:
+
+    freqs, spectra = stroke_spectra(dfa['timestamp'], dfa['gravityX'],
+                                    dfu['timestamp'], window='2s')
+    # spectra[i] is the magnitude spectrum of stroke i (NaN if its
+    # window runs off the recording)
+"""
+import numpy as np
+import pandas as pd
+
+from compare.align import to_ns
+
+NS_PER_SECOND = 10**9
+
+
+def sample_rate(times):
+    """Median sample rate (Hz) of datetime samples."""
+    t = to_ns(times)
+    if len(t) < 2:
+        raise ValueError("need at least two samples to estimate the rate")
+    return NS_PER_SECOND / np.median(np.diff(t))
+
+
+def resample_uniform(times, values, rate=None):
+    """Linearly interpolate values onto a uniform grid at rate Hz.
+
+    values may be 1-D or 2-D (samples x signals). Gaps in the recording
+    are bridged linearly. Returns the grid (int64 ns) and the values.
+    """
+    t = to_ns(times)
+    v = np.asarray(values, dtype='float64')
+    rate = sample_rate(t) if rate is None else rate
+    step = max(int(round(NS_PER_SECOND / rate)), 1)
+    grid = np.arange(t[0], t[-1] + 1, step, dtype='int64')
+    if v.ndim == 1:
+        return grid, np.interp(grid, t, v)
+    return grid, np.column_stack([np.interp(grid, t, v[:, i])
+                                  for i in range(v.shape[1])])
+
+
+def _taper(size, taper):
+    if taper is None:
+        return np.ones(size)
+    if taper == 'hann':
+        # Periodic Hann, as used for spectral analysis (scipy's default)
+        return 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(size) / size)
+    return np.asarray(taper, dtype='float64')
+
+
+def spectrum(times, values, rate=None):
+    """Magnitude spectrum of a whole signal after uniform resampling.
+
+    Returns (freqs, magnitudes) for the non-negative frequencies.
+    """
+    grid, v = resample_uniform(times, values, rate)
+    rate = NS_PER_SECOND / (grid[1] - grid[0]) if len(grid) > 1 else rate
+    return np.fft.rfftfreq(len(v), 1 / rate), np.abs(np.fft.rfft(v))
+
+
+def welch(times, values, segment='4s', overlap=0.5, rate=None, taper='hann'):
+    """Welch power spectral density: mean periodogram of overlapping,
+    tapered segments of the uniformly resampled signal."""
+    grid, v = resample_uniform(times, values, rate)
+    rate = NS_PER_SECOND / (grid[1] - grid[0])
+    size = int(round(pd.Timedelta(segment).total_seconds() * rate))
+    if size > len(v):
+        raise ValueError("segment is longer than the signal")
+    hop = max(int(size * (1 - overlap)), 1)
+    segments = np.lib.stride_tricks.sliding_window_view(v, size)[::hop]
+    w = _taper(size, taper)
+    segments = (segments - segments.mean(axis=1, keepdims=True)) * w
+    power = np.abs(np.fft.rfft(segments, axis=1)) ** 2
+    psd = power.mean(axis=0) / (rate * np.sum(w ** 2))
+    # One-sided: fold the negative frequencies in, except DC and Nyquist
+    psd[1:-1 if size % 2 == 0 else None] *= 2
+    return np.fft.rfftfreq(size, 1 / rate), psd
+
+
+def stroke_windows(times, values, centers, window='2s', rate=None):
+    """Uniformly sampled windows of a signal centered on each event.
+
+    Returns a (len(centers), n) array; windows that run off either end
+    of the recording are NaN.
+    """
+    t = to_ns(times)
+    v = np.asarray(values, dtype='float64')
+    c = to_ns(centers)
+    rate = sample_rate(t) if rate is None else rate
+    size = max(int(round(pd.Timedelta(window).total_seconds() * rate)), 1)
+    step = NS_PER_SECOND / rate
+    offsets = np.round((np.arange(size) - size // 2) * step).astype('int64')
+    at = c[:, None] + offsets[None, :]
+    windows = np.interp(at.ravel(), t, v).reshape(at.shape) if len(t) \
+        else np.full(at.shape, np.nan)
+    outside = (at[:, 0] < t[0]) | (at[:, -1] > t[-1]) if len(t) \
+        else np.ones(len(c), dtype=bool)
+    windows[outside] = np.nan
+    return windows
+
+
+def stroke_spectra(times, values, centers, window='2s', rate=None,
+                   taper='hann', max_freq=None, dtype='float32'):
+    """Magnitude spectra of the windows around each stroke.
+
+    One batched rfft over all windows; each window has its mean removed
+    and is tapered first. Returns (freqs, spectra) with spectra a
+    (len(centers), len(freqs)) array aligned with centers.
+    """
+    t = to_ns(times)
+    rate = sample_rate(t) if rate is None else rate
+    windows = stroke_windows(t, values, centers, window, rate)
+    size = windows.shape[1]
+    windows = (windows - windows.mean(axis=1, keepdims=True)) * _taper(size, taper)
+    spectra = np.abs(np.fft.rfft(windows, axis=1))
+    freqs = np.fft.rfftfreq(size, 1 / rate)
+    if max_freq is not None:
+        keep = freqs <= max_freq
+        freqs, spectra = freqs[keep], spectra[:, keep]
+    return freqs, spectra.astype(dtype)
+
+
+def band_power(freqs, spectra, bands):
+    """Sum of squared magnitudes per frequency band.
+
+    bands maps a name to (low, high) Hz, high exclusive. Returns a frame
+    with one column per band and one row per spectrum.
+    """
+    power = np.asarray(spectra, dtype='float64') ** 2
+    return pd.DataFrame({name: power[:, (freqs >= lo) & (freqs < hi)].sum(axis=1)
+                         for name, (lo, hi) in bands.items()})
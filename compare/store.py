@@ -0,0 +1,341 @@
+"""Consolidated local analytics store for every sensor.
+
+One directory holds all sensors, filled by ``compare.ingest``:
+
+    store.db                      SQLite
+        strokes                   one row per stroke event of any sensor
+        babolat, zepp, golf,      vendor columns of each event, keyed by
+        legacy                    strokes.id (column ``event``)
+        ingest_marks              high-water mark per source
+        sessions                  session index (``compare.sessions``)
+    motion/<sensor>/<YYYY-MM-DD>/<first time>.feather
+                                  raw motion samples, one file per ingested
+                                  chunk and local day
+
+Stroke events share one schema whatever the sensor:
+
+    id          event id
+    sensor      babolat / zepp / golf / legacy
+    time        Arizona local wall clock, int64 ns
+    stroke      stroke code (STROKES), NULL for golf
+    swing_type  SLICE / FLAT / TOPSPIN / SERVE / VOLLEY / SMASH
+    hand_type   FH / BH
+    speed       vendor speed (Babolat SpeedValue, Zepp racket_speed,
+                legacy BALL_SPEED, golf IMPACT_SPEED)
+    score       vendor overall score (Babolat PIQ, golf SCORE)
+
+and are indexed on (sensor, time), so any date range and sensor mix is
+one index range scan. Raw motion is uncompressed Feather (Arrow IPC, as
+in ``compare.cache``) partitioned by sensor and day: a date range only
+opens the days it covers and the files are memory-mapped.
+
+Settings come from the environment:
+    COMPARE_STORE   store directory (default ~/.local/share/compare)
+
+pyarrow is optional; without it only the raw motion table is unavailable.
+"""
+import glob
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from compare.strokes import HAND_TYPES, STROKES, SWING_TYPES
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # pragma: no cover - motion table is optional
+    pa = None
+
+STORE_DIR = os.environ.get(
+    'COMPARE_STORE',
+    os.path.join(os.path.expanduser('~'), '.local', 'share', 'compare'))
+DB_NAME = 'store.db'
+MOTION_DIR = 'motion'
+SUFFIX = '.feather'
+# Margin around a session's first and last stroke when loading it
+SESSION_PAD = pd.Timedelta('1min')
+
+STROKE_SENSORS = ['babolat', 'zepp', 'golf', 'legacy']
+EVENT_COLUMNS = ['time', 'stroke', 'swing_type', 'hand_type', 'speed', 'score']
+# Categories of the text columns of strokes
+EVENT_CATEGORIES = {'sensor': STROKE_SENSORS, 'stroke': STROKES,
+                    'swing_type': SWING_TYPES, 'hand_type': HAND_TYPES}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS strokes (
+    id INTEGER PRIMARY KEY, sensor TEXT NOT NULL, time INTEGER NOT NULL,
+    stroke TEXT, swing_type TEXT, hand_type TEXT, speed REAL, score REAL);
+CREATE INDEX IF NOT EXISTS idx_strokes_sensor_time ON strokes(sensor, time);
+CREATE INDEX IF NOT EXISTS idx_strokes_time ON strokes(time);
+CREATE TABLE IF NOT EXISTS ingest_marks (
+    source TEXT PRIMARY KEY, mark INTEGER, path TEXT,
+    offset INTEGER, rows INTEGER, updated REAL,
+    at_mark INTEGER, fingerprint TEXT);
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY, start INTEGER NOT NULL, "end" INTEGER NOT NULL,
+    strokes INTEGER, sensors TEXT);
+"""
+# Columns added to ingest_marks since it was first created
+MARK_COLUMNS = {'at_mark': 'INTEGER', 'fingerprint': 'TEXT'}
+
+
+def connect(store=None):
+    """Open the store's database, creating the store if needed."""
+    store = store or STORE_DIR
+    os.makedirs(store, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(store, DB_NAME))
+    conn.executescript(SCHEMA)
+    # Stores created before ingest_marks had these columns
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(ingest_marks)")}
+    for column, kind in MARK_COLUMNS.items():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE ingest_marks ADD COLUMN {column} {kind}")
+    return conn
+
+
+def _bounds(start_date, end_date):
+    # Local dates -> int64 ns bounds on the store's local clock
+    lo = pd.Timestamp(start_date).value if start_date is not None else None
+    hi = pd.Timestamp(end_date).value if end_date is not None else None
+    return lo, hi
+
+
+def _time_filter(column, start_date, end_date):
+    lo, hi = _bounds(start_date, end_date)
+    clauses, params = [], []
+    if lo is not None:
+        clauses.append(f'{column} >= ?')
+        params.append(lo)
+    if hi is not None:
+        clauses.append(f'{column} <= ?')
+        params.append(hi)
+    return clauses, params
+
+
+def _nullable(values):
+    # Column values as Python objects with None for missing, for sqlite3
+    values = pd.Series(values).astype(object)
+    return values.where(values.notna(), None).tolist()
+
+
+def append_strokes(conn, sensor, events, details):
+    """Insert stroke events and their vendor columns (one row per event).
+
+    Call inside the caller's transaction. events holds EVENT_COLUMNS
+    (time as local int64 ns); details the vendor columns. Returns the
+    new event ids.
+    """
+    if sensor not in STROKE_SENSORS:
+        raise ValueError(f"unknown stroke sensor {sensor!r}, expected one of {STROKE_SENSORS}")
+    n = len(events)
+    if not n:
+        return np.zeros(0, dtype='int64')
+    first = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM strokes").fetchone()[0]
+    ids = np.arange(first, first + n, dtype='int64')
+    rows = zip(ids.tolist(), [sensor] * n,
+               np.asarray(events['time'], dtype='int64').tolist(),
+               *[_nullable(events[c]) for c in EVENT_COLUMNS[1:]])
+    conn.executemany("INSERT INTO strokes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    details = details.reset_index(drop=True).assign(event=ids)
+    schema = pd.io.sql.get_schema(details, sensor, keys='event', con=conn)
+    conn.execute(schema.replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1))
+    columns = ', '.join(f'"{c}"' for c in details.columns)
+    marks = ', '.join('?' * len(details.columns))
+    conn.executemany(f'INSERT INTO "{sensor}" ({columns}) VALUES ({marks})',
+                     zip(*[_nullable(details[c]) for c in details.columns]))
+    return ids
+
+
+def _categorize(df, columns=tuple(EVENT_CATEGORIES)):
+    for col in columns:
+        categories = EVENT_CATEGORIES[col]
+        if col in df.columns:
+            df[col] = pd.Categorical(df[col], categories=categories)
+    df['time'] = df['time'].astype('datetime64[ns]')
+    return df
+
+
+def strokes(start_date=None, end_date=None, sensors=None, store=None):
+    """Stroke events of the given sensors (default all) in a date window.
+
+    time comes back as tz-naive Arizona local datetime64 and the text
+    columns as categoricals, sorted by time.
+    """
+    sensors = STROKE_SENSORS if sensors is None else list(sensors)
+    clauses, params = _time_filter('time', start_date, end_date)
+    clauses.insert(0, f"sensor IN ({', '.join('?' * len(sensors))})")
+    conn = connect(store)
+    try:
+        df = pd.read_sql(f"SELECT * FROM strokes WHERE {' AND '.join(clauses)} "
+                         "ORDER BY time", conn, params=list(sensors) + params)
+    finally:
+        conn.close()
+    return _categorize(df)
+
+
+def details(sensor, start_date=None, end_date=None, store=None):
+    """Vendor columns of one sensor's strokes with their local time and
+    stroke code, sorted by time."""
+    if sensor not in STROKE_SENSORS:
+        raise ValueError(f"unknown stroke sensor {sensor!r}, expected one of {STROKE_SENSORS}")
+    clauses, params = _time_filter('s.time', start_date, end_date)
+    where = ' AND '.join(['s.sensor = ?'] + clauses)
+    conn = connect(store)
+    try:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                              "AND name = ?", (sensor,)).fetchone()
+        if not exists:
+            return _categorize(pd.DataFrame({'time': pd.Series(dtype='int64'),
+                                             'stroke': pd.Series(dtype=object)}))
+        df = pd.read_sql(f'SELECT s.time, s.stroke, d.* FROM strokes s '
+                         f'JOIN "{sensor}" d ON d.event = s.id WHERE {where} '
+                         'ORDER BY s.time', conn, params=[sensor] + params)
+    finally:
+        conn.close()
+    # Vendor columns keep their own codes (e.g. Zepp's integer swing_type)
+    return _categorize(df.drop(columns='event'), ['stroke'])
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("the raw motion table needs pyarrow")
+
+
+def _motion_root(store, sensor):
+    return os.path.join(store or STORE_DIR, MOTION_DIR, sensor)
+
+
+def _first_time(path):
+    return int(os.path.basename(path)[:-len(SUFFIX)])
+
+
+def write_motion(sensor, frame, store=None):
+    """Write raw motion rows (time as local int64 ns, sorted) into the
+    sensor's day partitions.
+
+    Files are named by their first time, so writing the same rows again
+    replaces them instead of duplicating them.
+    """
+    _require_pyarrow()
+    if not len(frame):
+        return
+    root = _motion_root(store, sensor)
+    t = frame['time'].to_numpy(dtype='int64')
+    days = t.astype('datetime64[ns]').astype('datetime64[D]')
+    cuts = np.flatnonzero(days[1:] != days[:-1]) + 1
+    for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, len(t)]):
+        folder = os.path.join(root, str(days[lo]))
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f'{t[lo]:020d}{SUFFIX}')
+        tmp = path + '.tmp'
+        feather.write_feather(frame.iloc[lo:hi].reset_index(drop=True), tmp,
+                              compression='uncompressed')
+        os.replace(tmp, path)
+
+
+def drop_motion_after(sensor, mark, store=None):
+    """Delete motion files starting after mark (rows of an interrupted run
+    whose mark was never committed)."""
+    for path in glob.glob(os.path.join(_motion_root(store, sensor), '*', '*' + SUFFIX)):
+        if mark is None or _first_time(path) > mark:
+            os.remove(path)
+
+
+def motion(start_date=None, end_date=None, sensor='watch', columns=None, store=None):
+    """Raw motion samples of a sensor within a date window.
+
+    columns restricts the signals read (``time`` is always included);
+    time comes back as tz-naive Arizona local datetime64.
+    """
+    _require_pyarrow()
+    lo, hi = _bounds(start_date, end_date)
+    root = _motion_root(store, sensor)
+    first_day = str(np.datetime64(lo, 'ns').astype('datetime64[D]')) if lo is not None else ''
+    last_day = str(np.datetime64(hi, 'ns').astype('datetime64[D]')) if hi is not None else '~'
+    days = sorted(d for d in os.listdir(root) if first_day <= d <= last_day) \
+        if os.path.isdir(root) else []
+    files = [p for d in days for p in sorted(glob.glob(os.path.join(root, d, '*' + SUFFIX)))
+             if hi is None or _first_time(p) <= hi]
+    if columns is not None:
+        columns = ['time'] + [c for c in columns if c != 'time']
+    tables = [feather.read_table(p, columns=columns, memory_map=True) for p in files]
+    if not tables:
+        return pd.DataFrame({'time': pd.Series(dtype='datetime64[ns]')})
+    df = pa.concat_tables(tables).to_pandas()
+    t = df['time'].to_numpy()
+    keep = np.ones(len(t), dtype=bool)
+    if lo is not None:
+        keep &= t >= lo
+    if hi is not None:
+        keep &= t <= hi
+    df = df[keep].reset_index(drop=True)
+    df['time'] = df['time'].astype('datetime64[ns]')
+    return df
+
+
+def marks(store=None):
+    """The high-water mark of every ingested source."""
+    conn = connect(store)
+    try:
+        return pd.read_sql("SELECT * FROM ingest_marks", conn, index_col='source')
+    finally:
+        conn.close()
+
+
+def write_sessions(index, store=None):
+    """Replace the stored session index with index, a frame indexed by
+    session id with start, end, strokes and sensors."""
+    rows = zip(index.index, index['start'].to_numpy(dtype='datetime64[ns]').view('int64').tolist(),
+               index['end'].to_numpy(dtype='datetime64[ns]').view('int64').tolist(),
+               index['strokes'].tolist(), index['sensors'].tolist())
+    conn = connect(store)
+    try:
+        with conn:
+            conn.execute("DELETE FROM sessions")
+            conn.executemany('INSERT INTO sessions (id, start, "end", strokes, sensors) '
+                             'VALUES (?, ?, ?, ?, ?)', rows)
+    finally:
+        conn.close()
+
+
+def sessions(store=None):
+    """The session index, by start time, with local datetime start/end."""
+    conn = connect(store)
+    try:
+        df = pd.read_sql("SELECT * FROM sessions ORDER BY start", conn, index_col='id')
+    finally:
+        conn.close()
+    df.index.name = 'session'
+    for col in ('start', 'end'):
+        df[col] = df[col].astype('datetime64[ns]')
+    return df
+
+
+def session_window(session, pad=SESSION_PAD, default=None, store=None):
+    """Local (start, end) of a session id, or spanning a list of ids,
+    widened by pad.
+
+    Raises KeyError for ids not in the index; if no index has been built
+    yet (``python -m compare.sessions``) and default, a (start, end) pair,
+    is given, returns default instead.
+    """
+    ids = [session] if isinstance(session, str) else list(session)
+    conn = connect(store)
+    try:
+        rows = conn.execute(f'SELECT id, start, "end" FROM sessions WHERE id IN '
+                            f'({", ".join("?" * len(ids))})', ids).fetchall()
+        indexed = rows or conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone()
+    finally:
+        conn.close()
+    if not indexed and default is not None:
+        return default
+    missing = set(ids) - {row[0] for row in rows}
+    if missing:
+        raise KeyError(f"sessions not in the index: {sorted(missing)}")
+    start = pd.Timestamp(min(row[1] for row in rows))
+    end = pd.Timestamp(max(row[2] for row in rows))
+    return start - pad, end + pad
@@ -0,0 +1,147 @@
+"""Stroke taxonomy shared by the wranglers and the dashboard.
+
+Every sensor's stroke columns are encoded into one ``pandas.Categorical``
+over ``STROKES`` so that Babolat and Zepp rows compare, merge and group
+on the same codes. Encoding goes through small lookup arrays indexed by
+the vendor codes, so it costs a couple of integer gathers per row.
+"""
+import numpy as np
+import pandas as pd
+
+# Zepp swing_type / swing_side codes, indexed by their integer value
+SWING_TYPES = ['SLICE', 'FLAT', 'TOPSPIN', 'SERVE', 'VOLLEY', 'SMASH']
+HAND_TYPES = ['FH', 'BH']
+
+# Strokes reported by both sensors first, then the Zepp-only ones
+STROKES = ['SERVEFH', 'SLICEBH', 'SLICEFH', 'TOPSPINFH', 'TOPSPINBH',
+           'FLATBH', 'FLATFH',
+           'SERVEBH', 'VOLLEYFH', 'VOLLEYBH', 'SMASHFH', 'SMASHBH']
+
+# Dashboard labels, marker shapes and colors for the shared strokes
+STROKE_LABELS = {
+    'SERVEFH': 'Serve',
+    'SLICEBH': 'Backhand Slice',
+    'SLICEFH': 'Forehand Slice',
+    'TOPSPINFH': 'Forehand Topspin',
+    'TOPSPINBH': 'Backhand Topspin',
+    'FLATBH': 'Backhand Flat',
+    'FLATFH': 'Forehand Flat'
+}
+
+STROKE_SHAPES = {
+    'SERVEFH': 'star',
+    'SLICEBH': 'diamond',
+    'SLICEFH': 'diamond-open',
+    'TOPSPINFH': 'pentagon',
+    'TOPSPINBH': 'pentagon-open',
+    'FLATBH': 'square',
+    'FLATFH': 'square-open'
+}
+
+STROKE_COLORS = {
+    'SERVEFH': '#FF1F5B',    # bright red
+    'SLICEBH': '#009ADE',    # bright blue
+    'SLICEFH': '#F28522',    # orange
+    'TOPSPINFH': '#85D4E3',  # light blue
+    'TOPSPINBH': '#B4DC7F',  # light green
+    'FLATBH': '#9B7EDE',     # purple
+    'FLATFH': '#EFB435'      # yellow
+}
+
+# Babolat type/spin values; anything else falls into the last slot
+BAB_TYPES = ['SERVE', 'FOREHAND', 'BACKHAND']
+BAB_SPINS = ['LIFTED', 'SLICED', 'FLAT']
+
+
+def _code(stroke):
+    return STROKES.index(stroke)
+
+
+# (type, spin) -> stroke code. Serves ignore spin, unspecified spin is
+# flat and unknown types default to a flat forehand.
+BAB_STROKE_CODES = np.array([
+    # LIFTED             SLICED             FLAT               other
+    [_code('SERVEFH'),   _code('SERVEFH'),  _code('SERVEFH'),  _code('SERVEFH')],
+    [_code('TOPSPINFH'), _code('SLICEFH'),  _code('FLATFH'),   _code('FLATFH')],
+    [_code('TOPSPINBH'), _code('SLICEBH'),  _code('FLATBH'),   _code('FLATBH')],
+    [_code('FLATFH'),    _code('FLATFH'),   _code('FLATFH'),   _code('FLATFH')],
+], dtype='int8')
+
+# (swing_type, swing_side) -> stroke code
+ZEPP_STROKE_CODES = np.array(
+    [[_code(swing + hand) for hand in HAND_TYPES] for swing in SWING_TYPES],
+    dtype='int8')
+
+
+def _vocab_index(values, vocab):
+    # Position of each (upper-cased) string in vocab, len(vocab) if absent.
+    # Only the distinct values are compared as strings.
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    lookup = np.array(
+        [vocab.index(u.upper()) if isinstance(u, str) and u.upper() in vocab
+         else len(vocab) for u in uniques] + [len(vocab)],
+        dtype='int8')
+    # NaN codes (-1) pick the trailing "absent" slot
+    return lookup[codes]
+
+
+def _int_index(values, size):
+    # Integer vendor codes as array indices, -1 where missing or out of range
+    values = np.asarray(pd.to_numeric(pd.Series(values), errors='coerce'),
+                        dtype='float64')
+    valid = np.isfinite(values) & (values >= 0) & (values < size)
+    out = np.full(len(values), -1, dtype='int64')
+    out[valid] = values[valid].astype('int64')
+    return out
+
+
+def categorical(codes, categories=STROKES):
+    """Wrap integer codes (-1 for missing) as a pandas Categorical."""
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def bab_stroke(stroke_type, spin):
+    """Encode Babolat (type, spin) columns as stroke categoricals."""
+    type_idx = _vocab_index(stroke_type, BAB_TYPES)
+    spin_idx = _vocab_index(spin, BAB_SPINS)
+    return categorical(BAB_STROKE_CODES[type_idx, spin_idx])
+
+
+def zepp_stroke(swing_type, swing_side):
+    """Encode Zepp (swing_type, swing_side) codes as stroke categoricals."""
+    type_idx = _int_index(swing_type, len(SWING_TYPES))
+    side_idx = _int_index(swing_side, len(HAND_TYPES))
+    valid = (type_idx >= 0) & (side_idx >= 0)
+    codes = np.full(len(type_idx), -1, dtype='int8')
+    codes[valid] = ZEPP_STROKE_CODES[type_idx[valid], side_idx[valid]]
+    return categorical(codes)
+
+
+def zepp_swing_type(swing_type):
+    """Zepp swing_type codes as SLICE/FLAT/TOPSPIN/... categoricals."""
+    return categorical(_int_index(swing_type, len(SWING_TYPES)), SWING_TYPES)
+
+
+def zepp_hand_type(swing_side):
+    """Zepp swing_side codes as FH/BH categoricals."""
+    return categorical(_int_index(swing_side, len(HAND_TYPES)), HAND_TYPES)
+
+
+# stroke code -> swing type / hand codes, e.g. TOPSPINBH -> TOPSPIN, BH
+STROKE_SWING_CODES = np.array([SWING_TYPES.index(s[:-2]) for s in STROKES], dtype='int8')
+STROKE_HAND_CODES = np.array([HAND_TYPES.index(s[-2:]) for s in STROKES], dtype='int8')
+
+
+def _split_stroke(stroke, lookup, categories):
+    codes = np.asarray(pd.Categorical(stroke, categories=STROKES).codes)
+    return categorical(np.where(codes >= 0, lookup[codes], -1), categories)
+
+
+def stroke_swing_type(stroke):
+    """Swing type (SLICE/FLAT/...) part of stroke codes."""
+    return _split_stroke(stroke, STROKE_SWING_CODES, SWING_TYPES)
+
+
+def stroke_hand_type(stroke):
+    """Hand (FH/BH) part of stroke codes."""
+    return _split_stroke(stroke, STROKE_HAND_CODES, HAND_TYPES)
@@ -0,0 +1,76 @@
+"""Summary statistics of wrangled frames per session and per stroke.
+
+Stats panels used to run ``describe()`` over every row on each dashboard
+rerun. ``summaries`` computes the same statistics once, when a dataset is
+loaded and cached, for the whole frame and for every session, stroke and
+session/stroke pair, so panels only look them up and sessions can be
+compared side by side:
+
+    tables = summaries(df, ['PIQ', 'ZIQ'])
+    tables['all']                     # describe() of the whole frame
+    tables['session'].loc['2024-06-12.1']
+    tables['stroke'].loc[['SERVEFH', 'FLATFH']]
+
+Grouped tables are indexed by (group, statistic) with one column per
+signal; rows without a session or stroke only count towards 'all'.
+"""
+import pandas as pd
+
+QUANTILES = [0.25, 0.5, 0.75]
+STATISTICS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+SCOPES = ['all', 'session', 'stroke', 'session_stroke']
+
+
+def summarize(df, columns, by=None):
+    """count, mean, std, min, quartiles and max of columns.
+
+    Without by, a frame like ``df[columns].describe()``; with by (a column
+    or list of columns), the statistics of every group, indexed by the
+    group keys and the statistic.
+    """
+    if by is None:
+        return df[columns].describe().reindex(STATISTICS)
+    grouped = df.groupby(by, observed=True, sort=True)[columns]
+    quantiles = grouped.quantile(QUANTILES)
+    parts = {
+        'count': grouped.count(),
+        'mean': grouped.mean(),
+        'std': grouped.std(),
+        'min': grouped.min(),
+        'max': grouped.max(),
+    }
+    for q, label in zip(QUANTILES, ['25%', '50%', '75%']):
+        parts[label] = quantiles.xs(q, level=-1)
+    table = pd.concat({s: parts[s].astype('float64') for s in STATISTICS},
+                      names=['statistic'])
+    # (statistic, group...) -> (group..., statistic), statistics in order
+    table = table.reorder_levels(list(range(1, table.index.nlevels)) + [0])
+    keys = parts['count'].index
+    index = pd.MultiIndex.from_tuples(
+        [(*(key if isinstance(key, tuple) else (key,)), s) for key in keys for s in STATISTICS],
+        names=list(keys.names) + ['statistic'])
+    return table.reindex(index)
+
+
+def summaries(df, columns, session='session', stroke='stroke'):
+    """Summaries of columns over every scope in SCOPES.
+
+    Returns a dict of frames: 'all' as ``summarize(df, columns)`` and the
+    grouped tables by session, stroke and both. A scope whose column df
+    doesn't have is left out.
+    """
+    tables = {'all': summarize(df, columns)}
+    if session in df.columns:
+        tables['session'] = summarize(df, columns, session)
+    if stroke in df.columns:
+        tables['stroke'] = summarize(df, columns, stroke)
+    if session in df.columns and stroke in df.columns:
+        tables['session_stroke'] = summarize(df, columns, [session, stroke])
+    return tables
+
+
+def statistics(table, groups):
+    """The rows of a grouped summary for groups, as a frame indexed by
+    group with (column, statistic) columns, for side-by-side comparison."""
+    rows = table.loc[table.index.get_level_values(0).isin(groups)]
+    return rows.unstack('statistic').reindex(columns=STATISTICS, level=1)
@@ -0,0 +1,156 @@
+"""Synthetic sensor data with the vendor schemas, for benchmarks.
+
+Strokes are laid out in on-court sessions starting 10:00 Arizona time on
+consecutive days, a stroke every few seconds. Each sensor sees the same
+strokes on its own clock, like the real devices:
+
+    babolat  motions    (BabPopExt.db)     stroke times, 1e-4 s epoch
+    zepp     swings     (ztennis.db)       +5 s, ms epoch
+    golf     swings     (Golf3.db)         its own sessions, ms epoch
+    legacy   SWING      (ZeppTennis.db)    +2 s, ms epoch
+    watch    WristMotion.csv               50 Hz from the first session,
+                                           -1 s, impact spikes at strokes
+
+    paths = generate('/tmp/bench', rows=100_000)
+"""
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from compare.sensors import GOLF_COLUMNS, LEGACY_COLUMNS, ZEPP_SENSOR_SIGNALS
+from compare.timestamps import BAB_TIME_SCALE, WATCH_TIME_SCALE, ZEPP_TIME_SCALE, \
+    local_to_ns
+from compare.watch import WIDE_COLUMNS
+
+START_DATE = '2024-06-12 10:00'
+SESSION = pd.Timedelta('2h')
+STROKE_GAP = pd.Timedelta('4s')
+WATCH_RATE = 50
+# Clock offsets of each sensor against Babolat
+ZEPP_OFFSET = pd.Timedelta('5s')
+LEGACY_OFFSET = pd.Timedelta('2s')
+WATCH_OFFSET = pd.Timedelta('-1s')
+WATCH_SIGNALS = ['rotationRateX', 'rotationRateY', 'rotationRateZ',
+                 'gravityX', 'gravityY', 'gravityZ',
+                 'accelerationX', 'accelerationY', 'accelerationZ',
+                 'quaternionW', 'quaternionX', 'quaternionY', 'quaternionZ',
+                 'roll', 'pitch', 'yaw']
+FILES = {'babolat': 'BabPopExt.db', 'zepp': 'ztennis.db', 'golf': 'Golf3.db',
+         'legacy': 'ZeppTennis.db', 'watch': 'WristMotion.csv'}
+
+
+def stroke_times(rows, start=START_DATE, rng=None):
+    """Epoch ns of rows strokes in daily sessions from start."""
+    rng = np.random.default_rng(0) if rng is None else rng
+    per_session = int(SESSION / STROKE_GAP)
+    i = np.arange(rows)
+    session, k = np.divmod(i, per_session)
+    jitter = rng.uniform(-0.4, 0.4, rows) * STROKE_GAP.value
+    return (local_to_ns(start) + session * pd.Timedelta('1D').value
+            + k * STROKE_GAP.value + jitter).astype('int64')
+
+
+def _scaled(ns, scale):
+    return ns // (WATCH_TIME_SCALE // scale)
+
+
+def _write_table(path, table, df):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    try:
+        df.to_sql(table, conn, index=False, chunksize=100_000)
+    finally:
+        conn.close()
+
+
+def babolat_db(path, times, rng):
+    n = len(times)
+    types = np.array(['serve', 'forehand', 'backhand'])
+    spins = np.array(['lifted', 'sliced', 'flat', 'unspecified'])
+    _write_table(path, 'motions', pd.DataFrame({
+        'time': _scaled(times, BAB_TIME_SCALE),
+        'type': types[rng.integers(0, 3, n)],
+        'spin': spins[rng.integers(0, 4, n)],
+        'StyleScore': rng.random(n) * 10, 'StyleValue': rng.random(n),
+        'EffectScore': rng.random(n) * 10, 'EffectValue': rng.random(n),
+        'SpeedScore': rng.random(n) * 10, 'SpeedValue': rng.random(n) * 120,
+        'stroke_counter': np.arange(n), 'session_counter': 1}))
+
+
+def zepp_db(path, times, rng):
+    n = len(times)
+    df = pd.DataFrame({c: rng.integers(0, 5000, n) for c in ZEPP_SENSOR_SIGNALS})
+    df = df.assign(backswing_time=rng.random(n), power=rng.random(n) * 100,
+                   ball_spin=rng.random(n) * 50,
+                   impact_position_x=rng.random(n) - 0.5,
+                   impact_position_y=rng.random(n) - 0.5,
+                   racket_speed=rng.random(n) * 100,
+                   impact_region=rng.integers(0, 5, n),
+                   swing_type=rng.integers(0, 6, n), swing_side=rng.integers(0, 2, n),
+                   l_id=_scaled(times + ZEPP_OFFSET.value, ZEPP_TIME_SCALE),
+                   s_id=1, user_id=1)
+    _write_table(path, 'swings', df)
+
+
+def golf_db(path, times, rng):
+    n = len(times)
+    df = pd.DataFrame({c: rng.integers(0, 100, n) for c in GOLF_COLUMNS})
+    df['L_ID'] = _scaled(times, ZEPP_TIME_SCALE)
+    _write_table(path, 'swings', df)
+
+
+def legacy_db(path, times, rng):
+    n = len(times)
+    df = pd.DataFrame({
+        '_id': np.arange(n),
+        'HAPPENED_TIME': _scaled(times + LEGACY_OFFSET.value, ZEPP_TIME_SCALE),
+        'SWING_TYPE': rng.integers(0, 6, n), 'HAND_TYPE': rng.integers(1, 3, n),
+        'SPIN': rng.random(n) * 10, 'BALL_SPEED': rng.random(n) * 100,
+        'HEAVINESS': rng.random(n) * 10,
+        'POSITION_X': rng.random(n), 'POSITION_Y': rng.random(n),
+        'L_PLAY_SESSION_ID': 1, 'IS_HIT_FRAME': 1})
+    _write_table(path, 'SWING', df[LEGACY_COLUMNS])
+
+
+def watch_csv(path, rows, times, rng, chunk=1_000_000):
+    """Sensor Logger CSV of rows samples from just before the first stroke,
+    with an acceleration spike at every stroke it covers."""
+    step = WATCH_TIME_SCALE // WATCH_RATE
+    t0 = int(times[0] + WATCH_OFFSET.value) - 10 * WATCH_TIME_SCALE
+    spikes = np.sort(times + WATCH_OFFSET.value)
+    with open(path, 'w') as f:
+        f.write(','.join(list(WIDE_COLUMNS) + WATCH_SIGNALS) + '\n')
+        for lo in range(0, rows, chunk):
+            i = np.arange(lo, min(lo + chunk, rows))
+            t = t0 + i * step
+            df = pd.DataFrame({'time': t, 'seconds_elapsed': i / WATCH_RATE})
+            for c in WATCH_SIGNALS:
+                df[c] = rng.standard_normal(len(i)).astype('float32')
+            hit = np.searchsorted(t, spikes[(spikes >= t[0]) & (spikes <= t[-1])])
+            hit = hit[hit < len(t)]
+            for c in ('accelerationX', 'gravityX'):
+                df.loc[hit, c] += 40
+            df.to_csv(f, header=False, index=False, float_format='%.6g')
+
+
+def generate(directory, rows, watch_rows=None, seed=0):
+    """Write every synthetic source into directory.
+
+    rows is the number of strokes per stroke database (golf and legacy
+    get a fifth), watch_rows the CSV samples (default rows). Returns the
+    paths keyed by sensor.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = {name: os.path.join(directory, f) for name, f in FILES.items()}
+    times = stroke_times(rows, rng=rng)
+    babolat_db(paths['babolat'], times, rng)
+    zepp_db(paths['zepp'], times, rng)
+    few = stroke_times(max(rows // 5, 1), rng=rng)
+    golf_db(paths['golf'], few, rng)
+    legacy_db(paths['legacy'], few, rng)
+    watch_csv(paths['watch'], rows if watch_rows is None else watch_rows, times, rng)
+    return paths
@@ -0,0 +1,61 @@
+"""Timestamp normalization shared by all sensor wranglers.
+
+Vendor databases and Sensor Logger exports store UTC epoch integers in
+different units. Everything here keeps timestamps numeric: raw epochs are
+scaled to int64 nanoseconds and converted to tz-naive Arizona local
+``datetime64[ns]``. Display strings are only produced on demand by
+``format_time``.
+"""
+import numpy as np
+import pandas as pd
+import pytz
+
+az_timezone = pytz.timezone('America/Phoenix')
+
+# Raw units per second for each source
+BAB_TIME_SCALE = 10000     # Babolat motions.time: 1e-4 s
+ZEPP_TIME_SCALE = 1000     # Zepp swings.l_id / SWING.HAPPENED_TIME: ms
+WATCH_TIME_SCALE = 10**9   # Sensor Logger time: ns
+
+DISPLAY_FORMAT = '%m-%d-%Y %I:%M:%S %p'
+DISPLAY_FORMAT_FRAC = '%m-%d-%Y %I:%M:%S.%f %p'
+
+
+def raw_to_ns(values, scale):
+    """Scale raw epoch integers to int64 epoch nanoseconds."""
+    values = np.asarray(values)
+    factor = 10**9 // scale
+    if values.dtype.kind == 'f':
+        # Nullable integer columns come back from SQLite as float; scale
+        # after rounding, as epoch ns are past float64's exact integers
+        return np.round(values).astype('int64') * factor
+    return values.astype('int64') * factor
+
+
+def ns_to_local(ns):
+    """Convert int64 epoch nanoseconds to tz-naive Arizona local datetime64."""
+    utc = pd.DatetimeIndex(np.asarray(ns, dtype='int64').view('datetime64[ns]'))
+    return utc.tz_localize('UTC').tz_convert(az_timezone).tz_localize(None)
+
+
+def epoch_to_local(values, scale):
+    """Convert raw epoch integers in ``scale`` units per second to local time."""
+    return ns_to_local(raw_to_ns(values, scale))
+
+
+def local_to_ns(date):
+    """Convert an Arizona local date (or tz-aware timestamp) to epoch ns."""
+    ts = pd.Timestamp(date)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(az_timezone)
+    return ts.value
+
+
+def local_to_raw(date, scale):
+    """Convert an Arizona local date to the raw epoch units of a source."""
+    return local_to_ns(date) // (10**9 // scale)
+
+
+def format_time(times, fmt=DISPLAY_FORMAT):
+    """Render local timestamps as display strings (for hover text and tables)."""
+    return pd.Series(times).dt.strftime(fmt).to_numpy()
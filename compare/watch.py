@@ -0,0 +1,87 @@
+"""Streaming reader for Sensor Logger (Apple Watch) CSV exports.
+
+WristMotion.csv files grow to gigabytes for a day of 100 Hz data, so they
+are read in fixed-size chunks: only the requested columns are parsed,
+float signals are stored as float32, rows outside the date window are
+dropped chunk by chunk and reading stops once the window has passed.
+Peak memory is one chunk plus the rows that are kept.
+"""
+import numpy as np
+import pandas as pd
+
+from compare.timestamps import WATCH_TIME_SCALE, epoch_to_local, local_to_ns
+
+CHUNK_ROWS = 250_000
+# Columns kept at full precision: epoch ns and elapsed seconds
+WIDE_COLUMNS = {'time': 'int64', 'seconds_elapsed': 'float64'}
+
+
+def watch_dtypes(file_path, columns=None):
+    """Compact read dtypes for the columns of a Sensor Logger CSV.
+
+    Dtypes are inferred from the first rows and forced on the whole file,
+    so only ones every later value parses as are used: float signals
+    become float32, integer-looking columns float64 (a blank or a
+    decimal further down would break an integer dtype) and anything else
+    object.
+    """
+    sample = pd.read_csv(file_path, nrows=100)
+    if columns is not None:
+        sample = sample[['time'] + [c for c in columns if c != 'time']]
+    dtypes = {}
+    for col, dtype in sample.dtypes.items():
+        if col in WIDE_COLUMNS:
+            dtypes[col] = WIDE_COLUMNS[col]
+        elif dtype.kind == 'f':
+            dtypes[col] = 'float32'
+        elif dtype.kind in 'iu':
+            dtypes[col] = 'float64'
+        else:
+            dtypes[col] = 'object'
+    return dtypes
+
+
+def iter_watch_chunks(file_path, start_date=None, end_date=None,
+                      columns=None, chunksize=CHUNK_ROWS):
+    """Yield chunks of a Sensor Logger CSV within [start_date, end_date].
+
+    Each chunk gets a tz-naive Arizona local ``timestamp`` column.
+    columns restricts the parsed columns (``time`` is always read).
+    """
+    dtypes = watch_dtypes(file_path, columns)
+    lo = local_to_ns(start_date) if start_date else None
+    hi = local_to_ns(end_date) if end_date else None
+
+    with pd.read_csv(file_path, usecols=list(dtypes), dtype=dtypes,
+                     chunksize=chunksize) as reader:
+        for chunk in reader:
+            t = chunk['time'].to_numpy()
+            if not len(t):
+                continue
+            # Sensor Logger writes rows in time order, so nothing later
+            # in the file can fall inside the window
+            if hi is not None and t.min() > hi:
+                break
+            keep = np.ones(len(t), dtype=bool)
+            if lo is not None:
+                keep &= t >= lo
+            if hi is not None:
+                keep &= t <= hi
+            if not keep.any():
+                continue
+            if not keep.all():
+                chunk = chunk[keep]
+            chunk = chunk.assign(timestamp=epoch_to_local(chunk['time'], WATCH_TIME_SCALE))
+            yield chunk
+
+
+def read_watch(file_path, start_date=None, end_date=None,
+               columns=None, chunksize=CHUNK_ROWS):
+    """Read a Sensor Logger CSV chunk by chunk into one frame."""
+    chunks = list(iter_watch_chunks(file_path, start_date, end_date,
+                                    columns, chunksize))
+    if not chunks:
+        dtypes = watch_dtypes(file_path, columns)
+        empty = pd.DataFrame({c: pd.Series(dtype=d) for c, d in dtypes.items()})
+        return empty.assign(timestamp=pd.Series(dtype='datetime64[ns]'))
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,91 @@
+"""ZIQ scoring: Zepp U strokes graded on the Babolat PIQ scale.
+
+ZIQ is based on PIQ and roughly grades a tennis shot on power, spin and
+sweet spot. Each Zepp signal is min-max rescaled onto the range of the
+matching Babolat score, then weighted per stroke. All functions are pure:
+they return new columns instead of writing into the caller's frames.
+"""
+import numpy as np
+import pandas as pd
+
+# New column -> (Babolat reference column, Zepp column to rescale)
+ZIQ_COLUMNS = {
+    'ZIQspin': ('EffectScore', 'ball_spin'),
+    'ZIQspeed': ('SpeedScore', 'racket_speed'),
+    'ZIQpos': ('StyleScore', 'abs_imp'),
+}
+
+# Weights chosen previously by inspection
+SPIN_WEIGHT = 2       # non-serve strokes
+SPEED_WEIGHT = 1.6    # non-serve strokes
+SERVE_WEIGHT = 0.9    # SERVEFH total
+SERVE_STROKE = 'SERVEFH'
+
+
+def rescale(values, src_min, src_max, dst_min, dst_max):
+    """Min-max rescale values (columnwise for 2-D input) onto [dst_min, dst_max].
+
+    Columns whose source range is empty map to 0.
+    """
+    values = np.asarray(values, dtype='float64')
+    span = np.asarray(src_max - src_min, dtype='float64')
+    scale = np.divide(dst_max - dst_min, span,
+                      out=np.zeros_like(span), where=span != 0)
+    out = (values - src_min) * scale + dst_min
+    if np.ndim(span):
+        out[:, span == 0] = 0
+    elif span == 0:
+        out[:] = 0
+    return out
+
+
+def normalize_columns(ref, df, columns):
+    """Rescale several columns of df onto the ranges of columns in ref.
+
+    columns maps each new column name to (ref_col, norm_col). Returns a
+    DataFrame of the new columns aligned with df's index.
+    """
+    names = list(columns)
+    ref_vals = np.column_stack([ref[columns[c][0]].to_numpy(dtype='float64')
+                                for c in names])
+    vals = np.column_stack([df[columns[c][1]].to_numpy(dtype='float64')
+                            for c in names])
+    if len(ref_vals) == 0 or len(vals) == 0:
+        return pd.DataFrame(np.nan, index=df.index, columns=names)
+    out = rescale(vals,
+                  np.nanmin(vals, axis=0), np.nanmax(vals, axis=0),
+                  np.nanmin(ref_vals, axis=0), np.nanmax(ref_vals, axis=0))
+    return pd.DataFrame(out, index=df.index, columns=names)
+
+
+def abs_impact(dfu):
+    """Penalty for off-center contact: -(|impact_x| + |impact_y|)."""
+    return -(dfu['impact_position_x'].abs() + dfu['impact_position_y'].abs())
+
+
+def ziq_scores(dfb, dfu):
+    """Compute abs_imp, ZIQspin, ZIQspeed, ZIQpos and ZIQ for Zepp strokes.
+
+    Reference ranges come from the Babolat frame dfb. Returns a DataFrame
+    aligned with dfu's index; dfu itself is not modified.
+    """
+    src = pd.DataFrame({'ball_spin': dfu['ball_spin'],
+                        'racket_speed': dfu['racket_speed'],
+                        'abs_imp': abs_impact(dfu)})
+    scores = normalize_columns(dfb, src, ZIQ_COLUMNS)
+
+    serve = (dfu['stroke'] == SERVE_STROKE).to_numpy()
+    spin = np.where(serve, scores['ZIQspin'], scores['ZIQspin'] * SPIN_WEIGHT)
+    speed = np.where(serve, scores['ZIQspeed'], scores['ZIQspeed'] * SPEED_WEIGHT)
+    total = spin + speed + scores['ZIQpos'].to_numpy()
+    total = np.where(serve, total * SERVE_WEIGHT, total)
+    return pd.DataFrame({'ZIQspin': spin,
+                         'ZIQspeed': speed,
+                         'abs_imp': src['abs_imp'],
+                         'ZIQpos': scores['ZIQpos'],
+                         'ZIQ': total}, index=dfu.index)
+
+
+def add_ziq(dfb, dfu):
+    """Return a copy of dfu with the ZIQ score columns added."""
+    return dfu.assign(**ziq_scores(dfb, dfu))
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compare.align import estimate_offset, impact_times
+
+
+def _strokes(seed, n=200):
+    # Stroke times a few seconds apart, as in a rally
+    rng = np.random.default_rng(seed)
+    seconds = np.cumsum(rng.uniform(2, 8, n))
+    return pd.Series(pd.Timestamp('2024-06-12 10:00')
+                     + pd.to_timedelta(seconds, unit='s')).astype('datetime64[ns]')
+
+
+@pytest.mark.parametrize('shift', ['4.37s', '-6.2s', '0s'])
+def test_estimate_offset_recovers_shift(shift):
+    shift = pd.Timedelta(shift)
+    reference = _strokes(0)
+    rng = np.random.default_rng(1)
+    # other misses some strokes and has jitter of its own
+    other = reference.sample(frac=0.8, random_state=2).sort_values()
+    other = other + shift + pd.to_timedelta(rng.normal(0, 20, len(other)), unit='ms')
+    found = estimate_offset(reference, other)
+    # other - found lines up with reference
+    assert abs(found - shift) < pd.Timedelta('50ms')
+
+
+def test_estimate_offset_default_without_enough_pairs():
+    reference = _strokes(0, n=5)
+    default = pd.Timedelta('5s')
+    assert estimate_offset(reference, reference + pd.Timedelta('1s'),
+                           default=default) is default
+
+
+def test_impact_times_finds_the_strikes():
+    t = pd.Series(pd.date_range('2024-06-12 10:00', periods=5000, freq='10ms')
+                  ).astype('datetime64[ns]')
+    acc = np.zeros((len(t), 3))
+    hits = [500, 1700, 3100, 4400]
+    acc[hits, 0] = 8.0
+    df = pd.DataFrame(acc, columns=['accelerationX', 'accelerationY', 'accelerationZ'])
+    df['timestamp'] = t
+    found = impact_times(df, quantile=0.999)
+    np.testing.assert_array_equal(found, t.iloc[hits].to_numpy().view('int64'))
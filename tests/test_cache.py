@@ -0,0 +1,85 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from compare import cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(cache, 'CACHE_BYTES', 1024**3)
+    return tmp_path / 'cache'
+
+
+def _wrangler(calls):
+    @cache.cached(version=1)
+    def load(path, n):
+        calls.append(n)
+        return pd.DataFrame({'x': range(n)})
+    return load
+
+
+def test_second_call_reads_the_entry(cache_dir, tmp_path):
+    source = tmp_path / 'source.db'
+    source.write_bytes(b'x')
+    calls = []
+    load = _wrangler(calls)
+    first = load(str(source), 3)
+    second = load(str(source), 3)
+    pd.testing.assert_frame_equal(first, second)
+    assert calls == [3]
+
+
+def test_entry_removed_before_read_is_recomputed(cache_dir, tmp_path, monkeypatch):
+    source = tmp_path / 'source.db'
+    source.write_bytes(b'x')
+    calls = []
+    load = _wrangler(calls)
+    load(str(source), 3)
+
+    # Another load deletes the entry between the lookup and the read
+    def vanished(path):
+        os.remove(path)
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(cache, 'read_frame', vanished)
+    assert len(load(str(source), 3)) == 3
+    assert calls == [3, 3]
+
+
+def test_evict_skips_entries_that_vanish(cache_dir, monkeypatch):
+    os.makedirs(cache_dir)
+    kept = cache_dir / ('a' + cache.SUFFIX)
+    kept.write_bytes(b'0' * 100)
+    gone = str(cache_dir / ('b' + cache.SUFFIX))
+    monkeypatch.setattr(cache, 'entry_paths', lambda prefix: [gone, str(kept)])
+    cache.evict(budget=0)
+    assert not kept.exists()
+
+
+def test_failed_write_still_returns_the_frame(cache_dir, tmp_path, monkeypatch):
+    source = tmp_path / 'source.db'
+    source.write_bytes(b'x')
+
+    def full(df, path):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(cache, 'write_frame', full)
+    calls = []
+    df = _wrangler(calls)(str(source), 3)
+    assert list(df['x']) == [0, 1, 2]
+
+
+def test_fingerprint_covers_imported_package_modules(monkeypatch):
+    from compare import sensors, strokes
+    names = [m.__name__ for m in cache._imported_modules(sensors)]
+    assert 'compare.strokes' in names and 'compare.timestamps' in names
+    before = cache._code_fingerprint(sensors.babolat.uncached)
+    # An edit to a helper module changes the fingerprint
+    source = cache.inspect.getsource
+    monkeypatch.setattr(cache.inspect, 'getsource',
+                        lambda m: source(m) + ('#' if m is strokes else ''))
+    assert cache._code_fingerprint(sensors.babolat.uncached) != before
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compare.days import DayCache, source_key
+
+
+def _frame(start, end, freq='1h'):
+    times = pd.date_range(start, end, freq=freq, inclusive='left').astype('datetime64[ns]')
+    return pd.DataFrame({'time': times, 'x': np.arange(len(times))})
+
+
+def test_only_missing_days_are_fetched():
+    cache = DayCache()
+    cache.fill('k', '2024-06-12', '2024-06-14', _frame('2024-06-12', '2024-06-14'))
+    assert cache.missing('k', '2024-06-11', '2024-06-16') == [
+        (pd.Timestamp('2024-06-11'), pd.Timestamp('2024-06-12')),
+        (pd.Timestamp('2024-06-14'), pd.Timestamp('2024-06-16'))]
+    assert cache.missing('other', '2024-06-12', '2024-06-13') == [
+        (pd.Timestamp('2024-06-12'), pd.Timestamp('2024-06-13'))]
+
+
+def test_frame_matches_a_direct_read():
+    cache = DayCache()
+    full = _frame('2024-06-12', '2024-06-15')
+    for lo, hi in cache.missing('k', '2024-06-12', '2024-06-15'):
+        part = full[(full['time'] >= lo) & (full['time'] < hi)]
+        cache.fill('k', lo, hi, part)
+    start, end = pd.Timestamp('2024-06-12 05:00'), pd.Timestamp('2024-06-14 07:00')
+    expected = full[(full['time'] >= start) & (full['time'] < end)]
+    pd.testing.assert_frame_equal(cache.frame('k', start, end), expected)
+
+
+def test_empty_days_are_held_and_unfilled_days_raise():
+    cache = DayCache()
+    cache.fill('k', '2024-06-12', '2024-06-14', _frame('2024-06-12', '2024-06-13'))
+    assert len(cache.frame('k', '2024-06-13', '2024-06-14')) == 0
+    with pytest.raises(KeyError):
+        cache.frame('k', '2024-06-13', '2024-06-15')
+
+
+def test_least_recently_used_days_are_dropped():
+    cache = DayCache(max_days=2)
+    cache.fill('k', '2024-06-12', '2024-06-14', _frame('2024-06-12', '2024-06-14'))
+    cache.frame('k', '2024-06-12', '2024-06-13')
+    cache.fill('k', '2024-06-14', '2024-06-15', _frame('2024-06-14', '2024-06-15'))
+    assert cache.missing('k', '2024-06-12', '2024-06-15') == [
+        (pd.Timestamp('2024-06-13'), pd.Timestamp('2024-06-14'))]
+
+
+def test_categoricals_survive_joining_days():
+    cache = DayCache()
+    df = _frame('2024-06-12', '2024-06-14', freq='12h')
+    df['stroke'] = pd.Categorical(['A', 'A', 'B', 'B'])
+    for day in ('2024-06-12', '2024-06-13'):
+        part = df[df['time'].dt.strftime('%Y-%m-%d') == day]
+        part = part.assign(stroke=part['stroke'].cat.remove_unused_categories())
+        cache.fill('k', day, pd.Timestamp(day) + pd.Timedelta('1D'), part)
+    out = cache.frame('k', '2024-06-12', '2024-06-14')
+    assert isinstance(out['stroke'].dtype, pd.CategoricalDtype)
+    assert list(out['stroke']) == ['A', 'A', 'B', 'B']
+
+
+def test_source_key_tracks_the_file(tmp_path):
+    path = tmp_path / 'source.db'
+    path.write_bytes(b'x')
+    key = source_key('zepp', path, columns=['a'])
+    assert source_key('zepp', path, columns=['a']) == key
+    path.write_bytes(b'xy')
+    assert source_key('zepp', path, columns=['a']) != key
@@ -0,0 +1,20 @@
+import numpy as np
+
+from compare.decimate import minmax_index
+
+
+def test_minmax_keeps_extremes_of_each_bucket():
+    x = np.arange(1000.0)
+    y = np.sin(x / 10)
+    idx = minmax_index(x, y, 100)
+    assert len(idx) <= 102
+    assert {0, 999, int(np.argmax(y)), int(np.argmin(y))} <= set(idx.tolist())
+
+
+def test_minmax_constant_x():
+    y = np.arange(100.0)
+    assert minmax_index(np.zeros(100), y, 10).tolist() == [0, 99]
+
+
+def test_minmax_under_budget_keeps_everything():
+    assert minmax_index(np.zeros(5), np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
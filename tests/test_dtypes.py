@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compare import sensors, synthetic
+from compare.dtypes import compact_dtypes, memory_report
+from compare.ziq import abs_impact, ziq_scores
+
+
+def _frame():
+    n = 200
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'small': rng.integers(-100, 100, n),
+        'big': rng.integers(0, 2**40, n),
+        'whole': rng.integers(-90, 90, n).astype('float64'),
+        'real': rng.random(n),
+        'text': rng.choice(['FLAT', 'SLICE', 'TOPSPIN'], n),
+        'time': pd.date_range('2024-06-12', periods=n, freq='s').astype('datetime64[ns]'),
+    })
+
+
+def test_compact_round_trip():
+    df = _frame()
+    small = compact_dtypes(df)
+    assert small.dtypes.astype(str).to_dict() == {
+        'small': 'int32', 'big': 'int64', 'whole': 'float32', 'real': 'float32',
+        'text': 'category', 'time': 'datetime64[ns]'}
+    # Integers and text come back exactly, floats to float32 precision
+    back = small.astype(df.dtypes.to_dict())
+    pd.testing.assert_frame_equal(back.drop(columns='real'), df.drop(columns='real'))
+    np.testing.assert_allclose(back['real'], df['real'], rtol=1e-6)
+    report = memory_report(df, small)
+    assert report.loc['total', 'bytes_after'] < report.loc['total', 'bytes_before']
+
+
+def test_compact_keeps_exclude_and_never_goes_below_32_bits():
+    df = _frame()
+    small = compact_dtypes(df, exclude=['small'])
+    assert small['small'].dtype == 'int64'
+    assert all(small[c].dtype.itemsize >= 4 for c in ['big', 'whole', 'real'])
+
+
+def test_whole_impact_positions_do_not_wrap():
+    dfu = pd.DataFrame({'impact_position_x': [100.0, -90.0, -5.0],
+                        'impact_position_y': [-100.0, -80.0, 0.0]})
+    assert abs_impact(compact_dtypes(dfu)).tolist() == [-200, -170, -5]
+
+
+@pytest.fixture(scope='module')
+def paths(tmp_path_factory):
+    return synthetic.generate(str(tmp_path_factory.mktemp('synthetic')), rows=600)
+
+
+def test_ziq_scores_same_compact_or_not(paths):
+    frames = {compact: (sensors.babolat.uncached(paths['babolat'], compact=compact),
+                        sensors.zepp.uncached(paths['zepp'], compact=compact))
+              for compact in (True, False)}
+    full = ziq_scores(*frames[False])
+    small = ziq_scores(*frames[True])
+    pd.testing.assert_frame_equal(small, full, check_dtype=False, rtol=1e-5)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from compare.features import FEATURES, stroke_features
+
+T0 = pd.Timestamp('2024-06-12 10:00')
+
+
+def _watch(n=1000, rate=100, gap_at=None):
+    # One signal sampled at rate Hz, optionally with a 2 s hole after gap_at
+    ns = np.arange(n) * (1_000_000_000 // rate)
+    if gap_at is not None:
+        ns[gap_at:] += 2_000_000_000
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'timestamp': T0 + pd.to_timedelta(ns, unit='ns'),
+                         'accelerationX': rng.normal(0, 1, n).astype('float32')})
+
+
+def _features(watch, events):
+    return stroke_features(watch, pd.Series(events), half_window='100ms',
+                           signals=['accelerationX'])
+
+
+def test_window_values():
+    watch = _watch()
+    # Between samples 300 and 301, nearer 300
+    out = _features(watch, [T0 + pd.Timedelta('3004ms')])
+    w = watch['accelerationX'].to_numpy('float64')[290:311]
+    expected = [np.abs(w).max(), np.sqrt(np.mean(w ** 2)),
+                np.abs(np.diff(w)).max() * 100, np.sum(w ** 2) / 100]
+    np.testing.assert_allclose(out.iloc[0][[f'accelerationX_{f}' for f in FEATURES]],
+                               expected, rtol=1e-5)
+
+
+def test_windows_at_the_edges():
+    watch = _watch()
+    events = [T0 + pd.Timedelta('100ms'),    # first full window
+              T0 + pd.Timedelta('90ms'),     # runs off the start
+              T0 + pd.Timedelta('9890ms'),   # last full window
+              T0 + pd.Timedelta('9900ms'),   # runs off the end
+              T0 - pd.Timedelta('1s'),       # before the recording
+              T0 + pd.Timedelta('20s')]      # after it
+    out = _features(watch, events)['accelerationX_peak']
+    assert out.notna().tolist() == [True, False, True, False, False, False]
+
+
+def test_window_straddling_a_gap_is_nan():
+    watch = _watch(gap_at=500)
+    events = [T0 + pd.Timedelta('4950ms'), T0 + pd.Timedelta('4000ms'),
+              T0 + pd.Timedelta('8000ms')]
+    out = _features(watch, events)['accelerationX_peak']
+    assert out.notna().tolist() == [False, True, True]
+
+
+def test_index_follows_events():
+    watch = _watch()
+    events = pd.Series([T0 + pd.Timedelta('2s'), T0 + pd.Timedelta('3s')], index=[7, 3])
+    out = stroke_features(watch, events, signals=['accelerationX'])
+    assert list(out.index) == [7, 3]
+    assert (out.dtypes == 'float32').all()
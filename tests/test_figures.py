@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compare.figures import WEBGL_POINTS, StrokeGroups, use_webgl
+
+
+def _strokes(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp('2024-06-12 10:00') + pd.to_timedelta(rng.permutation(n), unit='s')
+    return pd.DataFrame({'time': times, 'x': rng.random(n),
+                         'stroke': pd.Categorical(rng.choice(['SERVEFH', 'FLATFH', 'SLICEBH'], n),
+                                                  categories=['SERVEFH', 'FLATFH', 'SLICEBH',
+                                                              'SMASHFH'])})
+
+
+def test_rows_match_a_filter():
+    df = _strokes()
+    groups = StrokeGroups(df)
+    ordered = df.sort_values('time')
+    pd.testing.assert_frame_equal(groups.rows('SERVEFH'),
+                                  ordered[ordered['stroke'] == 'SERVEFH'])
+    both = groups.rows(['SLICEBH', 'FLATFH'])
+    pd.testing.assert_frame_equal(both, ordered[ordered['stroke'].isin(['SLICEBH', 'FLATFH'])])
+    assert len(groups.rows('SMASHFH')) == 0
+    assert sorted(groups.strokes()) == ['FLATFH', 'SERVEFH', 'SLICEBH']
+
+
+def test_rows_and_figures_are_memoized():
+    groups = StrokeGroups(_strokes())
+    assert groups.rows(['SERVEFH']) is groups.rows('SERVEFH')
+    built = []
+    first = groups.figure(('zepp', 'x'), lambda: built.append(1) or object())
+    assert groups.figure(('zepp', 'x'), lambda: built.append(1) or object()) is first
+    assert len(built) == 1
+
+
+def test_use_webgl():
+    assert not use_webgl(WEBGL_POINTS)
+    assert use_webgl(WEBGL_POINTS + 1)
+    assert use_webgl(10, 'webgl') and not use_webgl(10**6, 'svg')
+    with pytest.raises(ValueError):
+        use_webgl(10, 'canvas')
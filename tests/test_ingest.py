@@ -0,0 +1,149 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from compare import ingest, store
+from compare.timestamps import local_to_ns
+
+T0 = local_to_ns('2024-06-12 10:00')
+
+
+def _csv(path, samples, mode='w', seconds=0.5):
+    df = pd.DataFrame({'time': T0 + np.asarray(samples) * 20_000_000,
+                       'seconds_elapsed': seconds, 'gravityX': 1.25})
+    df.to_csv(path, mode=mode, header=mode == 'w', index=False)
+
+
+def _motion(store_dir):
+    return store.motion(store=str(store_dir))
+
+
+def test_grown_csv_appends_only_new_rows(tmp_path):
+    csv, st = tmp_path / 'WristMotion.csv', tmp_path / 'store'
+    _csv(csv, range(1000))
+    assert ingest.ingest('watch', str(csv), str(st)) == 1000
+    assert ingest.ingest('watch', str(csv), str(st)) == 0
+    _csv(csv, range(1000, 1500), mode='a')
+    assert ingest.ingest('watch', str(csv), str(st)) == 500
+    m = _motion(st)
+    assert len(m) == 1500 and not m['time'].duplicated().any()
+
+
+def test_partial_last_line_waits_for_next_run(tmp_path):
+    csv, st = tmp_path / 'WristMotion.csv', tmp_path / 'store'
+    _csv(csv, range(10))
+    with open(csv, 'a') as f:
+        f.write(str(T0 + 10 * 20_000_000) + ',0.5,1.')
+    assert ingest.ingest('watch', str(csv), str(st)) == 10
+    with open(csv, 'a') as f:
+        f.write('25\n')
+    assert ingest.ingest('watch', str(csv), str(st)) == 1
+    assert _motion(st)['gravityX'].iloc[-1] == pytest.approx(1.25)
+
+
+def test_rewritten_csv_is_rescanned(tmp_path):
+    csv, st = tmp_path / 'WristMotion.csv', tmp_path / 'store'
+    _csv(csv, range(1000))
+    ingest.ingest('watch', str(csv), str(st))
+    # Re-exported in place, longer and with different line lengths: the
+    # old offset now falls inside a line
+    rewritten = pd.DataFrame({'time': T0 + np.arange(2000) * 20_000_000,
+                              'seconds_elapsed': 0.123456789, 'gravityX': 1.0})
+    with open(csv, 'r+') as f:
+        f.write(rewritten.to_csv(index=False))
+    assert ingest.ingest('watch', str(csv), str(st)) == 1000
+    m = _motion(st)
+    assert len(m) == 2000 and m['time'].is_monotonic_increasing
+    assert not m['time'].duplicated().any()
+
+
+def test_csv_in_blocks_matches_one_read(tmp_path):
+    csv = tmp_path / 'WristMotion.csv'
+    _csv(csv, range(3000))
+    for blocksize, st in [(1000, tmp_path / 'small'), (ingest.CHUNK_BYTES, tmp_path / 'big')]:
+        conn = store.connect(str(st))
+        try:
+            assert ingest._ingest_watch(conn, 'watch', str(csv), str(st), blocksize) == 3000
+        finally:
+            conn.close()
+    pd.testing.assert_frame_equal(_motion(tmp_path / 'small'), _motion(tmp_path / 'big'))
+
+
+def _swings(db, times):
+    conn = sqlite3.connect(db)
+    try:
+        pd.DataFrame({'l_id': times, 'swing_type': 1, 'swing_side': 0,
+                      'racket_speed': 1.0}).to_sql('swings', conn, index=False,
+                                                   if_exists='append')
+    finally:
+        conn.close()
+
+
+def test_rows_arriving_at_the_mark_are_kept(tmp_path):
+    db, st = tmp_path / 'ztennis.db', tmp_path / 'store'
+    ms = T0 // 1_000_000
+    _swings(db, [ms, ms + 1000, ms + 1000])
+    assert ingest.ingest('zepp', str(db), str(st)) == 3
+    assert ingest.ingest('zepp', str(db), str(st)) == 0
+    # A swing synced later with the same time as the mark
+    _swings(db, [ms + 1000, ms + 2000])
+    assert ingest.ingest('zepp', str(db), str(st)) == 2
+    assert ingest.ingest('zepp', str(db), str(st)) == 0
+    assert len(store.strokes(store=str(st))) == 5
+
+
+def test_marks_of_an_older_store_keep_the_strict_filter(tmp_path):
+    db, st = tmp_path / 'ztennis.db', tmp_path / 'store'
+    ms = T0 // 1_000_000
+    _swings(db, [ms, ms + 1000])
+    st.mkdir()
+    conn = sqlite3.connect(st / store.DB_NAME)
+    conn.execute("CREATE TABLE ingest_marks (source TEXT PRIMARY KEY, mark INTEGER, "
+                 "path TEXT, offset INTEGER, rows INTEGER, updated REAL)")
+    conn.execute("INSERT INTO ingest_marks VALUES ('zepp', ?, ?, NULL, 2, 0)",
+                 (ms + 1000, str(db)))
+    conn.commit()
+    conn.close()
+    assert ingest.ingest('zepp', str(db), str(st)) == 0
+    _swings(db, [ms + 2000])
+    assert ingest.ingest('zepp', str(db), str(st)) == 1
+
+
+def test_interrupted_run_leaves_no_partitions_past_the_mark(tmp_path, monkeypatch):
+    csv, st = tmp_path / 'WristMotion.csv', tmp_path / 'store'
+    _csv(csv, range(300))
+    set_mark = ingest._set_mark
+
+    def interrupted(conn, *args, **kwargs):
+        # The second block's rows are written, its mark never committed
+        if interrupted.calls == 1:
+            raise KeyboardInterrupt
+        interrupted.calls += 1
+        set_mark(conn, *args, **kwargs)
+    interrupted.calls = 0
+    monkeypatch.setattr(ingest, '_set_mark', interrupted)
+    conn = store.connect(str(st))
+    with pytest.raises(KeyboardInterrupt):
+        ingest._ingest_watch(conn, 'watch', str(csv), str(st), blocksize=4000)
+    conn.close()
+    monkeypatch.setattr(ingest, '_set_mark', set_mark)
+
+    mark = int(store.marks(str(st)).loc['watch', 'mark'])
+    local_mark = int(ingest._local_ns([mark], ingest.WATCH_TIME_SCALE)[0])
+    assert _motion(st)['time'].max().value > local_mark
+    write_motion = store.write_motion
+    seen = []
+
+    def checked(sensor, frame, store=None):
+        # Leftovers are dropped before the run writes anything
+        seen.append(_motion(st)['time'].max().value)
+        write_motion(sensor, frame, store)
+    monkeypatch.setattr(store, 'write_motion', checked)
+    ingest.ingest('watch', str(csv), str(st))
+    assert seen and seen[0] <= local_mark
+    m = _motion(st)
+    assert len(m) == 300 and not m['time'].duplicated().any()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compare.join import Stream, join_streams
+
+
+def _frames(seed, n=500, m=400):
+    rng = np.random.default_rng(seed)
+    t0 = pd.Timestamp('2024-06-12 10:00')
+    base = pd.DataFrame({
+        'time': t0 + pd.to_timedelta(np.sort(rng.integers(0, 3_600_000, n)), unit='ms'),
+        'a': rng.random(n)})
+    other = pd.DataFrame({
+        'time': t0 + pd.to_timedelta(np.sort(rng.integers(0, 3_600_000, m)), unit='ms'),
+        'b': rng.random(m)})
+    return base, other
+
+
+@pytest.mark.parametrize('direction', ['nearest', 'backward', 'forward'])
+@pytest.mark.parametrize('tolerance', [None, '5s'])
+def test_join_matches_merge_asof(direction, tolerance):
+    base, other = _frames(0)
+    table, _ = join_streams(Stream(base, 'time'),
+                            Stream(other, 'time', tolerance=tolerance, direction=direction))
+    expected = pd.merge_asof(base, other, on='time', direction=direction,
+                             tolerance=pd.Timedelta(tolerance) if tolerance else None)
+    pd.testing.assert_frame_equal(table[['time', 'a', 'b']], expected[['time', 'a', 'b']],
+                                  check_dtype=False)
+
+
+def test_join_offset_matches_shifted_merge_asof():
+    base, other = _frames(1)
+    shift = pd.Timedelta('2s')
+    table, report = join_streams(Stream(base, 'time'),
+                                 Stream(other, 'time', name='o', offset=shift, tolerance='5s'))
+    expected = pd.merge_asof(base, other.assign(time=other['time'] - shift), on='time',
+                             direction='nearest', tolerance=pd.Timedelta('5s'))
+    np.testing.assert_array_equal(table['b'].to_numpy(), expected['b'].to_numpy())
+    assert report.loc['o', 'matched'] == expected['b'].notna().sum()
+
+
+def test_join_equal_distance_goes_backward_like_merge_asof():
+    base = pd.DataFrame({'time': pd.to_datetime(['2024-01-01 00:00:01'])})
+    other = pd.DataFrame({'time': pd.to_datetime(['2024-01-01 00:00:00',
+                                                  '2024-01-01 00:00:02']), 'b': [1, 2]})
+    table, _ = join_streams(Stream(base, 'time'), Stream(other, 'time'))
+    expected = pd.merge_asof(base, other, on='time', direction='nearest')
+    assert table['b'].tolist() == expected['b'].tolist() == [1]
+
+
+def test_synthetic_zepp_offset_pairs_strokes(tmp_path):
+    from compare import sensors, synthetic
+    from compare.align import estimate_offset
+    paths = synthetic.generate(str(tmp_path), 2000)
+    dfb = sensors.SENSORS['babolat'].wrangle.uncached(paths['babolat'])
+    dfu = sensors.SENSORS['zepp'].wrangle.uncached(paths['zepp'])
+    shift = estimate_offset(dfu['time'], dfb['time'])
+    assert abs(shift + synthetic.ZEPP_OFFSET) < pd.Timedelta('100ms')
+    merged = pd.merge_asof(dfu, dfb.assign(time=dfb['time'] - shift).drop(columns='stroke'),
+                           on='time', direction='nearest', tolerance=pd.Timedelta('5s'))
+    table, report = join_streams(
+        Stream(dfu, 'time', name='zepp'),
+        Stream(dfb, 'time', name='babolat', offset=shift, tolerance='5s'))
+    assert merged['stroke_counter'].equals(table['stroke_counter'])
+    assert report.loc['babolat', 'matched'] > 0.9 * len(dfu)
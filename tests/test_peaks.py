@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+scipy_signal = pytest.importorskip('scipy.signal')
+
+from compare.peaks import PeakStream
+
+
+def _signal(n, seed):
+    # Continuous noise with spikes: no two samples (or peaks) are equal
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(n).cumsum() + 5 * rng.standard_normal(n)
+    spikes = rng.choice(n, n // 50, replace=False)
+    x[spikes] += rng.uniform(20, 80, len(spikes))
+    return x
+
+
+def _stream(x, chunk, threshold, distance):
+    frame = pd.DataFrame({'x': x, 'timestamp': pd.Timestamp('2024-06-12')
+                          + pd.to_timedelta(np.arange(len(x)) * 20, unit='ms')})
+    stream = PeakStream('x', threshold=threshold, distance=distance)
+    events = [stream.update(frame.iloc[i:i + chunk]) for i in range(0, len(x), chunk)]
+    events.append(stream.flush())
+    return np.concatenate([e['sample'].to_numpy() for e in events])
+
+
+@pytest.mark.parametrize('chunk', [7, 100, 1000, 10_000])
+@pytest.mark.parametrize('threshold,distance', [(None, None), (5, None), (20, 25), (None, 40)])
+def test_peak_stream_matches_find_peaks(chunk, threshold, distance):
+    x = _signal(5000, seed=chunk)
+    expected, _ = scipy_signal.find_peaks(x, threshold=threshold, distance=distance)
+    np.testing.assert_array_equal(_stream(x, chunk, threshold, distance), expected)
+
+
+def test_peak_stream_plateaus_match_find_peaks():
+    x = np.repeat(_signal(400, seed=3).round(), 3)
+    expected, _ = scipy_signal.find_peaks(x)
+    np.testing.assert_array_equal(_stream(x, 50, None, None), expected)
@@ -0,0 +1,37 @@
+import threading
+
+from compare.parallel import Load, load_sources
+from compare.profile import enabled, profiling, stage
+
+
+def _work(name):
+    with stage(name):
+        return name
+
+
+def test_runs_are_per_thread_and_follow_loads():
+    stages, ready = {}, threading.Barrier(3)
+
+    def profiled_session(tag):
+        with profiling() as run:
+            ready.wait()
+            for i in range(3):
+                with stage(f'{tag}{i}'):
+                    pass
+            load_sources({'load': Load(_work, (f'{tag}-load',))})
+        stages[tag] = run.frame()['stage'].tolist()
+
+    def plain_session():
+        ready.wait()
+        for _ in range(10):
+            with stage('other'):
+                pass
+
+    threads = [threading.Thread(target=profiled_session, args=(tag,)) for tag in 'xy']
+    threads.append(threading.Thread(target=plain_session))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stages == {'x': ['x0', 'x1', 'x2', 'x-load'], 'y': ['y0', 'y1', 'y2', 'y-load']}
+    assert not enabled()
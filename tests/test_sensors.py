@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compare import sensors, synthetic
+
+
+@pytest.fixture(scope='module')
+def zepp_path(tmp_path_factory):
+    return synthetic.generate(str(tmp_path_factory.mktemp('data')), 500)['zepp']
+
+
+@pytest.mark.parametrize('wrap', [list, tuple, np.array, pd.Index])
+def test_zepp_columns_of_any_sequence(zepp_path, wrap):
+    df = sensors.zepp.uncached(zepp_path, columns=wrap(['power', 'racket_speed']))
+    assert {'power', 'racket_speed', 'time', 'stroke'} <= set(df.columns)
+    assert 'dbg_acc_1' not in df.columns
+
+
+def test_zepp_all_columns(zepp_path):
+    df = sensors.zepp.uncached(zepp_path, columns='all')
+    assert {'dbg_acc_1', 'power', 'time'} <= set(df.columns)
+
+
+def test_zepp_unknown_column(zepp_path):
+    with pytest.raises(ValueError, match="'nope'"):
+        sensors.zepp.uncached(zepp_path, columns=['power', 'nope'])
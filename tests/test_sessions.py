@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compare import sensors, sessions, store
+
+
+def _times(*spans):
+    # Strokes every 30 s over each (start, end) span
+    return pd.Series(np.concatenate([pd.date_range(start, end, freq='30s').to_numpy()
+                                     for start, end in spans]))
+
+
+def test_segment_and_label_split_at_long_gaps():
+    t = _times(('2024-06-12 10:00', '2024-06-12 11:00'),
+               ('2024-06-12 14:00', '2024-06-12 15:00'),
+               ('2024-06-13 10:00', '2024-06-13 10:30'))
+    number = sessions.segment(t)
+    assert np.unique(number).tolist() == [0, 1, 2]
+    assert (np.diff(number) >= 0).all()
+    labels = sessions.label(t)
+    assert pd.unique(labels).tolist() == ['2024-06-12.1', '2024-06-12.2', '2024-06-13.1']
+    spans = sessions.spans(t)
+    assert spans['start'].tolist() == [pd.Timestamp('2024-06-12 10:00'),
+                                       pd.Timestamp('2024-06-12 14:00'),
+                                       pd.Timestamp('2024-06-13 10:00')]
+
+
+def _index():
+    babolat = _times(('2024-06-12 08:00', '2024-06-12 08:30'),
+                     ('2024-06-12 10:00', '2024-06-12 11:00'))
+    zepp = _times(('2024-06-12 10:00', '2024-06-12 11:00'))
+    events = pd.concat([pd.DataFrame({'time': babolat, 'sensor': 'babolat'}),
+                        pd.DataFrame({'time': zepp, 'sensor': 'zepp'})])
+    watch = pd.DataFrame({'start': [pd.Timestamp('2024-06-12 09:55')],
+                          'end': [pd.Timestamp('2024-06-12 11:05')]})
+    return sessions.session_index(events, {'watch': watch}), zepp
+
+
+def test_session_index_counts_and_sensors():
+    index, _ = _index()
+    assert index.index.tolist() == ['2024-06-12.1', '2024-06-12.2']
+    assert index['strokes'].tolist() == [61, 121]
+    assert index['sensors'].tolist() == ['babolat', 'babolat,zepp,watch']
+
+
+def test_assign_uses_the_index_ids():
+    # Zepp alone would number its only session .1; the index has a
+    # Babolat-only session earlier that day
+    index, zepp = _index()
+    assert set(sessions.assign(zepp, index)) == {'2024-06-12.2'}
+    assert set(sessions.label(zepp)) == {'2024-06-12.1'}
+    outside = pd.Series(pd.to_datetime(['2024-06-12 12:00', '2024-06-11 10:00']))
+    assert sessions.assign(outside, index).tolist() == [None, None]
+    assert sessions.assign(zepp, index.iloc[:0]).tolist() == [None] * len(zepp)
+
+
+def test_session_window_lookup(tmp_path):
+    index, _ = _index()
+    st = str(tmp_path / 'store')
+    default = ('2024-06-12', '2024-06-13')
+    assert store.session_window('2024-06-12.1', default=default, store=st) == default
+    with pytest.raises(KeyError):
+        store.session_window('2024-06-12.1', store=st)
+    store.write_sessions(index, st)
+    pd.testing.assert_frame_equal(store.sessions(st), index, check_dtype=False)
+    start, end = store.session_window(['2024-06-12.1', '2024-06-12.2'], store=st)
+    assert start == pd.Timestamp('2024-06-12 08:00') - store.SESSION_PAD
+    assert end == pd.Timestamp('2024-06-12 11:00') + store.SESSION_PAD
+    # Once an index is built, unknown ids are errors whatever the default
+    with pytest.raises(KeyError):
+        store.session_window('2024-06-14.1', default=default, store=st)
+
+
+def test_load_task_takes_a_session_or_dates():
+    with pytest.raises(ValueError):
+        sensors.load_task('zepp', 'ztennis.db', '2024-06-12', session='2024-06-12.1')
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compare.spectrum import resample_uniform, sample_rate, stroke_spectra, welch
+
+T0 = pd.Timestamp('2024-06-12 10:00')
+RATE = 100
+
+
+def _sine(freq, seconds=10, jitter=0):
+    # A sine sampled at RATE Hz, with optional timing jitter in ms
+    n = seconds * RATE
+    rng = np.random.default_rng(0)
+    ns = np.arange(n) * (10**9 // RATE) + (rng.integers(-jitter, jitter + 1, n) * 10**6
+                                           if jitter else 0)
+    ns = np.sort(ns)
+    times = T0 + pd.to_timedelta(ns, unit='ns')
+    return pd.Series(times).astype('datetime64[ns]'), np.sin(2 * np.pi * freq * ns / 1e9)
+
+
+def test_resample_uniform_grid():
+    times, values = _sine(5, jitter=2)
+    assert sample_rate(times) == pytest.approx(RATE, rel=0.05)
+    grid, out = resample_uniform(times, values, rate=RATE)
+    assert (np.diff(grid) == 10**9 // RATE).all()
+    assert len(out) == len(grid)
+
+
+def test_stroke_spectra_peak_and_edges():
+    times, values = _sine(12.5)
+    centers = pd.Series([T0 + pd.Timedelta('5s'),
+                         T0 + pd.Timedelta('990ms'),     # window starts before the data
+                         T0 + pd.Timedelta('1s'),        # first full window
+                         T0 + pd.Timedelta('9s'),        # last full window
+                         T0 + pd.Timedelta('9010ms')])   # runs off the end
+    freqs, spectra = stroke_spectra(times, values, centers, window='2s', rate=RATE)
+    assert spectra.shape == (len(centers), len(freqs))
+    assert spectra.dtype == np.float32
+    assert np.isnan(spectra).any(axis=1).tolist() == [False, True, False, False, True]
+    assert freqs[np.argmax(spectra[0])] == pytest.approx(12.5)
+
+
+def test_stroke_spectra_max_freq():
+    times, values = _sine(5)
+    freqs, spectra = stroke_spectra(times, values, pd.Series([T0 + pd.Timedelta('5s')]),
+                                    rate=RATE, max_freq=20)
+    assert freqs[-1] <= 20 and spectra.shape[1] == len(freqs)
+
+
+def test_welch_peak():
+    times, values = _sine(7)
+    freqs, psd = welch(times, values, rate=RATE)
+    assert freqs[np.argmax(psd)] == pytest.approx(7, abs=0.25)
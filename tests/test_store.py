@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from compare import ingest, sensors, store, synthetic
+
+
+@pytest.fixture(scope='module')
+def filled(tmp_path_factory):
+    # Every synthetic source ingested into one store
+    paths = synthetic.generate(str(tmp_path_factory.mktemp('data')), 600, 20_000)
+    st = str(tmp_path_factory.mktemp('store'))
+    for name in ('babolat', 'zepp', 'golf', 'legacy', 'watch'):
+        ingest.ingest(name, paths[name], st)
+    return paths, st
+
+
+@pytest.mark.parametrize('name', ['babolat', 'zepp'])
+def test_strokes_match_the_wranglers(filled, name):
+    paths, st = filled
+    df = sensors.SENSORS[name].wrangle.uncached(paths[name], compact=False)
+    events = store.strokes(sensors=[name], store=st)
+    np.testing.assert_array_equal(events['time'].to_numpy(), np.sort(df['time'].to_numpy()))
+    assert events['stroke'].value_counts().sort_index().equals(
+        df['stroke'].value_counts().sort_index())
+
+
+def test_details_window(filled):
+    paths, st = filled
+    events = store.strokes(sensors=['zepp'], store=st)
+    start, end = events['time'].iloc[[10, 50]]
+    details = store.details('zepp', start, end, store=st)
+    assert len(details) == 41
+    assert details['time'].between(start, end).all()
+    assert 'racket_speed' in details.columns
+    # Zepp's own swing codes, not the event categories
+    assert details['swing_type'].notna().all()
+    assert pd.api.types.is_integer_dtype(details['swing_type'])
+
+
+def test_motion_window_and_columns(filled):
+    paths, st = filled
+    watch = sensors.SENSORS['watch'].wrangle.uncached(paths['watch'])
+    every = store.motion(store=st)
+    assert len(every) == len(watch)
+    np.testing.assert_array_equal(every['time'].to_numpy(), watch['timestamp'].to_numpy())
+    start, end = every['time'].iloc[[1000, 5000]]
+    part = store.motion(start, end, columns=['gravityX'], store=st)
+    assert list(part.columns) == ['time', 'gravityX']
+    np.testing.assert_array_equal(part['time'].to_numpy(),
+                                  every['time'].iloc[1000:5001].to_numpy())
+
+
+def test_ingest_again_appends_nothing(filled):
+    paths, st = filled
+    before = len(store.strokes(store=st))
+    assert all(ingest.ingest(name, paths[name], st) == 0
+               for name in ('babolat', 'zepp', 'golf', 'legacy', 'watch'))
+    assert len(store.strokes(store=st)) == before
+    assert set(store.marks(st).index) == {'babolat', 'zepp', 'golf', 'legacy', 'watch'}
@@ -0,0 +1,52 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from compare.strokes import (STROKES, bab_stroke, stroke_hand_type, stroke_swing_type,
+                             zepp_stroke)
+
+
+def _map_bab_stroke(row):
+    # The row-wise mapping the Babolat wrangler used to apply
+    stroke_type = row['type'].upper()
+    spin = row['spin'].upper()
+    if stroke_type == 'SERVE':
+        return 'SERVEFH'
+    if stroke_type == 'FOREHAND':
+        return {'LIFTED': 'TOPSPINFH', 'SLICED': 'SLICEFH'}.get(spin, 'FLATFH')
+    if stroke_type == 'BACKHAND':
+        return {'LIFTED': 'TOPSPINBH', 'SLICED': 'SLICEBH'}.get(spin, 'FLATBH')
+    return 'FLATFH'
+
+
+def test_bab_stroke_matches_row_mapping():
+    types = ['serve', 'Forehand', 'BACKHAND', 'volley']
+    spins = ['lifted', 'SLICED', 'Flat', 'unspecified']
+    df = pd.DataFrame(list(itertools.product(types, spins)), columns=['type', 'spin'])
+    expected = df.apply(_map_bab_stroke, axis=1)
+    stroke = bab_stroke(df['type'], df['spin'])
+    assert list(stroke.categories) == STROKES
+    assert list(stroke.astype(str)) == list(expected)
+
+
+def test_zepp_stroke_matches_code_names():
+    swing_type = {4: 'VOLLEY', 3: 'SERVE', 2: 'TOPSPIN', 0: 'SLICE', 1: 'FLAT', 5: 'SMASH'}
+    hand_type = {1: 'BH', 0: 'FH'}
+    df = pd.DataFrame(list(itertools.product(swing_type, hand_type)),
+                      columns=['swing_type', 'swing_side'])
+    expected = df['swing_type'].map(swing_type) + df['swing_side'].map(hand_type)
+    assert list(zepp_stroke(df['swing_type'], df['swing_side']).astype(str)) == list(expected)
+
+
+def test_zepp_stroke_missing_codes():
+    stroke = zepp_stroke([1, np.nan, 9, 2], [0, 0, 1, -1])
+    assert list(stroke.codes[1:]) == [-1, -1, -1]
+    assert stroke[0] == 'FLATFH'
+
+
+def test_split_stroke_round_trip():
+    stroke = pd.Categorical(STROKES, categories=STROKES)
+    joined = (np.asarray(stroke_swing_type(stroke).astype(str)).astype(object)
+              + np.asarray(stroke_hand_type(stroke).astype(str)).astype(object))
+    assert list(joined) == STROKES
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from compare.summary import STATISTICS, statistics, summaries, summarize
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    n = 600
+    df = pd.DataFrame({'PIQ': rng.random(n) * 100, 'ZIQ': rng.random(n) * 50,
+                       'session': pd.Categorical(rng.choice(['a.1', 'b.1', 'c.1'], n)),
+                       'stroke': rng.choice(['SERVEFH', 'FLATFH', 'SLICEBH'], n)})
+    df.loc[df.index[::17], 'ZIQ'] = np.nan
+    return df
+
+
+def test_summarize_matches_describe():
+    df = _frame()
+    pd.testing.assert_frame_equal(summarize(df, ['PIQ', 'ZIQ']),
+                                  df[['PIQ', 'ZIQ']].describe().reindex(STATISTICS))
+
+
+def test_grouped_summary_matches_describe_per_group():
+    df = _frame()
+    tables = summaries(df, ['PIQ', 'ZIQ'])
+    for scope in ('session', 'stroke'):
+        for group, rows in df.groupby(scope, observed=True):
+            expected = rows[['PIQ', 'ZIQ']].describe().reindex(STATISTICS)
+            got = tables[scope].loc[group]
+            pd.testing.assert_frame_equal(got, expected, check_names=False)
+    for (session, stroke), rows in df.groupby(['session', 'stroke'], observed=True):
+        expected = rows[['PIQ', 'ZIQ']].describe().reindex(STATISTICS)
+        got = tables['session_stroke'].loc[(session, stroke)]
+        pd.testing.assert_frame_equal(got, expected, check_names=False)
+
+
+def test_statistics_is_one_row_per_group():
+    tables = summaries(_frame(), ['PIQ'])
+    wide = statistics(tables['session'], ['a.1', 'c.1'])
+    assert list(wide.index) == ['a.1', 'c.1']
+    assert list(wide.columns.get_level_values(1)) == STATISTICS
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from compare.timestamps import (BAB_TIME_SCALE, ZEPP_TIME_SCALE, epoch_to_local,
+                                format_time, local_to_ns, local_to_raw, raw_to_ns)
+
+
+def test_epoch_to_local_matches_the_string_round_trip():
+    # What the wranglers used to do: UTC -> Phoenix -> strftime -> to_datetime
+    raw = np.array([17182008001234, 17182044005678, 17182080000000])
+    old = pd.to_datetime(raw / BAB_TIME_SCALE, unit='s').tz_localize('UTC') \
+        .tz_convert('America/Phoenix').strftime('%m-%d-%Y %I:%M:%S %p')
+    old = pd.to_datetime(pd.Series(old), format='%m-%d-%Y %I:%M:%S %p')
+    local = epoch_to_local(raw, BAB_TIME_SCALE)
+    assert local.dtype == 'datetime64[ns]' and local.tz is None
+    np.testing.assert_array_equal(local.floor('s'), old)
+    # Sub-second precision is kept
+    assert local[0].microsecond == 123400
+
+
+def test_local_round_trip():
+    ns = local_to_ns('2024-06-12 10:00:00.250')
+    assert epoch_to_local([ns], 10**9)[0] == pd.Timestamp('2024-06-12 10:00:00.250')
+    # Arizona is UTC-7 all year
+    assert ns == pd.Timestamp('2024-06-12 17:00:00.250', tz='UTC').value
+    assert local_to_raw('2024-06-12 10:00', ZEPP_TIME_SCALE) == ns // 10**6 - 250
+
+
+def test_float_epochs_from_nullable_columns():
+    np.testing.assert_array_equal(raw_to_ns(np.array([1718200800123.0]), ZEPP_TIME_SCALE),
+                                  [1718200800123 * 10**6])
+
+
+def test_format_time():
+    times = pd.Series([pd.Timestamp('2024-06-12 13:05:09')])
+    assert list(format_time(times)) == ['06-12-2024 01:05:09 PM']
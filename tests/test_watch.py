@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from compare.timestamps import local_to_ns
+from compare.watch import read_watch, watch_dtypes
+
+T0 = local_to_ns('2024-06-12 10:00')
+
+
+def _csv(path, n=1000, **extra):
+    # 100 Hz Sensor Logger rows
+    df = pd.DataFrame({'time': T0 + np.arange(n) * 10_000_000,
+                       'seconds_elapsed': np.arange(n) / 100,
+                       'gravityX': np.linspace(-1, 1, n), **extra})
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_chunked_read_matches_one_read(tmp_path):
+    path = tmp_path / 'WristMotion.csv'
+    df = _csv(path)
+    out = read_watch(path, chunksize=77)
+    np.testing.assert_array_equal(out['time'], df['time'])
+    np.testing.assert_allclose(out['gravityX'], df['gravityX'], rtol=1e-6)
+    assert out['gravityX'].dtype == 'float32'
+    assert out['timestamp'].iloc[0] == pd.Timestamp('2024-06-12 10:00')
+
+
+def test_window_and_columns(tmp_path):
+    path = tmp_path / 'WristMotion.csv'
+    _csv(path, gravityY=0.5)
+    out = read_watch(path, '2024-06-12 10:00:02', '2024-06-12 10:00:04.005',
+                     columns=['gravityY'], chunksize=64)
+    assert list(out.columns) == ['time', 'gravityY', 'timestamp']
+    assert len(out) == 201
+    assert out['timestamp'].iloc[0] == pd.Timestamp('2024-06-12 10:00:02')
+    empty = read_watch(path, '2024-06-13', '2024-06-14')
+    assert len(empty) == 0 and empty['timestamp'].dtype == 'datetime64[ns]'
+
+
+def test_integer_column_with_later_blanks(tmp_path):
+    path = tmp_path / 'WristMotion.csv'
+    counter = pd.array(list(range(999)) + [None], dtype='Int64')
+    _csv(path, counter=counter)
+    assert watch_dtypes(path)['counter'] == 'float64'
+    out = read_watch(path, chunksize=100)
+    assert out['counter'].isna().sum() == 1
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from compare.ziq import add_ziq, rescale
+
+
+def _normalize_column(dfa, dfb, ref_col, norm_col, new_col_name):
+    # The per-value normalization the project mains used to apply in place
+    min_A, max_A = dfa[ref_col].min(), dfa[ref_col].max()
+    min_B, max_B = dfb[norm_col].min(), dfb[norm_col].max()
+    dfb[new_col_name] = dfb[norm_col].apply(
+        lambda x: ((x - min_B) * (max_A - min_A) / (max_B - min_B)) + min_A)
+
+
+def _baseline_ziq(dfb, dfu):
+    dfu = dfu.copy()
+    _normalize_column(dfb, dfu, 'EffectScore', 'ball_spin', 'ZIQspin')
+    _normalize_column(dfb, dfu, 'SpeedScore', 'racket_speed', 'ZIQspeed')
+    dfu['abs_imp'] = 0 + ((0 - dfu['impact_position_x'].abs())
+                          + (0 - dfu['impact_position_y'].abs()))
+    _normalize_column(dfb, dfu, 'StyleScore', 'abs_imp', 'ZIQpos')
+    dfu.loc[dfu['stroke'] != 'SERVEFH', 'ZIQspin'] = dfu['ZIQspin'] * 2
+    dfu.loc[dfu['stroke'] != 'SERVEFH', 'ZIQspeed'] = dfu['ZIQspeed'] * 1.6
+    dfu['ZIQ'] = dfu['ZIQspeed'] + dfu['ZIQspin'] + dfu['ZIQpos']
+    dfu.loc[dfu['stroke'] == 'SERVEFH', 'ZIQ'] = dfu['ZIQ'] * .9
+    return dfu
+
+
+def _frames(seed, n=300, m=200):
+    rng = np.random.default_rng(seed)
+    dfb = pd.DataFrame({'EffectScore': rng.uniform(0, 30, n),
+                        'SpeedScore': rng.uniform(0, 40, n),
+                        'StyleScore': rng.uniform(0, 30, n)})
+    dfu = pd.DataFrame({'ball_spin': rng.normal(0, 500, m),
+                        'racket_speed': rng.uniform(10, 140, m),
+                        'impact_position_x': rng.normal(0, 3, m),
+                        'impact_position_y': rng.normal(0, 3, m),
+                        'stroke': rng.choice(['SERVEFH', 'TOPSPINFH', 'SLICEBH'], m)},
+                       index=rng.permutation(m) + 1000)
+    return dfb, dfu
+
+
+def test_add_ziq_matches_normalize_column():
+    dfb, dfu = _frames(0)
+    before = dfu.copy()
+    out = add_ziq(dfb, dfu)
+    expected = _baseline_ziq(dfb, dfu)
+    cols = ['ZIQspin', 'ZIQspeed', 'abs_imp', 'ZIQpos', 'ZIQ']
+    pd.testing.assert_frame_equal(out[cols], expected[cols], check_dtype=False)
+    # The caller's frame is left alone
+    pd.testing.assert_frame_equal(dfu, before)
+
+
+def test_rescale_empty_range_is_zero():
+    np.testing.assert_array_equal(rescale([3.0, 3.0], 3.0, 3.0, 0, 10), [0, 0])
+    out = rescale(np.array([[1.0, 5.0], [3.0, 5.0]]), np.array([1.0, 5.0]),
+                  np.array([3.0, 5.0]), 0, 10)
+    np.testing.assert_array_equal(out, [[0, 0], [10, 0]])